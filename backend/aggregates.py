@@ -0,0 +1,157 @@
+"""Description: Pre-aggregated series of cleaned Pixels data for charts and the API."""
+
+import datetime as dt
+
+import polars as pl
+
+from backend import rolling
+from backend.data_cleaning import gap_statistics, missing_ranges
+from backend.downsample import PLOT_WIDTH, downsample_indices
+from backend.ngrams import ngram_counts
+
+
+def monthly_means(data: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Mean score and number of days with a Pixel per year and month.
+    Args:
+        data: Cleaned Pixels data.
+    Returns:
+        One row per year and month, in order.
+    """
+    return (
+        data.group_by(["year", "month"])
+        .agg(
+            pl.col("monthly_mean_score").first().alias("mean_score"),
+            pl.col("date").n_unique().alias("days"),
+        )
+        .sort(["year", "month"])
+    )
+
+
+def yearly_means(data: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Mean score and number of days with a Pixel per year.
+    Args:
+        data: Cleaned Pixels data.
+    Returns:
+        One row per year, in order.
+    """
+    return (
+        data.group_by("year")
+        .agg(
+            pl.col("yearly_mean_score").first().alias("mean_score"),
+            pl.col("date").n_unique().alias("days"),
+        )
+        .sort("year")
+    )
+
+
+def rolling_statistics(data: pl.DataFrame, window: int = 30) -> pl.DataFrame:
+    """
+    Purpose:
+        Rolling mean and standard deviation of the daily score over a calendar window.
+    Args:
+        data: Cleaned Pixels data, sorted by date.
+        window: Window size in days.
+    Returns:
+        Date, score, rolling mean, and rolling standard deviation per day.
+    """
+    statistics = rolling.rolling_statistics(
+        data,
+        windows=(window,),
+        centered_windows=(),
+        half_lives=(),
+    )
+    return data.select(
+        "date",
+        "average_score",
+        statistics.get_column(rolling.rolling_column("mean", window)).alias("rolling_mean"),
+        statistics.get_column(rolling.rolling_column("std", window)).alias("rolling_std"),
+    )
+
+
+def top_ngrams(data: pl.DataFrame, language: str, top_n: int) -> dict[str, pl.DataFrame]:
+    """
+    Purpose:
+        Most common words and bigrams in notes.
+    Args:
+        data: Cleaned Pixels data.
+        language: Language used in notes for removing stop words.
+        top_n: How many words and bigrams to return.
+    Returns:
+        Frames of the top words and the top bigrams with their counts.
+    """
+    words, bigrams = ngram_counts(data.get_column("notes"), language, top_n)
+    return {"words": pl.from_pandas(words), "bigrams": pl.from_pandas(bigrams)}
+
+
+def missing_days(data: pl.DataFrame) -> dict:
+    """
+    Purpose:
+        Runs of days between the first and last Pixel without an entry, and the gap
+        and streak statistics derived from them.
+    Args:
+        data: Cleaned Pixels data.
+    Returns:
+        Dict with the gaps in "ranges", one row each with start, end and days, and
+        gap_statistics with ISO dates in "statistics".
+    """
+    gaps = missing_ranges(data)
+    statistics = gap_statistics(gaps, data["date"].min(), data["date"].max())
+
+    return {
+        "ranges": gaps,
+        "statistics": {
+            name: value.isoformat() if isinstance(value, dt.date) else value
+            for name, value in statistics.items()
+        },
+    }
+
+
+def downsampled_series(  # noqa: PLR0913
+    data: pl.DataFrame,
+    column: str,
+    *,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+    width: int = PLOT_WIDTH,
+    method: str = "lttb",
+) -> pl.DataFrame:
+    """
+    Purpose:
+        A column over a date range, downsampled to the pixel width it is drawn at,
+        so zooming in re-fetches more detail for a shorter range.
+    Args:
+        data: Cleaned Pixels data, sorted by date.
+        column: Numeric column to return.
+        start: First date to include, the first Pixel if not given.
+        end: Last date to include, the last Pixel if not given.
+        width: Target width in pixels.
+        method: "lttb" or "minmax", see backend.downsample.
+    Returns:
+        Date and column for the kept points.
+    """
+    if start is not None:
+        data = data.filter(pl.col("date") >= start)
+    if end is not None:
+        data = data.filter(pl.col("date") <= end)
+
+    data = data.select("date", column)
+    points = downsample_indices(data["date"].to_numpy(), data[column].to_numpy(), width, method)
+
+    return data[points]
+
+
+def to_columns(data: pl.DataFrame) -> dict[str, list]:
+    """
+    Purpose:
+        Convert a frame to compact columnar JSON data, with dates as ISO strings.
+    Args:
+        data: Frame to convert.
+    Returns:
+        List of values per column name.
+    """
+    data = data.with_columns(pl.col(pl.Date).dt.to_string("%Y-%m-%d"))
+    return data.to_dict(as_series=False)
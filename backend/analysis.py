@@ -1,11 +1,14 @@
 """Description: Module of analysis methods."""
 
 import textwrap
-from typing import NoReturn
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
+import numpy as np
+import polars as pl
+
+from backend.figures import save_figure
+from backend.instrumentation import instrumented
+from backend.render_cache import RENDER_CACHE_DIR, cached_render
+from backend.search import NoteIndex, get_index, search_substring
 
 
 # Formatting.
@@ -13,52 +16,52 @@ headline1 = "\n----------|"
 headline2 = "|----------\n"
 headline3 = "|---|"
 
+# Confidence level of the intervals of mean scores.
+CONFIDENCE_LEVEL = 0.95
+
 
-def compare_average_score_with_term(data: pd.DataFrame, term: str, print_note: str = 0) -> NoReturn:
+def plot_term_comparison(
+    term: str,
+    labels: list[str],
+    average_scores: np.ndarray,
+    term_count: int,
+    not_term_count: int,
+) -> list[str]:
     """
     Purpose:
-        Uses a search term to show a plot with average score for days that include
-        word in notes against average score.
+        Bar plot of the average score for days with and without a term in notes.
     Args:
-        data: Pandas Dataframe of Pixel data.
         term: Search term.
-        print_note: How many notes that include search term to print.
+        labels: Bar labels.
+        average_scores: Average score per bar.
+        term_count: Days with the term.
+        not_term_count: Days without the term.
+    Returns:
+        Paths of the saved figures.
     """
-    # Boolean column if term is in note.
-    data["contains_term"] = data["notes"].str.contains(term, case=False)
-
-    # Get average score for days with term and without term.
-    avg_score_for_term = data.groupby("contains_term")["average_score"].mean().reset_index()
-    avg_score_for_term["contains_term"] = avg_score_for_term["contains_term"].map({
-        True: f'Contains "{term}"',
-        False: f'Does Not Contain "{term}"',
-    })
-
-    # Sum of term.
-    term_sum = data["contains_term"].sum()
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+    import seaborn as sns  # noqa: PLC0415
 
     # Bar plot.
     plt.figure(figsize=(10, 6))
     fig = sns.barplot(
-        data=avg_score_for_term,
-        x="contains_term",
-        y="average_score",
-        hue="contains_term",
+        x=labels,
+        y=average_scores,
+        hue=labels,
         palette="tab10",
         legend=False,
     )
 
     # Overall average score line for dataset.
-    overall_avg = avg_score_for_term["average_score"].mean()
+    overall_avg = average_scores.mean()
     plt.axhline(y=overall_avg, color="gray", linestyle="--", label="Overall Average Score")
 
     # Average score markers on score bars.
-    for index, row in avg_score_for_term.iterrows():
-        fig.text(index, row["average_score"] + 0.05, f"{row['average_score']:.2f}", ha="center")
+    for index, average_score in enumerate(average_scores):
+        fig.text(index, average_score + 0.05, f"{average_score:.2f}", ha="center")
 
     # Add counts to legend.
-    not_term_count = len(data) - term_sum
-    counts = [f'Count of "{term}": {term_sum}', f'Count of non-"{term}": {not_term_count}']
+    counts = [f'Count of "{term}": {term_count}', f'Count of non-"{term}": {not_term_count}']
     plt.legend(counts, loc="upper left")
 
     plt.title(f'Average Score for Days with and without "{term}" in Notes')
@@ -66,33 +69,244 @@ def compare_average_score_with_term(data: pd.DataFrame, term: str, print_note: s
     plt.xlabel("")
     plt.ylim(0, 5.5)
 
-    plt.savefig("./plots/analysis.png")
-    plt.show()
+    return save_figure("analysis")
+
+
+@instrumented()
+def compare_average_score_with_term(
+    data: pl.DataFrame,
+    term: str,
+    print_note: str = 0,
+    *,
+    dataset_hash: str | None = None,
+    cache_dir: str | None = RENDER_CACHE_DIR,
+) -> list[str]:
+    """
+    Purpose:
+        Uses a search term to show a plot with average score for days that include
+        word in notes against average score. In headless mode the plot is read from
+        the render cache, keyed by the dataset and term.
+    Args:
+        data: Polars Dataframe of Pixel data.
+        term: Search term.
+        print_note: How many notes that include search term to print.
+        dataset_hash: Content hash of data, hashed from data if not given.
+        cache_dir: Render cache directory, None to always render.
+    Returns:
+        Paths of the saved figures.
+    """
+    # Rows whose note contains the term, looked up in the cached inverted index.
+    rows = search_substring(get_index(data["notes"]), term)
+
+    # Boolean column if term is in note, Null for days without a note.
+    contains = np.zeros(data.height, dtype=bool)
+    contains[rows] = True
+    contains_term = data.select(
+        pl.when(pl.col("notes").is_not_null()).then(pl.lit(pl.Series(contains))),
+    ).to_series()
+
+    # Get average score for days with term and without term.
+    avg_score_for_term = (
+        data.select("average_score", contains_term.alias("contains_term"))
+        .drop_nulls("contains_term")
+        .group_by("contains_term")
+        .agg(pl.col("average_score").mean())
+        .sort("contains_term")
+    )
+    labels = [
+        f'Contains "{term}"' if contains else f'Does Not Contain "{term}"'
+        for contains in avg_score_for_term["contains_term"]
+    ]
+    average_scores = avg_score_for_term["average_score"].to_numpy()
+
+    # Sum of term.
+    term_sum = contains_term.sum()
 
-    # Iterates through and prints notes including search term.
+    paths = cached_render(
+        "compare_average_score_with_term",
+        {"term": term},
+        lambda: plot_term_comparison(
+            term,
+            labels,
+            average_scores,
+            term_sum,
+            data.height - term_sum,
+        ),
+        data,
+        dataset_hash=dataset_hash,
+        cache_dir=cache_dir,
+    )
+
+    # Prints notes including search term.
     if print_note:
-        count = 0
-        how_many_prints = 0
+        matches = data.select("date", "average_score", "notes")[rows]
+        if print_note != "all":
+            matches = matches.head(print_note)
+
+        for date, score, note in zip(
+            matches["date"],
+            matches["average_score"],
+            matches["notes"],
+            strict=True,
+        ):
+            wrapped_note = textwrap.fill(note)
+            print(
+                f"{headline1} Date: {date.strftime('%Y-%m-%d')}"
+                f"{headline3} Score: {score} {headline2}{wrapped_note}",
+            )
+
+        print("\nHow many prints?:", len(matches))
 
-        for _i, row in data.iterrows():
-            if count == print_note:
-                break
+    return paths
+
+
+def term_sums(
+    index: NoteIndex,
+    terms: list[str],
+    scores: np.ndarray,
+    valid: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Purpose:
+        Count, sum and sum of squares of the valid scores of the rows matching each term.
+    Args:
+        index: NoteIndex over the notes.
+        terms: Search terms.
+        scores: Score per row, 0 where not valid.
+        valid: Whether each row counts towards the statistics.
+    Returns:
+        count, sum, squares: One value per term.
+    """
+    count = np.empty(len(terms))
+    sums = np.empty(len(terms))
+    squares = np.empty(len(terms))
+    for i, term in enumerate(terms):
+        rows = search_substring(index, term)
+        rows = rows[valid[rows]]
+        count[i] = len(rows)
+        sums[i] = scores[rows].sum()
+        squares[i] = (scores[rows] ** 2).sum()
+    return count, sums, squares
+
+
+@instrumented()
+def compare_average_score_with_terms(
+    data: pl.DataFrame,
+    terms: list[str],
+    *,
+    plot: bool = False,
+) -> pl.DataFrame:
+    """
+    Purpose:
+        Batch version of compare_average_score_with_term. Every term is looked up in
+        the cached inverted index, and its statistics come from running sums over the
+        matching rows only; days without the term are the totals minus the matches.
+    Args:
+        data: Polars Dataframe of Pixel data.
+        terms: Search terms.
+        plot: Show one combined plot of every term's means and confidence intervals.
+    Returns:
+        Tidy table with one row per term and contains_term, holding the mean score,
+        day count, and bounds of the Student's t confidence interval at
+        CONFIDENCE_LEVEL. The bounds are null for groups of fewer than two days, whose
+        spread is unknown.
+    """
+    from scipy.special import stdtrit  # noqa: PLC0415
+
+    # Like the single-term comparison, days without a note are in neither group.
+    scores = data["average_score"].cast(pl.Float64).to_numpy()
+    valid = data["notes"].is_not_null().to_numpy() & ~np.isnan(scores)
+    scores = np.where(valid, scores, 0.0)
+    totals = (valid.sum(), scores.sum(), (scores**2).sum())
+
+    count, sums, squares = (
+        np.concatenate([term_values, total - term_values])
+        for term_values, total in zip(
+            term_sums(get_index(data["notes"]), terms, scores, valid),
+            totals,
+            strict=True,
+        )
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sums / count
+        std = np.sqrt(np.maximum(squares - sums * mean, 0.0) / (count - 1))
+        quantile = stdtrit(np.maximum(count - 1, 1), (1 + CONFIDENCE_LEVEL) / 2)
+        margin = np.where(count >= 2, quantile * std / np.sqrt(count), np.nan)  # noqa: PLR2004
+
+    result = pl.DataFrame({
+        "term": terms * 2,
+        "contains_term": [True] * len(terms) + [False] * len(terms),
+        "mean": mean,
+        "count": count.astype(int),
+        "ci_low": mean - margin,
+        "ci_high": mean + margin,
+    }).with_columns(pl.col("ci_low", "ci_high").fill_nan(None))
+
+    if plot:
+        plot_terms_comparison(result)
+
+    return result
+
+
+def plot_terms_comparison(
+    result: pl.DataFrame,
+    cache_dir: str | None = RENDER_CACHE_DIR,
+) -> list[str]:
+    """
+    Purpose:
+        Plot mean scores with confidence intervals for days with and without each term.
+        In headless mode the plot is read from the render cache, keyed by result.
+    Args:
+        result: Table from compare_average_score_with_terms.
+        cache_dir: Render cache directory, None to always render.
+    Returns:
+        Paths of the saved figures.
+    """
+    return cached_render(
+        "plot_terms_comparison",
+        {},
+        lambda: draw_terms_comparison(result),
+        result,
+        cache_dir=cache_dir,
+    )
+
+
+def draw_terms_comparison(result: pl.DataFrame) -> list[str]:
+    """
+    Purpose:
+        Draw and save the plot of plot_terms_comparison.
+    Args:
+        result: Table from compare_average_score_with_terms.
+    Returns:
+        Paths of the saved figures.
+    """
+    import matplotlib.pyplot as plt  # noqa: PLC0415
 
-            if row["contains_term"]:
-                wrapped_note = textwrap.fill(row["notes"])
-                print(
-                    f"{headline1} Date: {row['date'].strftime('%Y-%m-%d')}"
-                    f"{headline3} Score: {row['average_score']} {headline2}{wrapped_note}",
-                )
+    terms = result["term"].unique(maintain_order=True).to_list()
+    _, ax = plt.subplots(figsize=(10, max(4, len(terms) * 0.5)))
 
-                # Counts how many successful prints occurred.
-                how_many_prints += 1
+    for offset, contains, label in ((-0.15, True, "Contains"), (0.15, False, "Does Not Contain")):
+        group = result.filter(pl.col("contains_term") == contains)
+        mean = group["mean"].to_numpy()
+        # Groups without an interval get no error bar.
+        low = group["ci_low"].fill_null(np.nan).to_numpy()
+        high = group["ci_high"].fill_null(np.nan).to_numpy()
+        ax.errorbar(
+            mean,
+            np.arange(len(group)) + offset,
+            xerr=[np.nan_to_num(mean - low), np.nan_to_num(high - mean)],
+            fmt="o",
+            capsize=3,
+            label=label,
+        )
 
-                # Checks to see if all notes were requested.
-                if count != "all":
-                    count += 1
+    ax.set_yticks(np.arange(len(terms)), terms)
+    ax.invert_yaxis()
+    ax.legend(loc="upper left")
 
-            else:
-                continue
+    plt.title("Average Score for Days with and without each Term in Notes")
+    plt.xlabel("Score")
+    plt.xlim(0, 5.5)
 
-        print("\nHow many prints?:", how_many_prints)
+    return save_figure("analysis_terms")
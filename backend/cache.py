@@ -0,0 +1,447 @@
+"""Description: Content-addressed on-disk cache for cleaned Pixels data."""
+
+import hashlib
+import json
+import os
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO
+
+import numpy as np
+import polars as pl
+
+from backend.data_cleaning import PIPELINE_VERSION, data_cleaning_driver
+
+
+CACHE_DIR = str(Path("backend", "cache"))
+
+# Upper bound for the total size of cached files in bytes.
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# File extension per storage format.
+FORMATS = {"parquet": "parquet", "ipc": "arrow"}
+
+# Bytes read per chunk while hashing.
+HASH_CHUNK_SIZE = 1 << 20
+
+# Suffix of files still being written. They are renamed over their entry once complete,
+# and are never evicted while a writer may hold them.
+TMP_SUFFIX = ".tmp"
+
+
+def file_hash(path: str) -> str:
+    """
+    Purpose:
+        Hash the content of a file without reading it into memory at once.
+    Args:
+        path: Path to file.
+    Returns:
+        Hex SHA-256 digest of the file's bytes.
+    """
+    digest = hashlib.sha256()
+    with Path(path).open("rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def frame_hash(data: pl.DataFrame) -> str:
+    """
+    Purpose:
+        Hash the content of a frame, for keying results derived from it.
+        Row hashes come from Polars, so keys change when Polars is upgraded.
+    Args:
+        data: Frame to hash.
+    Returns:
+        Hex SHA-256 digest of the schema and every row.
+    """
+    digest = hashlib.sha256(str(data.schema).encode("utf-8"))
+    digest.update(data.hash_rows().to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(content_hash: str, version: str = PIPELINE_VERSION) -> str:
+    """
+    Purpose:
+        Build the cache key for an input file and a pipeline version.
+    Args:
+        content_hash: Hash of the input bytes.
+        version: Version of the cleaning pipeline code.
+    Returns:
+        Cache key, prefixed with the version so stale entries can be found by name.
+    """
+    return f"{version}-{content_hash}"
+
+
+def purge_stale(cache_dir: str, version: str = PIPELINE_VERSION) -> None:
+    """
+    Purpose:
+        Delete entries written by a different pipeline version.
+    Args:
+        cache_dir: Cache directory.
+        version: Current version of the cleaning pipeline code.
+    """
+    for entry in os.scandir(cache_dir):
+        if entry.is_file() and not entry.name.startswith(f"{version}-"):
+            # Another process may have removed it since the directory was listed.
+            Path(entry.path).unlink(missing_ok=True)
+
+
+def cache_entries(cache_dir: str) -> list[tuple[float, int, str]]:
+    """
+    Purpose:
+        List the complete entries of the cache, skipping files that are still being
+        written and files removed by another process while listing.
+    Args:
+        cache_dir: Cache directory.
+    Returns:
+        (modification time, size in bytes, path) per entry, least recently used first.
+    """
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(TMP_SUFFIX):
+            continue
+        try:
+            if entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            continue
+    return sorted(entries)
+
+
+def evict_lru(cache_dir: str, max_bytes: int) -> None:
+    """
+    Purpose:
+        Delete the least recently used entries until the cache fits in max_bytes.
+        A file's modification time is its last access, see touch. Several processes
+        may evict from one cache at once; entries already removed are skipped.
+    Args:
+        cache_dir: Cache directory.
+        max_bytes: Upper bound for the total size of the cache in bytes.
+    """
+    entries = cache_entries(cache_dir)
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        total -= size
+        Path(path).unlink(missing_ok=True)
+
+
+def touch(path: str) -> None:
+    """
+    Purpose:
+        Mark a cache entry as just used. Raises FileNotFoundError for a missing entry.
+    Args:
+        path: Path to cache entry.
+    """
+    os.utime(path)
+
+
+def atomic_write(path: str, write: Callable[[IO[bytes]], object]) -> None:
+    """
+    Purpose:
+        Write a file through a uniquely named temporary file next to it, renamed over
+        path once complete, so readers never see a partial file and concurrent
+        writers of one entry never share a temporary file.
+    Args:
+        path: Path to write.
+        write: Writes the content to an open binary file.
+    """
+    target = Path(path)
+    with tempfile.NamedTemporaryFile(
+        dir=target.parent,
+        prefix=f"{target.name}.",
+        suffix=TMP_SUFFIX,
+        delete=False,
+    ) as file:
+        tmp_path = Path(file.name)
+        try:
+            write(file)
+        except BaseException:
+            tmp_path.unlink()
+            raise
+    tmp_path.replace(target)
+
+
+def read_frame(path: str, fmt: str) -> pl.DataFrame:
+    """
+    Purpose:
+        Read a cached frame by memory-mapping it instead of parsing it.
+    Args:
+        path: Path to cache entry.
+        fmt: Storage format, "parquet" or "ipc".
+    Returns:
+        Cached Polars DataFrame.
+    """
+    if fmt == "ipc":
+        # Uncompressed IPC files are memory-mapped by Polars.
+        return pl.read_ipc(path)
+    return pl.read_parquet(path, memory_map=True)
+
+
+def write_frame(data: pl.DataFrame, path: str, fmt: str) -> None:
+    """
+    Purpose:
+        Atomically write a frame to the cache.
+    Args:
+        data: Frame to store.
+        path: Path to cache entry.
+        fmt: Storage format, "parquet" or "ipc".
+    """
+    if fmt == "ipc":
+        atomic_write(path, lambda file: data.write_ipc(file, compression="uncompressed"))
+    else:
+        atomic_write(path, data.write_parquet)
+
+
+def cached_frame(
+    name: str,
+    build: Callable[[], pl.DataFrame],
+    cache_dir: str = CACHE_DIR,
+    fmt: str = "parquet",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> pl.DataFrame:
+    """
+    Purpose:
+        Return a frame from the cache, building and storing it on a miss.
+    Args:
+        name: Cache entry name, starting with a cache_key.
+        build: Computes the frame on a miss.
+        cache_dir: Cache directory.
+        fmt: Storage format, "parquet" or "ipc".
+        max_bytes: Upper bound for the total size of the cache in bytes.
+    Returns:
+        data: Cached or freshly built Polars DataFrame.
+    Raises:
+        ValueError: If fmt is not a storage format.
+    """
+    if fmt not in FORMATS:
+        msg = f"Unknown cache format {fmt!r}, expected one of {list(FORMATS)}."
+        raise ValueError(msg)
+
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    purge_stale(cache_dir)
+
+    path = str(Path(cache_dir, f"{name}.{FORMATS[fmt]}"))
+
+    try:
+        touch(path)
+        return read_frame(path, fmt)
+    except FileNotFoundError:
+        # A miss, or evicted by another process since; build it again.
+        pass
+
+    data = build()
+    write_frame(data, path, fmt)
+    evict_lru(cache_dir, max_bytes)
+
+    return data
+
+
+def cached_arrays(
+    name: str,
+    build: Callable[[], dict[str, np.ndarray]],
+    cache_dir: str = CACHE_DIR,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> dict[str, np.ndarray]:
+    """
+    Purpose:
+        Return NumPy arrays from the cache, building and storing them on a miss.
+    Args:
+        name: Cache entry name, starting with a cache_key.
+        build: Computes the arrays by name on a miss.
+        cache_dir: Cache directory.
+        max_bytes: Upper bound for the total size of the cache in bytes.
+    Returns:
+        Cached or freshly built arrays by name.
+    """
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    purge_stale(cache_dir)
+
+    path = str(Path(cache_dir, f"{name}.npz"))
+
+    try:
+        touch(path)
+        with np.load(path) as arrays:
+            return dict(arrays)
+    except FileNotFoundError:
+        # A miss, or evicted by another process since; build it again.
+        pass
+
+    arrays = build()
+    atomic_write(path, lambda file: np.savez(file, **arrays))
+    evict_lru(cache_dir, max_bytes)
+
+    return arrays
+
+
+def cached_cleaning_driver(
+    json_path: str,
+    cache_dir: str = CACHE_DIR,
+    fmt: str = "parquet",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> pl.DataFrame:
+    """
+    Purpose:
+        Return the cleaned frame for a backup from the cache, cleaning and storing it
+        on a miss. Entries are keyed by the file's bytes and PIPELINE_VERSION.
+    Args:
+        json_path: Path to json file.
+        cache_dir: Cache directory.
+        fmt: Storage format, "parquet" or "ipc".
+        max_bytes: Upper bound for the total size of the cache in bytes.
+    Returns:
+        data: Cleaned Polars DataFrame.
+    """
+    return cached_frame(
+        cache_key(file_hash(json_path)),
+        lambda: data_cleaning_driver(json_path, lazy=True),
+        cache_dir,
+        fmt,
+        max_bytes,
+    )
+
+
+def cached_rolling_statistics(
+    json_path: str,
+    cache_dir: str = CACHE_DIR,
+    fmt: str = "parquet",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> pl.DataFrame:
+    """
+    Purpose:
+        Return the rolling statistics of a backup's cleaned frame from the cache,
+        stored next to the cleaned frame. Entries are also keyed by the windows and
+        statistics configured in backend.rolling.
+    Args:
+        json_path: Path to json file.
+        cache_dir: Cache directory.
+        fmt: Storage format, "parquet" or "ipc".
+        max_bytes: Upper bound for the total size of the cache in bytes.
+    Returns:
+        Output of rolling.rolling_statistics for the cleaned frame.
+    """
+    # The analytics modules are imported by the helpers caching them, so importing the
+    # cache for cleaning alone does not load them.
+    from backend import rolling  # noqa: PLC0415
+
+    settings = json.dumps(
+        [rolling.WINDOWS, rolling.CENTERED_WINDOWS, rolling.EWM_HALF_LIVES, rolling.STATISTICS],
+    )
+    settings_hash = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:16]
+
+    return cached_frame(
+        f"{cache_key(file_hash(json_path))}-rolling-{settings_hash}",
+        lambda: rolling.rolling_statistics(
+            cached_cleaning_driver(json_path, cache_dir, fmt, max_bytes),
+        ),
+        cache_dir,
+        fmt,
+        max_bytes,
+    )
+
+
+def cached_tag_tables(  # noqa: PLR0913
+    dataset_hash: str,
+    load: Callable[[], pl.DataFrame],
+    *,
+    names: tuple[str, ...] | None = None,
+    cache_dir: str = CACHE_DIR,
+    fmt: str = "parquet",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> dict[str, pl.DataFrame]:
+    """
+    Purpose:
+        Return tag tables of a dataset from the cache, stored next to its cleaned
+        frame. On a miss the tags are exploded once for every table.
+    Args:
+        dataset_hash: Content hash of the backup, see file_hash.
+        load: Loads the cleaned frame, only called on a miss.
+        names: Tables to return, all of tags.TABLES if not given.
+        cache_dir: Cache directory.
+        fmt: Storage format, "parquet" or "ipc".
+        max_bytes: Upper bound for the total size of the cache in bytes.
+    Returns:
+        Tables by name, see tags.tag_statistics.
+    """
+    from backend import tags  # noqa: PLC0415
+
+    key = cache_key(dataset_hash)
+    computed = {}
+
+    def build(name: str) -> pl.DataFrame:
+        if not computed:
+            computed.update(tags.tag_statistics(load()))
+        return computed[name]
+
+    return {
+        name: cached_frame(
+            f"{key}-tags-{name}",
+            lambda name=name: build(name),
+            cache_dir,
+            fmt,
+            max_bytes,
+        )
+        for name in names or tags.TABLES
+    }
+
+
+def cached_tag_statistics(
+    json_path: str,
+    cache_dir: str = CACHE_DIR,
+    fmt: str = "parquet",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> dict[str, pl.DataFrame]:
+    """
+    Purpose:
+        Return the tag tables of a backup's cleaned frame from the cache, see
+        cached_tag_tables.
+    Args:
+        json_path: Path to json file.
+        cache_dir: Cache directory.
+        fmt: Storage format, "parquet" or "ipc".
+        max_bytes: Upper bound for the total size of the cache in bytes.
+    Returns:
+        Output of tags.tag_statistics for the cleaned frame.
+    """
+    return cached_tag_tables(
+        file_hash(json_path),
+        lambda: cached_cleaning_driver(json_path, cache_dir, fmt, max_bytes),
+        cache_dir=cache_dir,
+        fmt=fmt,
+        max_bytes=max_bytes,
+    )
+
+
+def cached_calendar(
+    json_path: str,
+    cache_dir: str = CACHE_DIR,
+    fmt: str = "parquet",
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> dict[str, np.ndarray]:
+    """
+    Purpose:
+        Return the calendar artifacts of a backup's cleaned frame from the cache,
+        stored next to the cleaned frame.
+    Args:
+        json_path: Path to json file.
+        cache_dir: Cache directory.
+        fmt: Storage format of the cleaned frame, "parquet" or "ipc".
+        max_bytes: Upper bound for the total size of the cache in bytes.
+    Returns:
+        Output of calendar_view.build_calendar for the cleaned frame.
+    """
+    from backend import calendar_view  # noqa: PLC0415
+
+    return cached_arrays(
+        f"{cache_key(file_hash(json_path))}-calendar",
+        lambda: calendar_view.build_calendar(
+            cached_cleaning_driver(json_path, cache_dir, fmt, max_bytes),
+        ),
+        cache_dir,
+        max_bytes,
+    )
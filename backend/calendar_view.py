@@ -0,0 +1,201 @@
+"""Description: Year-in-pixels calendar, weekday and month means, and entry streaks."""
+
+import datetime as dt
+
+import numpy as np
+import polars as pl
+
+from backend.data_cleaning import gap_statistics, missing_ranges
+from backend.figures import save_figure
+from backend.instrumentation import instrumented
+
+
+# Columns of the calendar grid: the days of a leap year, so a date has the same column in
+# every year and February 29 is empty in common years.
+CALENDAR_DAYS = 366
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+# Month number of February, after which common years skip the leap day's column.
+FEBRUARY = 2
+
+
+def calendar_column() -> pl.Expr:
+    """
+    Purpose:
+        Column of each date in the calendar grid, its day of a leap year counted from 0.
+    Returns:
+        Expression on the "date" column.
+    """
+    after_february = pl.col("date").dt.month() > FEBRUARY
+    common_year = ~pl.col("date").dt.is_leap_year()
+    return pl.col("date").dt.ordinal_day() - 1 + (after_february & common_year).cast(pl.Int32)
+
+
+def grouped_means(index: np.ndarray, scores: np.ndarray, size: int) -> np.ndarray:
+    """
+    Purpose:
+        Mean score per flat index, summing scores and counts with one bincount each.
+    Args:
+        index: Flat index of each score.
+        scores: Scores.
+        size: Number of indexes.
+    Returns:
+        Means, NaN where an index has no score.
+    """
+    sums = np.bincount(index, weights=scores, minlength=size)
+    counts = np.bincount(index, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+@instrumented()
+def build_calendar(data: pl.DataFrame) -> dict[str, np.ndarray]:
+    """
+    Purpose:
+        Precompute the calendar artifacts of a dataset in one pass over its rows, so
+        calendar renders and API responses never read the rows again.
+        Several trackers on one day are averaged.
+    Args:
+        data: Cleaned Pixels data.
+    Returns:
+        Arrays by name:
+            years: Years of the grid rows.
+            grid: Mean score per year and calendar_column, NaN without a Pixel.
+            weekday_month: Mean score per weekday (Monday first) and month.
+            weekday_means, month_means: Mean score per weekday and per month.
+            longest_streak, current_streak: Most consecutive days with a Pixel, overall
+                and ending on last_date.
+            last_date: Date of the last Pixel, as datetime64[D].
+    Raises:
+        ValueError: If data has no Pixels.
+    """
+    first, last = data["date"].min(), data["date"].max()
+    if first is None:
+        msg = "Cannot build a calendar without Pixels."
+        raise ValueError(msg)
+
+    columns = (
+        data.lazy()
+        .filter(pl.col("average_score").is_not_null())
+        .select(
+            (pl.col("date").dt.year() - first.year).alias("row"),
+            calendar_column().alias("column"),
+            (pl.col("date").dt.weekday() - 1).alias("weekday"),
+            (pl.col("date").dt.month() - 1).alias("month"),
+            "average_score",
+        )
+        .collect()
+    )
+    scores = columns["average_score"].to_numpy()
+    weekday, month = columns["weekday"].to_numpy(), columns["month"].to_numpy()
+
+    years = np.arange(first.year, last.year + 1)
+    grid = grouped_means(
+        columns["row"].to_numpy() * CALENDAR_DAYS + columns["column"].to_numpy(),
+        scores,
+        len(years) * CALENDAR_DAYS,
+    )
+    weekday_month = grouped_means(
+        weekday * len(MONTHS) + month,
+        scores,
+        len(WEEKDAYS) * len(MONTHS),
+    )
+
+    statistics = gap_statistics(missing_ranges(data), first, last)
+
+    return {
+        "years": years,
+        "grid": grid.reshape(len(years), CALENDAR_DAYS),
+        "weekday_month": weekday_month.reshape(len(WEEKDAYS), len(MONTHS)),
+        "weekday_means": grouped_means(weekday, scores, len(WEEKDAYS)),
+        "month_means": grouped_means(month, scores, len(MONTHS)),
+        "longest_streak": np.array(statistics["longest_streak"]),
+        "current_streak": np.array(statistics["current_streak"]),
+        "last_date": np.array(last, dtype="datetime64[D]"),
+    }
+
+
+def current_streak(calendar: dict[str, np.ndarray], today: dt.date | None = None) -> int:
+    """
+    Purpose:
+        Current entry streak as of today: the streak ending on the last Pixel, unless
+        a day has passed since without one. Today may still get its Pixel.
+    Args:
+        calendar: Output of build_calendar.
+        today: Date to count to, today if not given.
+    Returns:
+        Consecutive days with a Pixel up to today or yesterday, 0 if broken.
+    """
+    today = today or dt.datetime.now().astimezone().date()
+    last_date = calendar["last_date"].item()
+    return int(calendar["current_streak"]) if last_date >= today - dt.timedelta(days=1) else 0
+
+
+def to_json(calendar: dict[str, np.ndarray], today: dt.date | None = None) -> dict:
+    """
+    Purpose:
+        Convert the calendar artifacts to JSON data, with null for days without a Pixel.
+    Args:
+        calendar: Output of build_calendar.
+        today: Date the current streak is counted to, today if not given.
+    Returns:
+        Dict of the artifacts with lists for arrays and an ISO last_date.
+    """
+
+    def rows(values: np.ndarray) -> list:
+        return np.where(np.isnan(values), None, values.round(3)).tolist()
+
+    return {
+        "years": calendar["years"].tolist(),
+        "grid": rows(calendar["grid"]),
+        "weekdays": list(WEEKDAYS),
+        "months": list(MONTHS),
+        "weekday_month": rows(calendar["weekday_month"]),
+        "weekday_means": rows(calendar["weekday_means"]),
+        "month_means": rows(calendar["month_means"]),
+        "longest_streak": int(calendar["longest_streak"]),
+        "current_streak": current_streak(calendar, today),
+        "last_date": calendar["last_date"].item().isoformat(),
+    }
+
+
+def plot_calendar(calendar: dict[str, np.ndarray]) -> list[str]:
+    """
+    Purpose:
+        Plot the year-in-pixels calendar and the weekday by month means from the
+        precomputed artifacts.
+    Args:
+        calendar: Output of build_calendar.
+    Returns:
+        Paths of the saved figures.
+    """
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
+    years = calendar["years"]
+    fig, (days_ax, weekday_ax) = plt.subplots(
+        2,
+        1,
+        figsize=(14, 2 + 0.4 * len(years) + 3),
+        height_ratios=[max(len(years), 2), 5],
+    )
+
+    # Scores run from 1 to 5; every cell is one day, so cells are not interpolated.
+    style = {"aspect": "auto", "cmap": "RdYlGn", "vmin": 1, "vmax": 5, "interpolation": "nearest"}
+
+    image = days_ax.imshow(calendar["grid"], **style)
+    days_ax.set_yticks(range(len(years)), years)
+    month_starts = np.cumsum([0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30])
+    days_ax.set_xticks(month_starts, MONTHS)
+    days_ax.set_title(f"Year in Pixels (longest streak {int(calendar['longest_streak'])} days)")
+
+    weekday_ax.imshow(calendar["weekday_month"], **style)
+    weekday_ax.set_yticks(range(len(WEEKDAYS)), WEEKDAYS)
+    weekday_ax.set_xticks(range(len(MONTHS)), MONTHS)
+    weekday_ax.set_title("Mean Score by Weekday and Month")
+
+    fig.colorbar(image, ax=[days_ax, weekday_ax], label="Average Score")
+
+    return save_figure("calendar_heatmap")
@@ -1,8 +1,32 @@
 """Description: Module for data cleaning for Pixel data."""
 
+import datetime as dt
+from typing import TypeVar
+
 import polars as pl
 
+from backend.instrumentation import instrumented
+
+
+# Every cleaning step works on either an eager DataFrame or a LazyFrame plan.
+FrameT = TypeVar("FrameT", pl.DataFrame, pl.LazyFrame)
+
+# Bump whenever a change to the pipeline changes its output; invalidates cached frames.
+PIPELINE_VERSION = "3"
 
+# Columns of a Pixels backup. Reading with a fixed schema keeps the types of columns
+# that are null or empty throughout, like the notes of a batch or the tags of a backup
+# without any.
+PIXELS_SCHEMA = {
+    "date": pl.String,
+    "type": pl.String,
+    "scores": pl.List(pl.Int64),
+    "notes": pl.String,
+    "tags": pl.List(pl.Struct({"type": pl.String, "entries": pl.List(pl.String)})),
+}
+
+
+@instrumented()
 def json_to_dataframe(json_path: str) -> pl.DataFrame:
     """
     Purpose:
@@ -12,54 +36,147 @@ def json_to_dataframe(json_path: str) -> pl.DataFrame:
     Returns:
         json_data: JSON data as a Polars DataFrame.
     """
-    return pl.read_json(json_path)
+    return pl.read_json(json_path, schema=PIXELS_SCHEMA)
 
 
-def daily_average_score(data: pl.DataFrame) -> pl.DataFrame:
+@instrumented()
+def daily_average_score(data: FrameT) -> FrameT:
     """
     Purpose:
-        Create an overall score per day based on how many numbers were saved per day.
+        Summarize the scores saved for each Pixel in one pass over the lists: their mean
+        as the overall score of the day, count, min, max and variance. Analyses read
+        these columns instead of aggregating the lists again.
     Args:
         data: Dataset to work on.
     Returns:
-        data: Dataset with new daily score.
+        data: Dataset with average_score, score_count, score_min, score_max and
+            score_variance columns. The variance is the spread of the day's own
+            scores, 0 for a single score.
     """
+    scores = pl.col("scores").list
+    mean = scores.mean()
     data = data.with_columns(
-        average_score=pl.col("scores").list.sum() / pl.col("scores").list.len(),
+        average_score=mean,
+        score_count=scores.len(),
+        score_min=scores.min(),
+        score_max=scores.max(),
+        # Mean of squares minus squared mean, reusing the mean; on lists of a few scores
+        # this is about 2.5 times faster than list.var. Rounding can leave it just below
+        # 0, hence the clip.
+        score_variance=(scores.eval(pl.element() ** 2).list.mean() - mean**2).clip(0),
     )
 
     return data
 
 
-def clean_date(data: pl.DataFrame) -> pl.DataFrame:
+@instrumented()
+def missing_ranges(data: pl.DataFrame) -> pl.DataFrame:
     """
     Purpose:
-        Clean date by converting to DateTime, and creating year and month columns.
+        Find the runs of days between the first and last Pixel that have no entry, from
+        the differences between consecutive dates instead of a full calendar.
     Args:
-        data: Dataset to work on.
+        data: Dataset with a cleaned "date" column.
     Returns:
-        data: Dataset with cleaned date columns.
+        missing_ranges: One row per gap with its first and last missing day in "start"
+            and "end", and its length in "days".
     """
-    # Convert date to DateTime format.
-    data = data.with_columns(pl.col("date").str.to_date("%Y-%m-%d")).set_sorted("date")
+    # Sorting is free on the sorted dates of a cleaned frame. Several trackers on one
+    # day repeat its date, a difference of 0 rather than a gap.
+    skipped = pl.col("date").sort().diff().dt.total_days() - 1
+
+    return (
+        data.lazy()
+        .select(pl.col("date").sort(), skipped.alias("days"))
+        .filter(pl.col("days") > 0)
+        .select(
+            (pl.col("date") - pl.duration(days=pl.col("days"))).alias("start"),
+            (pl.col("date") - pl.duration(days=1)).alias("end"),
+            "days",
+        )
+        .collect()
+    )
+
+
+def streak_ranges(gaps: pl.DataFrame, first: dt.date, last: dt.date) -> pl.DataFrame:
+    """
+    Purpose:
+        Find the runs of consecutive days with a Pixel, the stretches between gaps.
+    Args:
+        gaps: Output of missing_ranges.
+        first: Date of the first Pixel.
+        last: Date of the last Pixel.
+    Returns:
+        streak_ranges: One row per streak with its first and last day in "start" and
+            "end", and its length in "days".
+    """
+    starts = pl.concat([pl.Series([first]), gaps["end"] + dt.timedelta(days=1)])
+    ends = pl.concat([gaps["start"] - dt.timedelta(days=1), pl.Series([last])])
+
+    return pl.DataFrame({"start": starts, "end": ends}).with_columns(
+        ((pl.col("end") - pl.col("start")).dt.total_days() + 1).alias("days"),
+    )
+
+
+def gap_statistics(gaps: pl.DataFrame, first: dt.date, last: dt.date) -> dict:
+    """
+    Purpose:
+        Summarize the gaps and streaks of a dataset from its gaps alone, without reading
+        the dates again.
+    Args:
+        gaps: Output of missing_ranges.
+        first: Date of the first Pixel.
+        last: Date of the last Pixel.
+    Returns:
+        Dict with first_date, last_date, days_with_pixels, missing_days, gaps,
+        longest_gap, longest_streak and current_streak, the streak ending on last_date.
+    """
+    streaks = streak_ranges(gaps, first, last)
+    missing = gaps["days"].sum()
 
-    # Get min and max dates for finding missed Pixels.
-    min_date = data["date"].min()
-    max_date = data["date"].max()
-    all_dates = pl.date_range(min_date, max_date, interval="1d", eager=True)
-    all_dates = pl.DataFrame({"date": all_dates})
-    joined_dates = all_dates.join(data, on="date", how="left")
+    return {
+        "first_date": first,
+        "last_date": last,
+        "days_with_pixels": (last - first).days + 1 - missing,
+        "missing_days": missing,
+        "gaps": gaps.height,
+        "longest_gap": gaps["days"].max() or 0,
+        "longest_streak": streaks["days"].max(),
+        "current_streak": streaks["days"][-1],
+    }
 
-    missing_dates = joined_dates.filter(pl.col("average_score").is_null())
 
+def report_missing_dates(data: pl.DataFrame) -> None:
+    """
+    Purpose:
+        Print the days that were skipped and omitted from the dataset.
+    Args:
+        data: Dataset with a cleaned "date" column.
+    """
     print(
-        f"You didn't enter a Pixel for these days:\n{missing_dates}\nThese days have been omitted.",
+        f"You didn't enter a Pixel for these days:\n{missing_ranges(data)}\n"
+        "These days have been omitted.",
     )
 
+
+@instrumented()
+def clean_date(data: FrameT) -> FrameT:
+    """
+    Purpose:
+        Clean date by converting to DateTime.
+    Args:
+        data: Dataset to work on.
+    Returns:
+        data: Dataset with cleaned date columns.
+    """
+    # Convert date to DateTime format.
+    data = data.with_columns(pl.col("date").str.to_date("%Y-%m-%d")).set_sorted("date")
+
     return data
 
 
-def add_year_and_month_columns(data: pl.DataFrame) -> pl.DataFrame:
+@instrumented()
+def add_year_and_month_columns(data: FrameT) -> FrameT:
     """
     Purpose:
         Add year and month columns for further analysis as well as mean scores.
@@ -70,8 +187,8 @@ def add_year_and_month_columns(data: pl.DataFrame) -> pl.DataFrame:
     """
     # Create new columns for year and year/month.
     data = data.with_columns([
-        data["date"].dt.year().alias("year"),
-        data["date"].dt.month().alias("month"),
+        pl.col("date").dt.year().alias("year"),
+        pl.col("date").dt.month().alias("month"),
     ])
 
     # Find mean for year & year/month.
@@ -83,7 +200,8 @@ def add_year_and_month_columns(data: pl.DataFrame) -> pl.DataFrame:
     return data
 
 
-def create_word_and_char_columns(data: pl.DataFrame) -> pl.DataFrame:
+@instrumented()
+def create_word_and_char_columns(data: FrameT) -> FrameT:
     """
     Purpose:
         Convert empty "notes" entries to Null, and create "word_count" and "char_count" columns.
@@ -113,25 +231,68 @@ def create_word_and_char_columns(data: pl.DataFrame) -> pl.DataFrame:
     return data
 
 
-def data_cleaning_driver(json_path: str) -> pl.DataFrame:
+def clean_pipeline(data: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Purpose:
+        Chain every cleaning step into a single LazyFrame plan, so Polars can fuse the
+        with_columns steps and run them in parallel.
+    Args:
+        data: Raw Pixels data as a LazyFrame.
+    Returns:
+        data: LazyFrame plan of the cleaned dataset.
+    """
+    return (
+        data.pipe(daily_average_score)
+        .pipe(clean_date)
+        .pipe(add_year_and_month_columns)
+        .pipe(create_word_and_char_columns)
+    )
+
+
+@instrumented()
+def data_cleaning_driver(
+    json_path: str,
+    *,
+    lazy: bool = False,
+    sentiment: bool = False,
+    report: bool = False,
+) -> pl.DataFrame:
     """
     Purpose:
         Outline the data_cleaning pipeline and call methods in order.
     Args:
         json_path: String to JSON file. This will later be replaced by user upload.
+        lazy: Run the cleaning steps as one LazyFrame plan collected once, instead of
+            materializing a DataFrame after every step. The backup itself is still
+            read eagerly, since Polars can only scan JSON lines, not a JSON array.
+        sentiment: Add a "sentiment" polarity column, see backend.sentiment.
+        report: Print the days without a Pixel.
     Returns:
         data: Cleaned Polars DataFrame.
     """
-    data = json_to_dataframe(json_path)  # Load path to json file.
-    data = daily_average_score(data)  # Add an average score per day.
-    data = clean_date(data)  # Clean data column.
-    data = add_year_and_month_columns(data)  # Add year and month columns with mean scores.
-    data = create_word_and_char_columns(data)  # Fill null values in notes with None.
+    if lazy:
+        # The plan starts from the loaded frame, so only the steps are fused.
+        data = clean_pipeline(json_to_dataframe(json_path).lazy()).collect()
+    else:
+        data = json_to_dataframe(json_path)  # Load path to json file.
+        data = daily_average_score(data)  # Add an average score per day.
+        data = clean_date(data)  # Clean data column.
+        data = add_year_and_month_columns(data)  # Add year and month columns with mean scores.
+        data = create_word_and_char_columns(data)  # Fill null values in notes with None.
+
+    if sentiment:
+        # Imported here so cleaning alone does not load the NLP dependencies.
+        from backend.sentiment import add_sentiment_column  # noqa: PLC0415
+
+        data = add_sentiment_column(data)  # Add cached sentiment polarity per note.
+
+    if report:
+        report_missing_dates(data)
 
     return data
 
 
 if __name__ == "__main__":
     json_path = "data/PIXELS-BACKUP-2025-09-12T17_33_51.458262.json"
-    data = data_cleaning_driver(json_path)
+    data = data_cleaning_driver(json_path, report=True)
     print(data.head(-15))
@@ -0,0 +1,294 @@
+"""Description: Per-user store of cleaned Pixels history as Parquet partitioned by year."""
+
+import datetime as dt
+import re
+import sqlite3
+import time
+from collections.abc import Iterable
+from contextlib import closing
+from pathlib import Path
+
+import polars as pl
+
+from backend.cache import write_frame
+from backend.data_cleaning import PIPELINE_VERSION
+from backend.tags import TAGS_DTYPE
+
+
+DATASETS_DIR = str(Path("backend", "store", "datasets"))
+
+CATALOG_DB = str(Path("backend", "store", "catalog.sqlite"))
+
+# Seconds to wait for another process' write to the catalog.
+SQLITE_TIMEOUT = 30
+
+# User names become directory names.
+USER_PATTERN = re.compile(r"[A-Za-z0-9_.-]+")
+
+
+def connect(db_path: str = CATALOG_DB) -> sqlite3.Connection:
+    """
+    Purpose:
+        Open the catalog of stored partitions, creating it if needed. The catalog is
+        in WAL mode, so API requests read it while a job stores a dataset.
+    Args:
+        db_path: Path to SQLite database.
+    Returns:
+        Open SQLite connection returning rows as sqlite3.Row.
+    """
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(db_path, timeout=SQLITE_TIMEOUT)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS partitions (
+            user TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            path TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            first_date TEXT NOT NULL,
+            last_date TEXT NOT NULL,
+            version TEXT NOT NULL,
+            updated REAL NOT NULL,
+            PRIMARY KEY (user, year)
+        )
+        """,
+    )
+    return connection
+
+
+def partition_path(user: str, year: int, root: str = DATASETS_DIR) -> str:
+    """
+    Purpose:
+        Path of one user's partition for one year, in Hive-style directories.
+    Args:
+        user: Identifier of the user.
+        year: Year of the partition.
+        root: Root directory of the store.
+    Returns:
+        Path of the partition's Parquet file.
+    """
+    return str(Path(root, f"user={user}", f"year={year}", "data.parquet"))
+
+
+def store_dataset(
+    user: str,
+    data: pl.DataFrame,
+    years: Iterable[int] | None = None,
+    root: str = DATASETS_DIR,
+    db_path: str = CATALOG_DB,
+) -> list[str]:
+    """
+    Purpose:
+        Store a user's cleaned history, one Parquet file per year, and record the
+        partitions in the catalog.
+    Args:
+        user: Identifier of the user.
+        data: Cleaned Pixels data of the user's full history.
+        years: Years that changed, only their partitions are rewritten. If not given,
+            every year is written and stored years missing from data are removed.
+        root: Root directory of the store.
+        db_path: Path to SQLite catalog.
+    Returns:
+        Paths of the written partitions.
+    Raises:
+        ValueError: If user does not match USER_PATTERN.
+    """
+    if not USER_PATTERN.fullmatch(user):
+        msg = f"User {user!r} may only contain letters, digits, '_', '.' and '-'."
+        raise ValueError(msg)
+
+    partitions = data.sort("date").partition_by("year", as_dict=True)
+    write_years = {year for (year,) in partitions} if years is None else set(years)
+
+    written = []
+    with closing(connect(db_path)) as connection:
+        for (year,), partition in partitions.items():
+            if year not in write_years:
+                continue
+
+            path = partition_path(user, year, root)
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            write_frame(partition, path, "parquet")
+            written.append(path)
+
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO partitions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        user,
+                        year,
+                        path,
+                        partition.height,
+                        partition["date"].min().isoformat(),
+                        partition["date"].max().isoformat(),
+                        PIPELINE_VERSION,
+                        time.time(),
+                    ),
+                )
+
+        if years is None:
+            # Years no longer in the history, dropped from the catalog before their files.
+            stale = connection.execute(
+                "SELECT year, path FROM partitions WHERE user = ?",
+                (user,),
+            ).fetchall()
+            stale = [row for row in stale if (row["year"],) not in partitions]
+            with connection:
+                connection.executemany(
+                    "DELETE FROM partitions WHERE user = ? AND year = ?",
+                    [(user, row["year"]) for row in stale],
+                )
+            for row in stale:
+                Path(row["path"]).unlink(missing_ok=True)
+
+    return written
+
+
+def find_partitions(
+    users: Iterable[str] | None = None,
+    years: Iterable[int] | None = None,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+    db_path: str = CATALOG_DB,
+) -> list[sqlite3.Row]:
+    """
+    Purpose:
+        Look up the partitions a query needs in the catalog, so files of other users,
+        years, or dates are never opened. Partitions cleaned by another PIPELINE_VERSION
+        are skipped.
+    Args:
+        users: Users to include, every user if not given.
+        years: Years to include, every year if not given.
+        start: First date needed.
+        end: Last date needed.
+        db_path: Path to SQLite catalog.
+    Returns:
+        Catalog rows with user, year, path, rows, first_date and last_date.
+    """
+    clauses, params = ["version = ?"], [PIPELINE_VERSION]
+    for column, values in (("user", users), ("year", years)):
+        if values is not None:
+            matches = list(values)
+            clauses.append(f"{column} IN ({', '.join('?' * len(matches))})")
+            params.extend(matches)
+    if start is not None:
+        clauses.append("last_date >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        clauses.append("first_date <= ?")
+        params.append(end.isoformat())
+
+    # Clauses are fixed strings; values are bound as parameters.
+    query = f"SELECT * FROM partitions WHERE {' AND '.join(clauses)} ORDER BY user, year"  # noqa: S608
+    with closing(connect(db_path)) as connection:
+        return connection.execute(query, params).fetchall()
+
+
+def scan_datasets(
+    users: Iterable[str] | None = None,
+    years: Iterable[int] | None = None,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+    db_path: str = CATALOG_DB,
+) -> pl.LazyFrame:
+    """
+    Purpose:
+        Lazily scan stored history across users. Only the partitions found in the
+        catalog are scanned, and filters and column selections on the result are
+        pushed down into the Parquet reader. Partitions are stored one year at a time,
+        so their schemas may differ, e.g. "tags" is a list of nulls in years without
+        tags; tags are cast to tags.TAGS_DTYPE and columns missing from a partition
+        are null.
+    Args:
+        users: Users to include, every user if not given.
+        years: Years to include, every year if not given.
+        start: First date to include.
+        end: Last date to include.
+        db_path: Path to SQLite catalog.
+    Returns:
+        LazyFrame of cleaned Pixels data with a "user" column.
+    Raises:
+        LookupError: If no stored partition matches.
+    """
+    partitions = find_partitions(users, years, start, end, db_path)
+    if not partitions:
+        msg = "No stored Pixels match the query."
+        raise LookupError(msg)
+
+    data = pl.concat(
+        [
+            pl.scan_parquet(row["path"], hive_partitioning=False).with_columns(
+                pl.col("tags").cast(TAGS_DTYPE),
+                user=pl.lit(row["user"]),
+            )
+            for row in partitions
+        ],
+        how="diagonal_relaxed",
+    )
+
+    if start is not None:
+        data = data.filter(pl.col("date") >= start)
+    if end is not None:
+        data = data.filter(pl.col("date") <= end)
+
+    return data
+
+
+def load_user(
+    user: str,
+    years: Iterable[int] | None = None,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+    db_path: str = CATALOG_DB,
+) -> pl.DataFrame:
+    """
+    Purpose:
+        Load one user's stored history, e.g. only 2023 or only the last 90 days.
+    Args:
+        user: Identifier of the user.
+        years: Years to include, every year if not given.
+        start: First date to include.
+        end: Last date to include.
+        db_path: Path to SQLite catalog.
+    Returns:
+        Cleaned Pixels data, sorted by date. scan_datasets raises LookupError if
+        nothing is stored for the user in that range.
+    """
+    return (
+        scan_datasets([user], years, start, end, db_path).drop("user").collect().set_sorted("date")
+    )
+
+
+def user_summary(
+    years: Iterable[int] | None = None,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+    db_path: str = CATALOG_DB,
+) -> pl.DataFrame:
+    """
+    Purpose:
+        Aggregate every user's history without loading it: only the date and score
+        columns of the matching partitions are read.
+    Args:
+        years: Years to include, every year if not given.
+        start: First date to include.
+        end: Last date to include.
+        db_path: Path to SQLite catalog.
+    Returns:
+        One row per user with the number of days with a Pixel, mean score, first and
+        last date.
+    """
+    return (
+        scan_datasets(None, years, start, end, db_path)
+        .group_by("user")
+        .agg(
+            pl.col("date").n_unique().alias("days"),
+            pl.col("average_score").mean().alias("mean_score"),
+            pl.col("date").min().alias("first_date"),
+            pl.col("date").max().alias("last_date"),
+        )
+        .sort("user")
+        .collect()
+    )
@@ -0,0 +1,125 @@
+"""Description: Downsampling of time series to a target pixel width."""
+
+import itertools
+
+import numpy as np
+
+
+# Width in pixels that interactive plots are downsampled to, one point per pixel.
+PLOT_WIDTH = 1200
+
+# Downsampling methods, see lttb and minmax.
+METHODS = ("lttb", "minmax")
+
+
+def as_numeric(values: np.ndarray) -> np.ndarray:
+    """
+    Purpose:
+        Convert x values, including dates, to floats for area and bucket computations.
+    Args:
+        values: Numeric or datetime values.
+    Returns:
+        Float array.
+    """
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[s]").astype(np.int64).astype(float)
+    return values.astype(float)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Purpose:
+        Largest-Triangle-Three-Buckets: keep the point of each bucket that forms the
+        largest triangle with the previously kept point and the next bucket's mean,
+        which preserves the visual shape of the series.
+    Args:
+        x: Numeric x values, sorted.
+        y: Numeric y values without NaN.
+        n_out: Number of points to keep, at least 3.
+    Returns:
+        Sorted indices of the kept points.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    n_out = max(n_out, 3)
+
+    # First and last points are always kept, the rest is split into n_out - 2 buckets.
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (end, edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous]),
+        )
+        previous = start + int(area.argmax())
+        kept[i + 1] = previous
+
+    return kept
+
+
+def minmax(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Purpose:
+        Keep the minimum and maximum of each bucket, which preserves peaks and dips.
+    Args:
+        y: Numeric y values without NaN.
+        n_out: Number of points to keep, two per bucket.
+    Returns:
+        Sorted indices of the kept points.
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, max(n_out // 2, 1) + 1).astype(int)
+    kept = [
+        index
+        for start, end in itertools.pairwise(edges)
+        for index in (start + y[start:end].argmin(), start + y[start:end].argmax())
+    ]
+    return np.unique(kept)
+
+
+def downsample_indices(
+    x: np.ndarray,
+    y: np.ndarray,
+    width: int = PLOT_WIDTH,
+    method: str = "lttb",
+) -> np.ndarray:
+    """
+    Purpose:
+        Pick the points of a series worth drawing at a given pixel width.
+        Points with a NaN y value are dropped first.
+    Args:
+        x: x values, numeric or dates, sorted.
+        y: y values.
+        width: Target width in pixels, one point is kept per pixel.
+        method: "lttb" or "minmax".
+    Returns:
+        Sorted indices into x and y of the points to draw.
+    Raises:
+        ValueError: If method is not one of METHODS.
+    """
+    if method not in METHODS:
+        msg = f"Unknown downsampling method {method!r}, expected one of {METHODS}."
+        raise ValueError(msg)
+
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(y))
+
+    if method == "lttb":
+        kept = lttb(as_numeric(x)[valid], y[valid], width)
+    else:
+        kept = minmax(y[valid], width)
+
+    return valid[kept]
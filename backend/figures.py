@@ -0,0 +1,142 @@
+"""Description: Saving and showing figures for plots and analyses."""
+
+import os
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+
+# matplotlib and Plotly are imported by the functions using them, keeping imports fast.
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+
+# Directory figures are saved to.
+OUTPUT_DIR = "./plots"
+
+# Save figures without showing them, and export Plotly figures to files.
+HEADLESS = False
+
+# File format for Plotly exports in headless mode: "html", "png" or "svg". HTML needs
+# nothing beyond Plotly; static images need the optional kaleido package, which is not
+# in requirements.txt.
+PLOTLY_FORMAT = "html"
+
+
+def configure(
+    output_dir: str = OUTPUT_DIR,
+    *,
+    headless: bool = False,
+    plotly_format: str = PLOTLY_FORMAT,
+) -> None:
+    """
+    Purpose:
+        Set where figures go and whether they are shown.
+        Headless mode switches matplotlib to the non-interactive Agg backend.
+    Args:
+        output_dir: Directory figures are saved to.
+        headless: Save figures without showing them.
+        plotly_format: File format for Plotly exports in headless mode, see PLOTLY_FORMAT.
+    """
+    global OUTPUT_DIR, HEADLESS, PLOTLY_FORMAT  # noqa: PLW0603
+
+    OUTPUT_DIR = output_dir
+    HEADLESS = headless
+    PLOTLY_FORMAT = plotly_format
+
+    if headless:
+        # matplotlib picks its backend from MPLBACKEND when it is first imported.
+        os.environ["MPLBACKEND"] = "Agg"
+        if "matplotlib.pyplot" in sys.modules:
+            sys.modules["matplotlib.pyplot"].switch_backend("Agg")
+
+
+@contextmanager
+def configured(
+    output_dir: str = OUTPUT_DIR,
+    *,
+    headless: bool = False,
+    plotly_format: str = PLOTLY_FORMAT,
+) -> Iterator[None]:
+    """
+    Purpose:
+        Configure figures for the duration of a block, see configure, then restore
+        the previous settings, MPLBACKEND, and the pyplot backend if pyplot was
+        already imported. Rendering in a process that goes on to do other work then
+        leaves its figure settings as they were.
+    Args:
+        output_dir: Directory figures are saved to.
+        headless: Save figures without showing them.
+        plotly_format: File format for Plotly exports in headless mode, see PLOTLY_FORMAT.
+    Yields:
+        Nothing; figures are configured while the block runs.
+    """
+    global OUTPUT_DIR, HEADLESS, PLOTLY_FORMAT
+
+    settings = (OUTPUT_DIR, HEADLESS, PLOTLY_FORMAT)
+    mplbackend = os.environ.get("MPLBACKEND")
+    pyplot = sys.modules.get("matplotlib.pyplot")
+    backend = pyplot.get_backend() if pyplot else None
+
+    configure(output_dir, headless=headless, plotly_format=plotly_format)
+    try:
+        yield
+    finally:
+        OUTPUT_DIR, HEADLESS, PLOTLY_FORMAT = settings
+        if mplbackend is None:
+            os.environ.pop("MPLBACKEND", None)
+        else:
+            os.environ["MPLBACKEND"] = mplbackend
+        if backend is not None:
+            pyplot.switch_backend(backend)
+
+
+def save_figure(name: str) -> list[str]:
+    """
+    Purpose:
+        Save the current matplotlib figure, then show it, or close it in headless mode.
+    Args:
+        name: File name without extension.
+    Returns:
+        Paths of the saved files.
+    """
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+
+    Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+    path = str(Path(OUTPUT_DIR, f"{name}.png"))
+    plt.savefig(path)
+
+    if HEADLESS:
+        plt.close("all")
+    else:
+        plt.show()
+
+    return [path]
+
+
+def save_plotly_figure(fig: "go.Figure", name: str) -> list[str]:
+    """
+    Purpose:
+        Show a Plotly figure, or export it to a file in headless mode.
+    Args:
+        fig: Plotly figure.
+        name: File name without extension.
+    Returns:
+        Paths of the saved files, empty when the figure is only shown.
+    """
+    if not HEADLESS:
+        fig.show()
+        return []
+
+    Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+    path = str(Path(OUTPUT_DIR, f"{name}.{PLOTLY_FORMAT}"))
+
+    if PLOTLY_FORMAT == "html":
+        fig.write_html(path, include_plotlyjs="cdn")
+    else:
+        # Static export, needs the optional kaleido package.
+        fig.write_image(path)
+
+    return [path]
@@ -0,0 +1,140 @@
+"""Description: Incremental cleaning of successive Pixels backups."""
+
+import polars as pl
+
+from backend.data_cleaning import (
+    add_year_and_month_columns,
+    create_word_and_char_columns,
+    daily_average_score,
+    data_cleaning_driver,
+    json_to_dataframe,
+)
+from backend.datasets import CATALOG_DB, DATASETS_DIR, load_user, store_dataset
+from backend.tags import TAGS_DTYPE
+
+
+# A Pixel is identified by its day and tracker type; a day has one Pixel per type.
+KEY = ["date", "type"]
+
+
+def content_hash() -> pl.Expr:
+    """
+    Purpose:
+        Hash the raw content of each Pixel so rows can be compared across backups.
+        Empty notes hash like Null, matching how the cleaned frame stores them, and
+        tags are cast to TAGS_DTYPE so a backup without tags hashes like one with them.
+    Returns:
+        Expression with one hash per row.
+    """
+    notes = pl.when(pl.col("notes").str.len_chars() == 0).then(None).otherwise(pl.col("notes"))
+    return pl.struct(
+        pl.col("type"),
+        pl.col("scores"),
+        notes.alias("notes"),
+        pl.col("tags").cast(TAGS_DTYPE),
+    ).hash()
+
+
+def changed_rows(raw: pl.DataFrame, stored: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Diff a new backup against the stored cleaned frame, keyed by date and type.
+    Args:
+        raw: Raw Pixels data from the new backup.
+        stored: Previously cleaned Pixels data.
+    Returns:
+        raw: Raw rows, with a cleaned date, that are new or whose content changed.
+    """
+    raw = raw.with_columns(pl.col("date").str.to_date("%Y-%m-%d"))
+
+    old_hashes = stored.select(*KEY, content_hash().alias("old_hash"))
+
+    return (
+        raw.with_columns(content_hash().alias("hash"))
+        .join(old_hashes, on=KEY, how="left", maintain_order="left")
+        .filter(pl.col("old_hash").is_null() | (pl.col("hash") != pl.col("old_hash")))
+        .select(raw.columns)
+    )
+
+
+def update_partition_means(data: pl.DataFrame, changed: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Recompute yearly and monthly mean scores only for the partitions that changed.
+    Args:
+        data: Merged dataset with year and month columns.
+        changed: Cleaned rows that were added or replaced.
+    Returns:
+        data: Dataset with updated yearly_mean_score and monthly_mean_score.
+    """
+    years = changed.get_column("year").unique()
+    months = changed.select("year", "month").unique()
+
+    yearly = (
+        data.filter(pl.col("year").is_in(years.implode()))
+        .group_by("year")
+        .agg(pl.col("average_score").mean().alias("yearly_mean_score"))
+    )
+    monthly = (
+        data.join(months, on=["year", "month"], how="semi")
+        .group_by(["year", "month"])
+        .agg(pl.col("average_score").mean().alias("monthly_mean_score"))
+    )
+
+    return data.update(yearly, on="year").update(monthly, on=["year", "month"])
+
+
+def incremental_cleaning_driver(
+    json_path: str,
+    user: str,
+    root: str = DATASETS_DIR,
+    db_path: str = CATALOG_DB,
+) -> pl.DataFrame:
+    """
+    Purpose:
+        Merge a fresh full backup into the user's stored dataset, cleaning only the
+        Pixels that are new or changed and rewriting only the years they fall in.
+        Pixels missing from the new backup are kept.
+    Args:
+        json_path: Path to json file.
+        user: Identifier of the user the backup belongs to.
+        root: Root directory of the dataset store.
+        db_path: Path to SQLite catalog of the dataset store.
+    Returns:
+        data: Cleaned Polars DataFrame of the user's full history.
+    """
+    try:
+        stored = load_user(user, db_path=db_path)
+    except LookupError:
+        # First backup for this user, clean everything.
+        data = data_cleaning_driver(json_path, lazy=True)
+        store_dataset(user, data, root=root, db_path=db_path)
+        return data
+
+    changed = changed_rows(json_to_dataframe(json_path), stored)
+
+    if changed.is_empty():
+        return stored
+
+    changed = (
+        changed.lazy()
+        .pipe(daily_average_score)
+        .pipe(add_year_and_month_columns)
+        .pipe(create_word_and_char_columns)
+        .collect()
+    )
+
+    data = (
+        pl.concat(
+            [stored.join(changed.select(KEY), on=KEY, how="anti"), changed],
+            how="diagonal_relaxed",
+        )
+        .select(stored.columns)
+        .sort("date")
+    )
+    data = update_partition_means(data, changed)
+
+    # Yearly and monthly means only moved in the changed years, so other years are kept.
+    store_dataset(user, data, changed["year"].unique(), root, db_path)
+
+    return data
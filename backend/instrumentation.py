@@ -0,0 +1,325 @@
+"""Description: Opt-in timing, memory and row-count instrumentation of pipeline stages."""
+
+import cProfile
+import fnmatch
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# Settings are read from the environment, so spawned worker processes inherit them.
+ENABLED_VARIABLE = "PIXELS_INSTRUMENT"
+PROFILE_VARIABLE = "PIXELS_PROFILE"
+PROFILER_VARIABLE = "PIXELS_PROFILER"
+PROFILE_DIR_VARIABLE = "PIXELS_PROFILE_DIR"
+
+# Record every stage.
+ENABLED = os.environ.get(ENABLED_VARIABLE) == "1"
+
+# Glob patterns of stage names to profile, e.g. ("plots.*",).
+PROFILE = tuple(filter(None, os.environ.get(PROFILE_VARIABLE, "").split(",")))
+
+# "cprofile" for a deterministic profile, "pyinstrument" for a sampling one.
+PROFILER = os.environ.get(PROFILER_VARIABLE, "cprofile")
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+# Directory profiles are written to.
+PROFILE_DIR = os.environ.get(PROFILE_DIR_VARIABLE, str(Path("backend", "profiles")))
+
+# Most records kept per process; older ones are dropped, so a long-running server that
+# never resets them stays bounded.
+MAX_RECORDS = 100_000
+
+# Records of finished stages in this process, in the order they finished.
+_records: deque[dict] = deque(maxlen=MAX_RECORDS)
+
+# Records ever added in this process, including dropped ones, see mark.
+_total = 0
+_records_lock = threading.Lock()
+
+# Open stages per thread, for nesting.
+_local = threading.local()
+
+_profile_ids = itertools.count()
+
+
+def configure(
+    *,
+    enabled: bool = True,
+    profile: tuple[str, ...] = (),
+    profiler: str = "cprofile",
+    profile_dir: str = PROFILE_DIR,
+) -> None:
+    """
+    Purpose:
+        Turn instrumentation on or off for this process and processes it starts.
+    Args:
+        enabled: Record every stage.
+        profile: Glob patterns of stage names to run under a profiler, e.g. ("plots.*",).
+        profiler: "cprofile", or "pyinstrument" for a sampling profiler.
+        profile_dir: Directory profiles are written to.
+    Raises:
+        ValueError: If profiler is not one of PROFILERS.
+    """
+    global ENABLED, PROFILE, PROFILER, PROFILE_DIR
+
+    if profiler not in PROFILERS:
+        msg = f"Unknown profiler {profiler!r}, expected one of {PROFILERS}."
+        raise ValueError(msg)
+
+    ENABLED, PROFILE, PROFILER, PROFILE_DIR = enabled, tuple(profile), profiler, profile_dir
+
+    os.environ[ENABLED_VARIABLE] = "1" if enabled else "0"
+    os.environ[PROFILE_VARIABLE] = ",".join(PROFILE)
+    os.environ[PROFILER_VARIABLE] = profiler
+    os.environ[PROFILE_DIR_VARIABLE] = profile_dir
+
+
+def mark() -> int:
+    """
+    Purpose:
+        Position in the records of this process, for reading only the stages that
+        finish after it with records(since=...).
+    Returns:
+        Number of records added so far, including dropped ones.
+    """
+    return _total
+
+
+def records(since: int | None = None) -> list[dict]:
+    """
+    Purpose:
+        Records of the stages finished in this process so far, at most MAX_RECORDS.
+    Args:
+        since: A mark, to only return the records added after it.
+    Returns:
+        One dict per stage with its name, start, wall and CPU seconds, peak RSS delta,
+        rows in and out, process and thread.
+    """
+    with _records_lock:
+        stages = list(_records)
+        added = _total if since is None else _total - since
+    return stages[len(stages) - min(added, len(stages)) :]
+
+
+def extend(stages: list[dict]) -> None:
+    """
+    Purpose:
+        Add records of stages, e.g. ones that ran in another process like a render
+        worker, dropping the oldest beyond MAX_RECORDS.
+    Args:
+        stages: Records to add.
+    """
+    global _total  # noqa: PLW0603
+
+    with _records_lock:
+        _records.extend(stages)
+        _total += len(stages)
+
+
+def reset() -> None:
+    """
+    Purpose:
+        Forget every record, e.g. before a long-lived worker starts its next job.
+    """
+    with _records_lock:
+        _records.clear()
+
+
+def row_count(value: object) -> int | None:
+    """
+    Purpose:
+        Rows of a frame, series or array, without importing their libraries.
+    Args:
+        value: Any value.
+    Returns:
+        Number of rows, None for values without a shape such as a LazyFrame.
+    """
+    shape = getattr(value, "shape", None)
+    return shape[0] if isinstance(shape, tuple) and shape else None
+
+
+def peak_rss() -> int | None:
+    """
+    Purpose:
+        Highest resident memory of this process so far.
+    Returns:
+        Bytes, None where the resource module is not available.
+    """
+    try:
+        import resource  # noqa: PLC0415
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def profiled(name: str) -> Iterator[None]:
+    """
+    Purpose:
+        Run a stage under the configured profiler if its name matches PROFILE, and write
+        the profile to PROFILE_DIR.
+    Args:
+        name: Stage name.
+    """
+    if not any(fnmatch.fnmatchcase(name, pattern) for pattern in PROFILE):
+        yield
+        return
+
+    Path(PROFILE_DIR).mkdir(parents=True, exist_ok=True)
+    path = Path(PROFILE_DIR, f"{name}-{os.getpid()}-{next(_profile_ids)}")
+
+    if PROFILER == "pyinstrument":
+        # Optional dependency, only needed for sampling profiles.
+        from pyinstrument import Profiler  # noqa: PLC0415
+
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            path.with_name(f"{path.name}.html").write_text(
+                profiler.output_html(),
+                encoding="utf-8",
+            )
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(path.with_name(f"{path.name}.prof"))
+
+
+@contextmanager
+def stage(name: str, data: object = None) -> Iterator[dict]:
+    """
+    Purpose:
+        Record the wall time, CPU time, peak RSS delta and row counts of a block.
+        Set "rows_out" on the yielded record to count the block's output.
+        Does nothing unless instrumentation is enabled, see configure.
+    Args:
+        name: Stage name, e.g. "cleaning.clean_date".
+        data: Input of the stage, used to count rows in.
+    Yields:
+        The stage's record, filled in once the block finishes.
+    """
+    record = {"name": name}
+    if not ENABLED:
+        yield record
+        return
+
+    stack = _local.__dict__.setdefault("stack", [])
+    record.update(
+        rows_in=row_count(data),
+        rows_out=None,
+        parent=stack[-1]["name"] if stack else None,
+        pid=os.getpid(),
+        tid=threading.get_ident(),
+        start=time.time(),
+    )
+    stack.append(record)
+
+    rss_before = peak_rss()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    try:
+        with profiled(name):
+            yield record
+    finally:
+        record["wall_seconds"] = time.perf_counter() - wall_start
+        record["cpu_seconds"] = time.process_time() - cpu_start
+        rss_after = peak_rss()
+        record["peak_rss_delta"] = None if rss_before is None else rss_after - rss_before
+        stack.pop()
+        extend([record])
+
+
+def instrumented(name: str | None = None) -> Callable[[Callable], Callable]:
+    """
+    Purpose:
+        Decorator recording every call of a function as a stage, with the rows of its
+        first argument in and of its return value out.
+    Args:
+        name: Stage name, "<module>.<function>" if not given.
+    Returns:
+        Decorator.
+    """
+
+    def decorator(function: Callable) -> Callable:
+        stage_name = name or f"{function.__module__.rsplit('.', 1)[-1]}.{function.__name__}"
+
+        @functools.wraps(function)
+        def wrapper(*args: object, **kwargs: object) -> object:
+            if not ENABLED:
+                return function(*args, **kwargs)
+
+            with stage(stage_name, args[0] if args else None) as record:
+                result = function(*args, **kwargs)
+                record["rows_out"] = row_count(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def write_json_log(path: str, stages: list[dict] | None = None) -> None:
+    """
+    Purpose:
+        Write stage records as JSON lines, one record per line.
+    Args:
+        path: Path of the log file.
+        stages: Records to write, every record of this process if not given.
+    """
+    stages = records() if stages is None else stages
+    with Path(path).open("w", encoding="utf-8") as file:
+        file.writelines(json.dumps(record) + "\n" for record in stages)
+
+
+def write_chrome_trace(path: str, stages: list[dict] | None = None) -> None:
+    """
+    Purpose:
+        Write stage records in the Chrome trace event format, for chrome://tracing
+        or Perfetto. Nested stages show up nested on their thread.
+    Args:
+        path: Path of the trace file.
+        stages: Records to write, every record of this process if not given.
+    """
+    stages = records() if stages is None else stages
+    origin = min((record["start"] for record in stages), default=0.0)
+
+    events = [
+        {
+            "name": record["name"],
+            "cat": record["name"].split(".", 1)[0],
+            "ph": "X",
+            "ts": (record["start"] - origin) * 1e6,
+            "dur": record["wall_seconds"] * 1e6,
+            "pid": record["pid"],
+            "tid": record["tid"],
+            "args": {
+                "cpu_seconds": record["cpu_seconds"],
+                "peak_rss_delta": record["peak_rss_delta"],
+                "rows_in": record["rows_in"],
+                "rows_out": record["rows_out"],
+            },
+        }
+        for record in stages
+    ]
+    with Path(path).open("w", encoding="utf-8") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
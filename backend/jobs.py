@@ -0,0 +1,287 @@
+"""Description: Background jobs that clean and render uploaded backups."""
+
+import multiprocessing
+import os
+import sqlite3
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from pathlib import Path
+
+import psutil
+
+from backend import datasets, instrumentation
+from backend.cache import (
+    cached_calendar,
+    cached_cleaning_driver,
+    cached_rolling_statistics,
+    cached_tag_statistics,
+    file_hash,
+)
+from backend.render import render_all_graphs
+from backend.rolling import with_rolling_statistics
+
+
+JOBS_DB = str(Path("backend", "store", "jobs.sqlite"))
+
+REPORTS_DIR = str(Path("backend", "reports"))
+
+# Jobs running at once. Each job renders in its own process, so this uses every core.
+JOB_WORKERS = os.cpu_count() or 1
+
+# Plotly figures of reports are interactive HTML, which needs no extra packages.
+PLOTLY_FORMAT = "html"
+
+_executor = None
+
+
+def connect(db_path: str = JOBS_DB) -> sqlite3.Connection:
+    """
+    Purpose:
+        Open the job store, creating it if needed. The store is in WAL mode, so the
+        server reads job status while workers record progress.
+    Args:
+        db_path: Path to SQLite database.
+    Returns:
+        Open SQLite connection returning rows as sqlite3.Row.
+    """
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(db_path, timeout=30)
+    connection.row_factory = sqlite3.Row
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            output_dir TEXT NOT NULL,
+            status TEXT NOT NULL,
+            progress REAL NOT NULL,
+            message TEXT,
+            created REAL NOT NULL,
+            updated REAL NOT NULL,
+            pid INTEGER NOT NULL,
+            started REAL NOT NULL
+        )
+        """,
+    )
+    return connection
+
+
+def process_running(pid: int, started: float) -> bool:
+    """
+    Purpose:
+        Check that a process is still running. PIDs are reused after a restart, and a
+        containerized server is always PID 1, so the process must also have been
+        started at the same time.
+    Args:
+        pid: Process id.
+        started: Creation time of the process, from psutil.Process.create_time.
+    Returns:
+        Whether the process with that id is the one started at that time.
+    """
+    try:
+        return psutil.Process(pid).create_time() == started
+    except psutil.Error:
+        return False
+
+
+def report_dir(job_id: str) -> str:
+    """
+    Purpose:
+        Directory a job's report is written to.
+    Args:
+        job_id: Identifier of the job.
+    Returns:
+        Path to the job's report directory.
+    """
+    return str(Path(REPORTS_DIR, job_id))
+
+
+def create_job(json_path: str, db_path: str = JOBS_DB) -> str:
+    """
+    Purpose:
+        Record a new queued job, with its report going to a directory of its own.
+        The job belongs to this process, whose worker pool runs it.
+    Args:
+        json_path: Path to the uploaded json file.
+        db_path: Path to SQLite database of jobs.
+    Returns:
+        job_id: Identifier of the new job.
+    """
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    process = psutil.Process()
+
+    with closing(connect(db_path)) as connection, connection:
+        connection.execute(
+            "INSERT INTO jobs VALUES (?, ?, ?, 'queued', 0, NULL, ?, ?, ?, ?)",
+            (job_id, json_path, report_dir(job_id), now, now, process.pid, process.create_time()),
+        )
+
+    return job_id
+
+
+def update_job(
+    job_id: str,
+    status: str,
+    progress: float,
+    message: str | None = None,
+    db_path: str = JOBS_DB,
+) -> None:
+    """
+    Purpose:
+        Record a job's progress.
+    Args:
+        job_id: Identifier of the job.
+        status: "queued", "cleaning", "rendering", "done" or "failed".
+        progress: Fraction of the job that is done, from 0 to 1.
+        message: Details, like the error of a failed job.
+        db_path: Path to SQLite database of jobs.
+    """
+    with closing(connect(db_path)) as connection, connection:
+        connection.execute(
+            "UPDATE jobs SET status = ?, progress = ?, message = ?, updated = ? WHERE id = ?",
+            (status, progress, message, time.time(), job_id),
+        )
+
+
+def get_job(job_id: str, db_path: str = JOBS_DB) -> dict | None:
+    """
+    Purpose:
+        Look up a job.
+    Args:
+        job_id: Identifier of the job.
+        db_path: Path to SQLite database of jobs.
+    Returns:
+        The job's columns, or None if there is no such job.
+    """
+    with closing(connect(db_path)) as connection:
+        row = connection.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+    return None if row is None else dict(row)
+
+
+def fail_interrupted_jobs(db_path: str = JOBS_DB) -> int:
+    """
+    Purpose:
+        Mark unfinished jobs whose process has exited as failed. Their worker pool
+        exited with that process, so they would never finish. A process is identified
+        by its id and creation time, see process_running.
+    Args:
+        db_path: Path to SQLite database of jobs.
+    Returns:
+        Number of jobs marked as failed.
+    """
+    with closing(connect(db_path)) as connection, connection:
+        rows = connection.execute(
+            "SELECT id, pid, started FROM jobs WHERE status IN ('queued', 'cleaning', 'rendering')",
+        ).fetchall()
+        interrupted = [
+            (time.time(), row["id"])
+            for row in rows
+            if not process_running(row["pid"], row["started"])
+        ]
+        connection.executemany(
+            "UPDATE jobs SET status = 'failed', message = 'Interrupted by a server restart.', "
+            "updated = ? WHERE id = ?",
+            interrupted,
+        )
+
+    return len(interrupted)
+
+
+def find_job(json_path: str, db_path: str = JOBS_DB) -> dict | None:
+    """
+    Purpose:
+        Look up the latest job for a file that has not failed, to reuse its report.
+        Jobs interrupted by a server restart are failed first, so they are not reused.
+    Args:
+        json_path: Path to the uploaded json file.
+        db_path: Path to SQLite database of jobs.
+    Returns:
+        The job's columns, or None if the file has no such job.
+    """
+    fail_interrupted_jobs(db_path)
+
+    with closing(connect(db_path)) as connection:
+        row = connection.execute(
+            "SELECT * FROM jobs WHERE path = ? AND status != 'failed' "
+            "ORDER BY created DESC LIMIT 1",
+            (json_path,),
+        ).fetchone()
+
+    return None if row is None else dict(row)
+
+
+def run_job(job_id: str, json_path: str, output_dir: str, db_path: str = JOBS_DB) -> None:
+    """
+    Purpose:
+        Clean an uploaded backup and render its report, recording progress as it goes.
+    Args:
+        job_id: Identifier of the job.
+        json_path: Path to the uploaded json file.
+        output_dir: Directory the report is written to.
+        db_path: Path to SQLite database of jobs.
+    """
+    # Job workers are reused, so each job's trace starts empty.
+    instrumentation.reset()
+    try:
+        update_job(job_id, "cleaning", 0.1, db_path=db_path)
+        with instrumentation.stage("jobs.cleaning") as record:
+            cleaned = cached_cleaning_driver(json_path)
+            # Uploads are named by their content hash, which names the stored dataset.
+            dataset_id = Path(json_path).stem
+            datasets.store_dataset(dataset_id, cleaned)
+            # Precomputed for the calendar and tags API, which never read the rows.
+            cached_calendar(json_path)
+            cached_tag_statistics(json_path)
+            data = with_rolling_statistics(cleaned, cached_rolling_statistics(json_path))
+            record["rows_out"] = data.height
+
+        update_job(job_id, "rendering", 0.4, db_path=db_path)
+        with instrumentation.stage("jobs.rendering", data):
+            manifest = render_all_graphs(
+                data,
+                output_dir,
+                max_workers=1,
+                plotly_format=PLOTLY_FORMAT,
+                dataset_hash=file_hash(json_path),
+            )
+
+        if instrumentation.ENABLED:
+            instrumentation.write_json_log(str(Path(output_dir, "stages.jsonl")))
+            instrumentation.write_chrome_trace(str(Path(output_dir, "trace.json")))
+
+        failed = [plot["name"] for plot in manifest["plots"] if plot["error"]]
+        message = f"Failed plots: {', '.join(failed)}" if failed else None
+        update_job(job_id, "done", 1.0, message, db_path=db_path)
+    except Exception as exc:
+        update_job(job_id, "failed", 1.0, f"{type(exc).__name__}: {exc}", db_path=db_path)
+        raise
+
+
+def submit_job(json_path: str, db_path: str = JOBS_DB) -> str:
+    """
+    Purpose:
+        Queue a backup for cleaning and rendering on the local worker pool.
+    Args:
+        json_path: Path to the uploaded json file.
+        db_path: Path to SQLite database of jobs.
+    Returns:
+        job_id: Identifier of the queued job, for polling with get_job.
+    """
+    global _executor  # noqa: PLW0603
+
+    if _executor is None:
+        # Forking after Polars has started its thread pool can deadlock.
+        _executor = ProcessPoolExecutor(
+            JOB_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    job_id = create_job(json_path, db_path)
+    _executor.submit(run_job, job_id, json_path, report_dir(job_id), db_path)
+
+    return job_id
@@ -1,24 +1,422 @@
-"""Description: Main for pixels analysis."""
+"""Description: Command-line batch analysis of Pixels backups."""
 
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
 import polars as pl
-import datetime as dt
 
-from src.analysis import compare_average_score_with_term
-from src.data_cleaning import data_cleaning_driver
-from src.plots import plot_all_graphs
+from backend import aggregates, calendar_view, scores, tags
+from backend.analysis import compare_average_score_with_terms
+from backend.cache import cached_cleaning_driver, cached_rolling_statistics, file_hash
+from backend.data_cleaning import data_cleaning_driver, missing_ranges, streak_ranges
+from backend.plots import PLOTS
+from backend.render import render_all_graphs
+from backend.render_cache import RENDER_CACHE_DIR
+from backend.rolling import rolling_statistics, with_rolling_statistics
+
+
+# Directory outputs are written to, one subdirectory per backup.
+OUTPUT_DIR = str(Path("backend", "reports", "batch"))
+
+# Table formats by file extension.
+FORMATS = {"parquet": "parquet", "csv": "csv"}
+
+
+def write_tables(tables: dict[str, pl.DataFrame], output_dir: str, fmt: str) -> list[str]:
+    """
+    Purpose:
+        Write tables to files named after them.
+    Args:
+        tables: Frames by name.
+        output_dir: Directory the files are written to.
+        fmt: "parquet" or "csv".
+    Returns:
+        Paths of the written files.
+    """
+    paths = []
+    for name, table in tables.items():
+        path = str(Path(output_dir, f"{name}.{FORMATS[fmt]}"))
+        if fmt == "csv":
+            # CSV has no categorical type.
+            table.with_columns(pl.col(pl.Categorical).cast(pl.String)).write_csv(path)
+        else:
+            table.write_parquet(path)
+        paths.append(path)
+    return paths
+
+
+def write_means(data: pl.DataFrame, output_dir: str, fmt: str) -> list[str]:
+    """
+    Purpose:
+        Write the mean score and number of days per month and per year.
+    Args:
+        data: Cleaned Pixels data.
+        output_dir: Directory the files are written to.
+        fmt: "parquet" or "csv".
+    Returns:
+        Paths of the written files.
+    """
+    return write_tables(
+        {
+            "monthly_means": aggregates.monthly_means(data),
+            "yearly_means": aggregates.yearly_means(data),
+        },
+        output_dir,
+        fmt,
+    )
+
+
+def write_gaps(data: pl.DataFrame, output_dir: str, fmt: str) -> list[str]:
+    """
+    Purpose:
+        Write the runs of missing days and of days with a Pixel.
+    Args:
+        data: Cleaned Pixels data.
+        output_dir: Directory the files are written to.
+        fmt: "parquet" or "csv".
+    Returns:
+        Paths of the written files.
+    """
+    gaps = missing_ranges(data)
+    streaks = streak_ranges(gaps, data["date"].min(), data["date"].max())
+    return write_tables({"missing_ranges": gaps, "streaks": streaks}, output_dir, fmt)
+
+
+def write_scores(data: pl.DataFrame, output_dir: str, fmt: str) -> list[str]:
+    """
+    Purpose:
+        Write the score statistics per tracker type and slot.
+    Args:
+        data: Cleaned Pixels data.
+        output_dir: Directory the files are written to.
+        fmt: "parquet" or "csv".
+    Returns:
+        Paths of the written files.
+    """
+    tables = {f"scores_{name}": table for name, table in scores.score_statistics(data).items()}
+    return write_tables(tables, output_dir, fmt)
+
+
+def write_tags(data: pl.DataFrame, output_dir: str, fmt: str) -> list[str]:
+    """
+    Purpose:
+        Write the exploded tags, their means, co-occurrence matrix and month pivot.
+    Args:
+        data: Cleaned Pixels data.
+        output_dir: Directory the files are written to.
+        fmt: "parquet" or "csv".
+    Returns:
+        Paths of the written files.
+    """
+    tables = {f"tags_{name}": table for name, table in tags.tag_statistics(data).items()}
+    return write_tables(tables, output_dir, fmt)
+
+
+def write_calendar(data: pl.DataFrame, output_dir: str, _fmt: str) -> list[str]:
+    """
+    Purpose:
+        Write the calendar artifacts as NumPy arrays, see calendar_view.build_calendar.
+    Args:
+        data: Cleaned Pixels data.
+        output_dir: Directory the file is written to.
+        _fmt: Table format, unused since arrays are always written as .npz.
+    Returns:
+        Path of the written file.
+    """
+    path = str(Path(output_dir, "calendar.npz"))
+    np.savez(path, **calendar_view.build_calendar(data))
+    return [path]
+
+
+# Analyses by name, each writing its tables for a cleaned frame and returning their paths.
+ANALYSES: dict[str, Callable[[pl.DataFrame, str, str], list[str]]] = {
+    "means": write_means,
+    "gaps": write_gaps,
+    "scores": write_scores,
+    "tags": write_tags,
+    "calendar": write_calendar,
+}
+
+
+def find_backups(paths: list[str]) -> list[str]:
+    """
+    Purpose:
+        Expand files and directories of backups into a list of backup files.
+    Args:
+        paths: Backup files, or directories whose json files are all backups.
+    Returns:
+        Backup files, each directory's in name order.
+    Raises:
+        FileNotFoundError: If a path is neither a file nor a directory.
+    """
+    backups = []
+    for path in paths:
+        if Path(path).is_dir():
+            backups.extend(
+                str(backup)
+                for backup in sorted(Path(path).iterdir())
+                if backup.suffix == ".json" and backup.is_file()
+            )
+        elif Path(path).is_file():
+            backups.append(path)
+        else:
+            msg = f"No backup or directory at {path!r}."
+            raise FileNotFoundError(msg)
+    return backups
+
+
+def output_dirs(backups: list[str], output_dir: str) -> list[str]:
+    """
+    Purpose:
+        Name one output directory per backup after its file, numbering repeated names.
+    Args:
+        backups: Backup files.
+        output_dir: Directory the output directories are created in.
+    Returns:
+        Output directory per backup.
+    """
+    seen: dict[str, int] = {}
+    dirs = []
+    for backup in backups:
+        name = Path(backup).stem
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            name = f"{name}-{seen[name]}"
+        dirs.append(str(Path(output_dir, name)))
+    return dirs
+
+
+def process_backup(  # noqa: PLR0913
+    json_path: str,
+    output_dir: str,
+    analyses: list[str],
+    plots: list[str],
+    terms: list[str],
+    *,
+    fmt: str = "parquet",
+    plotly_format: str = "html",
+    cache: bool = True,
+) -> dict:
+    """
+    Purpose:
+        Clean one backup, write the selected analyses and render the selected plots,
+        timing each phase. A failing backup is recorded instead of stopping the batch.
+    Args:
+        json_path: Path to json file.
+        output_dir: Directory the backup's outputs are written to.
+        analyses: Names of analyses in ANALYSES.
+        plots: Names of plots in plots.PLOTS.
+        terms: Search terms to compare scores of days with and without, if any.
+        fmt: Table format, "parquet" or "csv".
+        plotly_format: File format for Plotly exports: "png", "svg" or "html".
+        cache: Read and store the cleaned frame, rolling statistics and renders in
+            their caches.
+    Returns:
+        Summary with the backup, output directory, rows, seconds per phase and analysis,
+        written paths, failed plots, and error if any.
+    """
+    summary = {
+        "path": json_path,
+        "output_dir": output_dir,
+        "rows": None,
+        "seconds": {},
+        "paths": [],
+        "failed_plots": [],
+        "error": None,
+    }
+    start = time.perf_counter()
+    try:
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+        phase_start = time.perf_counter()
+        if cache:
+            data = cached_cleaning_driver(json_path)
+        else:
+            data = data_cleaning_driver(json_path, lazy=True)
+        summary["rows"] = data.height
+        summary["seconds"]["cleaning"] = time.perf_counter() - phase_start
+
+        for name in analyses:
+            phase_start = time.perf_counter()
+            summary["paths"] += ANALYSES[name](data, output_dir, fmt)
+            summary["seconds"][name] = time.perf_counter() - phase_start
+
+        if terms:
+            phase_start = time.perf_counter()
+            result = compare_average_score_with_terms(data, terms)
+            summary["paths"] += write_tables({"terms": result}, output_dir, fmt)
+            summary["seconds"]["terms"] = time.perf_counter() - phase_start
+
+        if plots:
+            phase_start = time.perf_counter()
+            statistics = cached_rolling_statistics(json_path) if cache else rolling_statistics(data)
+            manifest = render_all_graphs(
+                with_rolling_statistics(data, statistics),
+                str(Path(output_dir, "plots")),
+                plots,
+                max_workers=1,
+                plotly_format=plotly_format,
+                cache_dir=RENDER_CACHE_DIR if cache else None,
+                dataset_hash=file_hash(json_path),
+            )
+            summary["paths"] += [path for plot in manifest["plots"] for path in plot["paths"]]
+            summary["failed_plots"] = [plot["name"] for plot in manifest["plots"] if plot["error"]]
+            summary["seconds"]["plots"] = time.perf_counter() - phase_start
+    except Exception as exc:  # noqa: BLE001
+        summary["error"] = f"{type(exc).__name__}: {exc}"
+
+    summary["seconds"]["total"] = time.perf_counter() - start
+    return summary
+
+
+def run_batch(  # noqa: PLR0913
+    backups: list[str],
+    output_dir: str = OUTPUT_DIR,
+    *,
+    analyses: list[str] | None = None,
+    plots: list[str] | None = None,
+    terms: list[str] | None = None,
+    max_workers: int | None = None,
+    **options: object,
+) -> list[dict]:
+    """
+    Purpose:
+        Process backups concurrently, one per worker process, and write a summary.json
+        of every backup's timings to output_dir.
+    Args:
+        backups: Backup files.
+        output_dir: Directory with one output directory per backup.
+        analyses: Names of analyses in ANALYSES, all if not given.
+        plots: Names of plots in plots.PLOTS, all if not given.
+        terms: Search terms to compare, none if not given.
+        max_workers: Worker processes, defaults to one per backup up to every core.
+            With 1, backups are processed in this process without a pool.
+        **options: fmt, plotly_format and cache, see process_backup.
+    Returns:
+        Summary of every backup, in the order given.
+    Raises:
+        ValueError: If an analysis or plot is unknown.
+    """
+    analyses = list(ANALYSES) if analyses is None else analyses
+    plots = list(PLOTS) if plots is None else plots
+    unknown = (set(analyses) - set(ANALYSES)) | (set(plots) - set(PLOTS))
+    if unknown:
+        msg = f"Unknown analyses or plots {sorted(unknown)}."
+        raise ValueError(msg)
+
+    arguments = [
+        (backup, backup_dir, analyses, plots, terms or [])
+        for backup, backup_dir in zip(backups, output_dirs(backups, output_dir), strict=True)
+    ]
+
+    if max_workers == 1 or len(backups) <= 1:
+        summaries = [process_backup(*args, **options) for args in arguments]
+    else:
+        # Forking after Polars has started its thread pool can deadlock.
+        with ProcessPoolExecutor(
+            max_workers or min(len(backups), os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = [pool.submit(process_backup, *args, **options) for args in arguments]
+            summaries = [future.result() for future in futures]
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    with Path(output_dir, "summary.json").open("w", encoding="utf-8") as file:
+        json.dump(summaries, file, indent=2)
+
+    return summaries
+
+
+def format_summary(summary: dict) -> str:
+    """
+    Purpose:
+        One line of timings for a processed backup.
+    Args:
+        summary: Output of process_backup.
+    Returns:
+        Line with the backup, its rows, total seconds and seconds per phase, or its
+        error.
+    """
+    seconds = summary["seconds"]
+    if summary["error"]:
+        return f"{summary['path']}: failed after {seconds['total']:.2f}s: {summary['error']}"
+
+    phases = ", ".join(f"{name} {value:.2f}s" for name, value in seconds.items() if name != "total")
+    line = f"{summary['path']}: {summary['rows']} Pixels in {seconds['total']:.2f}s ({phases})"
+    if summary["failed_plots"]:
+        line += f", failed plots: {', '.join(summary['failed_plots'])}"
+    return line
 
 
-json_path = "data/PIXELS-BACKUP-2025-09-12T17_33_51.458262.json"
+def main(argv: list[str] | None = None) -> int:
+    """
+    Purpose:
+        Command-line entry point, see --help.
+    Args:
+        argv: Arguments, sys.argv if not given.
+    Returns:
+        Exit status: 0 if every backup was processed, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.main",
+        description="Clean, analyze and plot Pixels backups in parallel.",
+    )
+    parser.add_argument("paths", nargs="+", help="Backup files, or directories of backups.")
+    parser.add_argument("-o", "--output-dir", default=OUTPUT_DIR, help="Directory of outputs.")
+    parser.add_argument(
+        "--analyses",
+        nargs="*",
+        choices=list(ANALYSES),
+        help="Analyses to write, all if not given and none if given without names.",
+    )
+    parser.add_argument(
+        "--plots",
+        nargs="*",
+        choices=list(PLOTS),
+        help="Plots to render, all if not given and none if given without names.",
+    )
+    parser.add_argument("--terms", nargs="+", help="Search terms to compare scores for.")
+    parser.add_argument("-j", "--workers", type=int, help="Worker processes.")
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet", dest="fmt")
+    parser.add_argument("--plotly-format", choices=["png", "svg", "html"], default="html")
+    parser.add_argument(
+        "--no-cache",
+        action="store_false",
+        dest="cache",
+        help="Clean and render every backup again instead of reading the caches.",
+    )
+    args = parser.parse_args(argv)
 
-data = data_cleaning_driver(json_path)
+    try:
+        backups = find_backups(args.paths)
+    except FileNotFoundError as exc:
+        parser.error(str(exc))
 
-print(data.head(-15))
+    summaries = run_batch(
+        backups,
+        args.output_dir,
+        analyses=args.analyses,
+        plots=args.plots,
+        terms=args.terms,
+        max_workers=args.workers,
+        fmt=args.fmt,
+        plotly_format=args.plotly_format,
+        cache=args.cache,
+    )
 
-# TODO: React? AWS? User upload? Local cached json/dataframe data?
+    for summary in summaries:
+        print(format_summary(summary))
 
-data_pd = data.to_pandas()
-plot_all_graphs(data_pd)
+    return 0 if all(summary["error"] is None for summary in summaries) else 1
 
 
-search_term = "watch"
-compare_average_score_with_term(data_pd, search_term, 5)
+if __name__ == "__main__":
+    sys.exit(main())
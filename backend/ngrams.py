@@ -0,0 +1,101 @@
+"""Description: Sparse word and bigram frequency counting for notes."""
+
+import string
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from backend.instrumentation import instrumented
+
+
+# pandas and scikit-learn are imported on first use, keeping imports fast.
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Number of top words to analyze.
+TOP_N = 20
+
+# Language to use for word analysis.
+LANGUAGE = "english"
+
+
+def preprocess_text(note: str) -> str:
+    """
+    Purpose:
+        Cleans note string by casting to lower case and remove punctuation.
+    Args:
+        note: String from note.
+    Returns:
+        note: Cleaned string for note.
+    """
+    # Null notes are None in Polars and NaN in pandas.
+    if not isinstance(note, str):
+        return ""
+
+    note = note.lower()
+    note = note.translate(str.maketrans("", "", string.punctuation))
+    return note
+
+
+def top_terms(terms: np.ndarray, counts: np.ndarray, top_n: int, label: str) -> "pd.DataFrame":
+    """
+    Purpose:
+        Select the top_n most frequent terms with a partial sort.
+    Args:
+        terms: Array of terms.
+        counts: Total count per term.
+        top_n: How many terms to return.
+        label: Column name for the terms.
+    Returns:
+        DataFrame of terms and counts, most frequent first.
+    """
+    import pandas as pd  # noqa: PLC0415
+
+    top_n = min(top_n, len(counts))
+    if top_n == 0:
+        return pd.DataFrame({label: terms[:0], "count": counts[:0]})
+
+    # Only the top_n candidates are fully sorted.
+    top = np.argpartition(counts, -top_n)[-top_n:]
+    top = top[np.argsort(-counts[top], kind="stable")]
+
+    return pd.DataFrame({label: terms[top], "count": counts[top]})
+
+
+@instrumented()
+def ngram_counts(
+    notes: Iterable[str | None],
+    language: str,
+    top_n: int,
+) -> tuple["pd.DataFrame", "pd.DataFrame"]:
+    """
+    Purpose:
+        Count words and bigrams in notes with a single tokenization pass.
+        Counts are summed on the sparse document-term matrix and never densified.
+    Args:
+        notes: Notes to count, Null notes are treated as empty.
+        language: Language used in notes for removing stop words.
+        top_n: How many words and bigrams to return.
+    Returns:
+        words: Top words and their counts.
+        bigrams: Top bigrams and their counts.
+    """
+    from sklearn.feature_extraction.text import CountVectorizer  # noqa: PLC0415
+
+    vectorizer = CountVectorizer(stop_words=language, ngram_range=(1, 2))
+    try:
+        term_counts = vectorizer.fit_transform(map(preprocess_text, notes))
+    except ValueError:
+        # Every note is empty or only stop words.
+        terms, counts = np.array([], dtype=str), np.array([], dtype=int)
+        return top_terms(terms, counts, 0, "word"), top_terms(terms, counts, 0, "bigram")
+
+    terms = vectorizer.get_feature_names_out()
+    counts = np.asarray(term_counts.sum(axis=0)).ravel()
+    is_bigram = np.char.find(terms.astype(str), " ") >= 0
+
+    words = top_terms(terms[~is_bigram], counts[~is_bigram], top_n, "word")
+    bigrams = top_terms(terms[is_bigram], counts[is_bigram], top_n, "bigram")
+
+    return words, bigrams
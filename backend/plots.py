@@ -1,69 +1,257 @@
 """Description: Methods for data cleaning for pixel EDA."""
 
-import string
-from typing import NoReturn
+import functools
+import inspect
+from collections.abc import Callable
+from typing import TYPE_CHECKING, NoReturn
 
-import matplotlib.pyplot as plt
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import seaborn as sns
-from sklearn.feature_extraction.text import CountVectorizer
-from textblob import TextBlob
+import polars as pl
 
+from backend import figures, rolling
+from backend.calendar_view import build_calendar, plot_calendar
+from backend.downsample import PLOT_WIDTH, downsample_indices
+from backend.figures import save_figure, save_plotly_figure
+from backend.instrumentation import instrumented
+from backend.ngrams import LANGUAGE, TOP_N, ngram_counts
+from backend.render_cache import RENDER_CACHE_DIR, cached_render
+from backend.sentiment import score_notes
+
+
+# matplotlib, seaborn and Plotly are imported by the plots using them, so importing this
+# module, e.g. for PLOTS, stays fast.
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Formatting.
 headline1 = "\n----------|"
 headline2 = "|----------\n"
 headline3 = "|---|"
 
-# Number of top words to analyze.
-TOP_N = 20
+# Downsampling method of the interactive time series, see backend.downsample.
+DOWNSAMPLE_METHOD = "lttb"
+
+# Plot arguments computed from the data, which the dataset hash already covers.
+DERIVED_ARGUMENTS = ("data", "ngrams")
+
+
+def plot_params(
+    plot: Callable,
+    data: pl.DataFrame,
+    *args: object,
+    plotly_format: str | None = None,
+    **kwargs: object,
+) -> dict:
+    """
+    Purpose:
+        Everything besides the dataset's content that a plot's figures depend on, for
+        keying them in the render cache.
+    Args:
+        plot: Plot from PLOTS.
+        data: Polars Dataframe with Pixels data.
+        *args: Further positional arguments of the plot.
+        plotly_format: File format for Plotly exports, figures.PLOTLY_FORMAT if not given.
+        **kwargs: Further keyword arguments of the plot.
+    Returns:
+        The plot's arguments with their defaults, except DERIVED_ARGUMENTS, the columns
+        of data, the Plotly export format, and the module settings of the plot.
+    """
+    arguments = inspect.signature(plot).bind(data, *args, **kwargs)
+    arguments.apply_defaults()
+
+    return {
+        **{
+            name: value
+            for name, value in arguments.arguments.items()
+            if name not in DERIVED_ARGUMENTS
+        },
+        "columns": data.columns,
+        "plotly_format": plotly_format or figures.PLOTLY_FORMAT,
+        **plot.settings(),
+    }
+
+
+def cached_plot(settings: Callable[[], dict] = dict) -> Callable[[Callable], Callable]:
+    """
+    Purpose:
+        Serve a plot's figures from the render cache in headless mode, see
+        render_cache.cached_render. The decorated plot also takes the keyword-only
+        arguments dataset_hash and cache_dir of cached_render.
+    Args:
+        settings: Returns the module settings the plot depends on, read on every call so
+            changed settings render again.
+    Returns:
+        Decorator for a plot.
+    """
+
+    def decorator(plot: Callable) -> Callable:
+        @functools.wraps(plot)
+        def wrapper(
+            data: pl.DataFrame,
+            *args: object,
+            dataset_hash: str | None = None,
+            cache_dir: str | None = RENDER_CACHE_DIR,
+            **kwargs: object,
+        ) -> list[str]:
+            return cached_render(
+                plot.__name__,
+                plot_params(wrapper, data, *args, **kwargs),
+                lambda: plot(data, *args, **kwargs),
+                data,
+                dataset_hash=dataset_hash,
+                cache_dir=cache_dir,
+            )
+
+        wrapper.settings = settings
+        return wrapper
+
+    return decorator
+
+
+def ngram_settings() -> dict:
+    """
+    Purpose:
+        Module settings of the word and bigram plots.
+    Returns:
+        Settings by name.
+    """
+    return {"top_n": TOP_N}
+
+
+def downsample_settings() -> dict:
+    """
+    Purpose:
+        Module settings of the downsampled interactive plots.
+    Returns:
+        Settings by name.
+    """
+    return {"plot_width": PLOT_WIDTH, "downsample_method": DOWNSAMPLE_METHOD}
 
-# Language to use for word analysis.
-LANGUAGE = "english"
+
+def rolling_settings() -> dict:
+    """
+    Purpose:
+        Module settings of the downsampled plots of rolling statistics, including the
+        windows and statistics the cached rolling columns are computed for.
+    Returns:
+        Settings by name.
+    """
+    return {
+        **downsample_settings(),
+        "windows": rolling.WINDOWS,
+        "centered_windows": rolling.CENTERED_WINDOWS,
+        "ewm_half_lives": rolling.EWM_HALF_LIVES,
+        "statistics": rolling.STATISTICS,
+    }
+
+
+def rolling_columns(
+    data: pl.DataFrame,
+    statistics: list[str],
+    window: int,
+    *,
+    centered: bool = False,
+) -> pl.DataFrame:
+    """
+    Purpose:
+        Rolling statistics of the daily score over one window, read from data when it
+        already has them, see cache.cached_rolling_statistics, and computed otherwise.
+    Args:
+        data: Polars Dataframe with Pixels data, sorted by date.
+        statistics: Statistics of rolling.STATISTICS.
+        window: Window size in days.
+        centered: Whether the window is centered on each Pixel instead of trailing.
+    Returns:
+        The columns, named by rolling.rolling_column and aligned with data.
+    """
+    columns = [
+        rolling.rolling_column(statistic, window, centered=centered) for statistic in statistics
+    ]
+    if set(columns) <= set(data.columns):
+        return data.select(columns)
+
+    windows = {"windows": (), "centered_windows": (), "half_lives": ()}
+    windows["centered_windows" if centered else "windows"] = (window,)
+    statistics = rolling.rolling_statistics(data.select("date", "average_score"), **windows)
+    return statistics.select(columns)
 
 
-def heatmap_of_nulls(data: pd.DataFrame) -> NoReturn:
+@cached_plot()
+@instrumented()
+def heatmap_of_nulls(data: pl.DataFrame) -> list[str]:
     """
     Purpose:
         Generate graph of heatmap of null values.
     Args:
         data: Polars Dataframe with Pixels data.
+    Returns:
+        Paths of the saved figures.
     """
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+    import seaborn as sns  # noqa: PLC0415
+
     plt.figure(figsize=(10, 6))
-    sns.heatmap(data.isna(), cbar=False, cmap="inferno")
+    sns.heatmap(
+        data.select(pl.all().is_null()).to_numpy(),
+        cbar=False,
+        cmap="inferno",
+        xticklabels=data.columns,
+    )
     plt.title("Heatmap of Missing Data")
     plt.xlabel("Columns")
     plt.ylabel("Rows")
 
-    plt.savefig("./plots/heatmap_of_nulls.png")
-    plt.show()
+    return save_figure("heatmap_of_nulls")
 
 
-def interactive_line_plot(data: pd.DataFrame) -> NoReturn:
+@cached_plot(downsample_settings)
+@instrumented()
+def interactive_line_plot(data: pl.DataFrame) -> list[str]:
     """
     Purpose:
-        Generative interactive plot of monthly mean.
-        TODO: Doesn't show the date when you interact with the graph.
+        Generative interactive plot of monthly mean, downsampled to PLOT_WIDTH points.
     Args:
         data: Polars Dataframe with Pixels data.
+    Returns:
+        Paths of the saved figures.
     """
-    fig = px.line(data, x=data.index, y="monthly_mean_score", title="Score Over Time")
-    fig.show()
+    import plotly.express as px  # noqa: PLC0415
+
+    points = data.select("date", "monthly_mean_score")
+    points = points[
+        downsample_indices(
+            points["date"],
+            points["monthly_mean_score"],
+            PLOT_WIDTH,
+            DOWNSAMPLE_METHOD,
+        )
+    ]
+
+    fig = px.line(points, x="date", y="monthly_mean_score", title="Score Over Time")
+    return save_plotly_figure(fig, "interactive_line_plot")
 
 
-def interactive_seasonal_plot(data: pd.DataFrame) -> NoReturn:
+@cached_plot(rolling_settings)
+@instrumented()
+def interactive_seasonal_plot(data: pl.DataFrame, window_size: int = 7) -> list[str]:
     """
     Purpose:
-        Generative seasonality plot.
+        Generative seasonality plot, downsampled to PLOT_WIDTH points.
     Args:
         data: Polars Dataframe with Pixels data.
+        window_size: Days of the centered rolling mean the score is smoothed with.
+    Returns:
+        Paths of the saved figures.
     """
-    data["smoothed"] = data["average_score"].rolling(window=7, center=True).mean()
+    import plotly.express as px  # noqa: PLC0415
+
+    smoothed = rolling_columns(data, ["mean"], window_size, centered=True)
+    points = data.select("date", "year", smoothed.to_series().alias("smoothed"))
+    points = points[
+        downsample_indices(points["date"], points["smoothed"], PLOT_WIDTH, DOWNSAMPLE_METHOD)
+    ]
 
     fig = px.line(
-        data,
+        points,
         x="date",
         y="smoothed",
         color="year",
@@ -71,71 +259,79 @@ def interactive_seasonal_plot(data: pd.DataFrame) -> NoReturn:
         title="Seasonal Plot of Score Across Years",
     )
     fig.update_layout(xaxis_title="month", yaxis_title="Average Score")
-    fig.show()
+    return save_plotly_figure(fig, "interactive_seasonal_plot")
 
 
-def interactive_rolling_statistics_plot(data: pd.DataFrame) -> NoReturn:
+@cached_plot(rolling_settings)
+@instrumented()
+def interactive_rolling_statistics_plot(data: pl.DataFrame, window_size: int = 30) -> list[str]:
     """
     Purpose:
         Generative rolling statistic plot that has a standard deviation.
+        Each trace is downsampled to PLOT_WIDTH points.
     Args:
         data: Polars Dataframe with Pixels data.
+        window_size: Days of the trailing rolling window.
+    Returns:
+        Paths of the saved figures.
     """
-    window_size = 30
-
-    rolling_mean = data["average_score"].rolling(window=window_size).mean()
-    rolling_std = data["average_score"].rolling(window=window_size).std()
+    import plotly.graph_objects as go  # noqa: PLC0415
+
+    mean = rolling.rolling_column("mean", window_size)
+    std = rolling.rolling_column("std", window_size)
+    statistics = rolling_columns(data, ["mean", "std"], window_size)
+
+    dates = data["date"].to_numpy()
+    traces = {
+        # Average score.
+        "Score": data["average_score"].to_numpy(),
+        # Rolling mean based on window size.
+        f"{window_size}-Day Rolling Mean": statistics[mean].to_numpy(),
+        # Rolling standard deviation based on window size.
+        f"{window_size}-Day Rolling Std Dev": statistics[std].to_numpy(),
+    }
 
     fig = go.Figure()
 
-    # Average score.
-    fig.add_trace(go.Scatter(x=data["date"], y=data["average_score"], mode="lines", name="Score"))
-
-    # Rolling mean based on window size.
-    fig.add_trace(
-        go.Scatter(
-            x=data["date"],
-            y=rolling_mean,
-            mode="lines",
-            name=f"{window_size}-Day Rolling Mean",
-        ),
-    )
-
-    # Rolling standard deviation based on window size.
-    fig.add_trace(
-        go.Scatter(
-            x=data["date"],
-            y=rolling_std,
-            mode="lines",
-            name=f"{window_size}-Day Rolling Std Dev",
-        ),
-    )
+    for name, values in traces.items():
+        points = downsample_indices(dates, values, PLOT_WIDTH, DOWNSAMPLE_METHOD)
+        fig.add_trace(go.Scatter(x=dates[points], y=values[points], mode="lines", name=name))
 
     fig.update_layout(
         title="Rolling Statistics Plot: Score Over Time",
         xaxis_title="Date",
         yaxis_title="Score",
     )
-    fig.show()
+    return save_plotly_figure(fig, "interactive_rolling_statistics_plot")
 
 
-def box_plot(data: pd.DataFrame) -> NoReturn:
+@cached_plot()
+@instrumented()
+def box_plot(data: pl.DataFrame) -> list[str]:
     """
     Purpose:
         Box plot of monthly and yearly averages.
     Args:
         data: Polars Dataframe with Pixels data.
+    Returns:
+        Paths of the saved figures.
     """
+    import plotly.express as px  # noqa: PLC0415
+
+    scores = data.select("year", "month", "average_score")
+
     # Monthly box plots.
-    fig = px.box(data, x="month", y="average_score", title="Boxplot: Score by Month")
-    fig.show()
+    fig = px.box(scores, x="month", y="average_score", title="Boxplot: Score by Month")
+    paths = save_plotly_figure(fig, "box_plot_month")
 
     # Annual box plots.
-    fig = px.box(data, x="year", y="average_score", title="Boxplot: Score by Year")
-    fig.show()
+    fig = px.box(scores, x="year", y="average_score", title="Boxplot: Score by Year")
+    return paths + save_plotly_figure(fig, "box_plot_year")
 
 
-def verbosity_plots(data: pd.DataFrame) -> NoReturn:
+@cached_plot()
+@instrumented()
+def verbosity_plots(data: pl.DataFrame) -> list[str]:
     """
     Purpose:
         Show a figure of four analytic plots:
@@ -145,14 +341,20 @@ def verbosity_plots(data: pd.DataFrame) -> NoReturn:
             4. Bar plot of word count per year
     Args:
         data: Polars Dataframe with Pixels data.
+    Returns:
+        Paths of the saved figures.
     """
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+    import seaborn as sns  # noqa: PLC0415
+
     fig, axs = plt.subplots(2, 2, figsize=(16, 10))
+    scores = data["average_score"].to_numpy()
+    word_counts = data["word_count"].to_numpy()
 
     # regressional plot of word count vs. score
     sns.regplot(
-        x="average_score",
-        y="word_count",
-        data=data,
+        x=scores,
+        y=word_counts,
         scatter_kws={"s": 50},
         line_kws={"color": "red"},
         ax=axs[0, 0],
@@ -162,59 +364,47 @@ def verbosity_plots(data: pd.DataFrame) -> NoReturn:
     axs[0, 0].set_ylabel("Word Count (per day)")
 
     # line plot of word count over time
-    sns.lineplot(data, x=data.index, y="word_count", ax=axs[0, 1], color="darkred")
+    sns.lineplot(x=range(len(word_counts)), y=word_counts, ax=axs[0, 1], color="darkred")
     axs[0, 1].set_title("Word Count on Timeline")
     axs[0, 1].set_xlabel("Date")
     axs[0, 1].set_ylabel("Word Count")
 
     # heatmap of word count over year and month
-    heatmap_data = data.groupby(["year", "month"])["word_count"].mean().pivot_table()
+    monthly_words = data.group_by("year", "month").agg(pl.col("word_count").mean()).sort("month")
+    # Polars' pivot, which pandas-vet mistakes for DataFrame.pivot.
+    heatmap_data = monthly_words.pivot(on="month", index="year", values="word_count")  # noqa: PD010
+    heatmap_data = heatmap_data.sort("year").to_pandas().set_index("year")
     sns.heatmap(heatmap_data, annot=True, fmt=".2f", annot_kws={"size": 10}, ax=axs[1, 0])
     axs[1, 0].set_title("Heatmap of Word Count over Years & Months")
 
     # bar plot of word count per year
+    yearly = data.group_by("year").agg(pl.col("word_count").mean()).sort("year")
     fig = sns.barplot(
-        data,
-        x="year",
-        y="word_count",
+        x=yearly["year"].to_numpy(),
+        y=yearly["word_count"].to_numpy(),
         palette="viridis",
-        hue="year",
+        hue=yearly["year"].to_numpy(),
         legend=False,
-        errorbar=None,
         ax=axs[1, 1],
     )
-    fig.bar_label(fig.containers[1], fontsize=10)
-    fig.bar_label(fig.containers[0], fontsize=10)
-    fig.bar_label(fig.containers[2], fontsize=10)
-    fig.bar_label(fig.containers[3], fontsize=10)
+    for container in fig.containers:
+        fig.bar_label(container, fontsize=10)
     axs[1, 1].set_title("Average Word Count per day by Year")
     axs[1, 1].set_xlabel("Year")
     axs[1, 1].set_ylabel("Average Word Count")
 
     # Show plot
     plt.tight_layout()
-    plt.savefig("./verbosity_plots.png")
-    plt.show()
+    return save_figure("verbosity_plots")
 
 
-def preprocess_text(note: str) -> str:
-    """
-    Purpose:
-        Cleans note string by casting to lower case and remove punctuation.
-    Args:
-        note: String from note.
-    Returns:
-        note: Cleaned string for note.
-    """
-    if note is None:
-        return ""
-
-    note = note.lower()
-    note = note.translate(str.maketrans("", "", string.punctuation))
-    return note
-
-
-def top_common_words(data: pd.DataFrame, language: str) -> NoReturn:
+@cached_plot(ngram_settings)
+@instrumented()
+def top_common_words(
+    data: pl.DataFrame,
+    language: str = LANGUAGE,
+    ngrams: tuple["pd.DataFrame", "pd.DataFrame"] | None = None,
+) -> list[str]:
     """
     Purpose:
         Show common words used in notes.
@@ -223,27 +413,23 @@ def top_common_words(data: pd.DataFrame, language: str) -> NoReturn:
     Args:
         data: Polars Dataframe with Pixels data.
         language: Language used in notes for matching words.
+        ngrams: Output of ngram_counts to reuse, counted from data if not given.
+    Returns:
+        Paths of the saved figures.
     """
-    data["cleaned_notes"] = data["notes"].apply(preprocess_text)
-
-    # Use CountVectorizer to count word occurrences.
-    vectorizer = CountVectorizer(stop_words=language)
-    word_count = vectorizer.fit_transform(data["cleaned_notes"])
-
-    # Create a DataFrame with word counts
-    word_counts = pd.DataFrame(word_count.toarray(), columns=vectorizer.get_feature_names_out())
-    total_word_counts = word_counts.sum().sort_values(ascending=False)
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+    import seaborn as sns  # noqa: PLC0415
 
-    # Convert to DataFrame for better visualization.
-    word_counts_df = pd.DataFrame(total_word_counts).reset_index()
-    word_counts_df.columns = ["word", "count"]
+    if ngrams is None:
+        ngrams = ngram_counts(data["notes"], language, TOP_N)
+    word_counts_df = ngrams[0]
 
     # Visualize the most common words.
     plt.figure(figsize=(12, 6))
     ax = sns.barplot(
         x="count",
         y="word",
-        data=word_counts_df.head(TOP_N),
+        data=word_counts_df,
         palette="magma",
         hue="word",
         legend=False,
@@ -257,78 +443,71 @@ def top_common_words(data: pd.DataFrame, language: str) -> NoReturn:
         width = p.get_width()
         ax.text(width + 0.5, p.get_y() + p.get_height() / 2, f"{int(width)}", va="center")
 
-    plt.savefig("./top_common_words.png")
-    plt.show()
-
-
-def get_sentiment(text: str) -> float:
-    """
-    Purpose:
-        Analyses text and returns a sentiment polarity.
-    Args:
-        text: Text to perform analysis on.
-    Returns:
-        Float for sentiment polarity.
-    """
-    # Some notes are null.
-    if not text:
-        return 0.0
-
-    # Returns a score between -1 and 1 as a "sentiment polarity".
-    return TextBlob(text).sentiment.polarity
+    return save_figure("top_common_words")
 
 
-def sentiment_vs_score(data: pd.DataFrame) -> NoReturn:
+@cached_plot()
+@instrumented()
+def sentiment_vs_score(data: pl.DataFrame) -> list[str]:
     """
     Purpose:
         Plot that shows sentiment analysis of daily note vs. score for notes.
         This shows how on good days, the sentiment analysis is usually good,
         while usually poor on bad days.
+        Uses the "sentiment" column from add_sentiment_column when present.
     Args:
         data: Polars Dataframe with Pixels data.
+    Returns:
+        Paths of the saved figures.
     """
-    data_notes_only = data.dropna(subset=["notes"])
-    data_notes_only["sentiment"] = data_notes_only["notes"].apply(get_sentiment)
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+    import seaborn as sns  # noqa: PLC0415
+
+    data_notes_only = data.filter(pl.col("notes").is_not_null())
+    if "sentiment" in data_notes_only.columns:
+        sentiment = data_notes_only["sentiment"].to_numpy()
+    else:
+        sentiment = score_notes(data_notes_only["notes"])
 
     plt.figure(figsize=(10, 6))
-    sns.scatterplot(x="sentiment", y="average_score", data=data_notes_only)
+    sns.scatterplot(x=sentiment, y=data_notes_only["average_score"].to_numpy())
     plt.title("Sentiment vs. Score")
     plt.xlabel("Sentiment Score")
     plt.ylabel("Score")
 
-    plt.savefig("./sentiment_vs_score.png")
-    plt.show()
+    return save_figure("sentiment_vs_score")
 
 
-def top_bigrams(data: pd.DataFrame, language: str) -> NoReturn:
+@cached_plot(ngram_settings)
+@instrumented()
+def top_bigrams(
+    data: pl.DataFrame,
+    language: str = LANGUAGE,
+    ngrams: tuple["pd.DataFrame", "pd.DataFrame"] | None = None,
+) -> list[str]:
     """
     Purpose:
         Shows most common biagrams in notes.
     Args:
-        data: Pandas DataFrame of pixels data.
+        data: Polars Dataframe with Pixels data.
         language: Language used in notes for matching words.
+        ngrams: Output of ngram_counts to reuse, counted from data if not given.
+    Returns:
+        Paths of the saved figures.
     """
-    data["cleaned_notes"] = data["notes"].apply(preprocess_text)
-
-    # Bigram analysis.
-    vectorizer = CountVectorizer(stop_words=language, ngram_range=(2, 2))
-    bigram_count = vectorizer.fit_transform(data["cleaned_notes"])
-    bigram_counts = pd.DataFrame(
-        bigram_count.toarray(),
-        columns=vectorizer.get_feature_names_out(),
-    )
-    total_bigram_counts = bigram_counts.sum().sort_values(ascending=False)
+    import matplotlib.pyplot as plt  # noqa: PLC0415
+    import seaborn as sns  # noqa: PLC0415
 
-    # Convert to DataFrame for visualization.
-    bigram_counts_df = pd.DataFrame(total_bigram_counts).reset_index()
-    bigram_counts_df.columns = ["bigram", "count"]
+    if ngrams is None:
+        ngrams = ngram_counts(data["notes"], language, TOP_N)
+    bigram_counts_df = ngrams[1]
 
     # Visualize top bigrams.
     plt.figure(figsize=(12, 6))
     ax = sns.barplot(
         x="count",
         y="bigram",
-        data=bigram_counts_df.head(TOP_N),
+        data=bigram_counts_df,
         palette="viridis",
         hue="bigram",
     )
@@ -340,21 +519,52 @@ def top_bigrams(data: pd.DataFrame, language: str) -> NoReturn:
         width = p.get_width()
         ax.text(width + 0.5, p.get_y() + p.get_height() / 2, f"{int(width)}", va="center")
 
-    plt.savefig("./plots/top_bigrams.png")
-    plt.show()
+    return save_figure("top_bigrams")
 
 
-def plot_all_graphs(data: pd.DataFrame) -> NoReturn:
+@cached_plot()
+@instrumented()
+def calendar_heatmap(data: pl.DataFrame) -> list[str]:
     """
     Purpose:
-        Driver to plot all graphs after converting to Polars to Pandas.
+        Generate the year-in-pixels calendar and weekday by month heatmaps.
+    Args:
+        data: Polars Dataframe with Pixels data.
+    Returns:
+        Paths of the saved figures.
     """
+    return plot_calendar(build_calendar(data))
+
+
+# Plots by name, for selecting and rendering them in batches.
+PLOTS = {
+    "heatmap_of_nulls": heatmap_of_nulls,
+    "interactive_line_plot": interactive_line_plot,
+    "interactive_seasonal_plot": interactive_seasonal_plot,
+    "interactive_rolling_statistics_plot": interactive_rolling_statistics_plot,
+    "box_plot": box_plot,
+    "verbosity_plots": verbosity_plots,
+    "top_common_words": top_common_words,
+    "sentiment_vs_score": sentiment_vs_score,
+    "top_bigrams": top_bigrams,
+    "calendar_heatmap": calendar_heatmap,
+}
+
+
+def plot_all_graphs(data: pl.DataFrame) -> NoReturn:
+    """
+    Purpose:
+        Driver to plot all graphs.
+    """
+    # Words and bigrams share one tokenization pass.
+    # ngrams = ngram_counts(data["notes"], LANGUAGE, TOP_N)
+
     # heatmap_of_nulls(data)
     # interactive_line_plot(data)
     # interactive_seasonal_plot(data)
     # interactive_rolling_statistics_plot(data)
     # box_plot(data)
     # verbosity_plots(data)
-    # top_common_words(data, LANGUAGE)
+    # top_common_words(data, LANGUAGE, ngrams)
     # sentiment_vs_score(data)
-    # top_bigrams(data, LANGUAGE)
+    # top_bigrams(data, LANGUAGE, ngrams)
@@ -0,0 +1,207 @@
+"""Description: Headless, parallel batch rendering of plots."""
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import polars as pl
+
+from backend import figures, instrumentation
+from backend.cache import frame_hash
+from backend.plots import PLOTS, plot_params
+from backend.render_cache import RENDER_CACHE_DIR, load_render, render_key, store_render
+
+
+# Dataset of the current worker process, set once by init_worker.
+_data = None
+
+
+def init_worker(data: pl.DataFrame, output_dir: str, plotly_format: str) -> None:
+    """
+    Purpose:
+        Set up a worker process for headless rendering, receiving the dataset once.
+    Args:
+        data: Polars DataFrame of Pixels data.
+        output_dir: Directory figures are saved to.
+        plotly_format: File format for Plotly exports.
+    """
+    global _data  # noqa: PLW0603
+
+    _data = data
+    figures.configure(output_dir, headless=True, plotly_format=plotly_format)
+
+
+def render_plot(name: str, data: pl.DataFrame | None = None) -> dict:
+    """
+    Purpose:
+        Render one plot and time it.
+        A failing plot is recorded in its manifest entry instead of stopping the batch.
+    Args:
+        name: Name of the plot in plots.PLOTS.
+        data: Polars DataFrame of Pixels data, the worker's from init_worker if not
+            given.
+    Returns:
+        Manifest entry with the plot's name, saved paths, seconds, and error if any,
+        and the records of its instrumented stages.
+    """
+    first_stage = instrumentation.mark()
+    start = time.perf_counter()
+    try:
+        # The parent process looks figures up in the render cache and stores them.
+        paths, error = PLOTS[name](_data if data is None else data, cache_dir=None), None
+    except Exception as exc:  # noqa: BLE001
+        paths, error = [], f"{type(exc).__name__}: {exc}"
+
+    return {
+        "name": name,
+        "paths": paths,
+        "seconds": time.perf_counter() - start,
+        "error": error,
+        "stages": instrumentation.records(since=first_stage),
+    }
+
+
+def load_cached_plots(keys: dict[str, str], output_dir: str, cache_dir: str) -> dict[str, dict]:
+    """
+    Purpose:
+        Copy the plots found in the render cache to output_dir.
+    Args:
+        keys: Render cache key per plot name.
+        output_dir: Directory figures are copied to.
+        cache_dir: Render cache directory.
+    Returns:
+        Manifest entry per plot found in the cache.
+    """
+    results = {}
+    for name, key in keys.items():
+        start = time.perf_counter()
+        paths = load_render(key, output_dir, cache_dir)
+        if paths is not None:
+            results[name] = {
+                "name": name,
+                "paths": paths,
+                "seconds": time.perf_counter() - start,
+                "error": None,
+                "cached": True,
+            }
+    return results
+
+
+def render_plots(
+    data: pl.DataFrame,
+    names: list[str],
+    output_dir: str,
+    max_workers: int | None,
+    plotly_format: str,
+) -> list[dict]:
+    """
+    Purpose:
+        Render plots concurrently in a process pool, or in this process with one worker.
+    Args:
+        data: Polars DataFrame of Pixels data.
+        names: Names of plots in plots.PLOTS.
+        output_dir: Directory figures are saved to.
+        max_workers: Worker processes, defaults to one per plot up to every core.
+        plotly_format: File format for Plotly exports.
+    Returns:
+        Manifest entry per plot, see render_plot, without stage records.
+    """
+    if max_workers == 1:
+        # Render in this process, e.g. when it already is one of several workers. Its
+        # figure settings are restored afterwards.
+        with figures.configured(output_dir, headless=True, plotly_format=plotly_format):
+            rendered = [render_plot(name, data) for name in names]
+        for result in rendered:
+            # Already recorded in this process.
+            del result["stages"]
+        return rendered
+
+    if not names:
+        return []
+
+    # Forking after Polars has started its thread pool can deadlock.
+    with ProcessPoolExecutor(
+        max_workers or min(len(names), os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(data, output_dir, plotly_format),
+    ) as pool:
+        rendered = list(pool.map(render_plot, names))
+    for result in rendered:
+        instrumentation.extend(result.pop("stages"))
+    return rendered
+
+
+def render_all_graphs(  # noqa: PLR0913
+    data: pl.DataFrame,
+    output_dir: str,
+    plots: list[str] | None = None,
+    *,
+    max_workers: int | None = None,
+    plotly_format: str = figures.PLOTLY_FORMAT,
+    cache_dir: str | None = RENDER_CACHE_DIR,
+    dataset_hash: str | None = None,
+) -> dict:
+    """
+    Purpose:
+        Render plots without a display, concurrently in a process pool, and write them
+        with a manifest.json to output_dir. Figures already in the render cache for the
+        same dataset and parameters, see plots.plot_params, are copied instead of
+        rendered.
+    Args:
+        data: Polars DataFrame of Pixels data.
+        output_dir: Directory figures and the manifest are saved to.
+        plots: Names of plots in plots.PLOTS to render, all plots if not given.
+        max_workers: Worker processes, defaults to one per plot up to every core.
+            With 1, plots are rendered in this process without a pool.
+        plotly_format: File format for Plotly exports: "html", or "png" or "svg" with
+            the optional kaleido package installed.
+        cache_dir: Render cache directory, None to always render.
+        dataset_hash: Content hash of data, e.g. its backup's file_hash. Hashed from
+            data if not given.
+    Returns:
+        manifest: Output directory, total seconds, and one entry per plot.
+    Raises:
+        ValueError: If a name in plots is not in plots.PLOTS.
+    """
+    plots = list(PLOTS) if plots is None else plots
+    unknown = set(plots) - set(PLOTS)
+    if unknown:
+        msg = f"Unknown plots {sorted(unknown)}, expected names from {list(PLOTS)}."
+        raise ValueError(msg)
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+
+    keys = {}
+    results = {}
+    if cache_dir is not None:
+        dataset_hash = dataset_hash or frame_hash(data)
+        keys = {
+            name: render_key(
+                dataset_hash,
+                name,
+                plot_params(PLOTS[name], data, plotly_format=plotly_format),
+            )
+            for name in plots
+        }
+        results = load_cached_plots(keys, output_dir, cache_dir)
+
+    missing = [name for name in plots if name not in results]
+    for result in render_plots(data, missing, output_dir, max_workers, plotly_format):
+        results[result["name"]] = {**result, "cached": False}
+        if cache_dir is not None and result["error"] is None:
+            store_render(keys[result["name"]], result["paths"], cache_dir)
+
+    manifest = {
+        "output_dir": output_dir,
+        "seconds": time.perf_counter() - start,
+        "plots": [results[name] for name in plots],
+    }
+    with Path(output_dir, "manifest.json").open("w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+
+    return manifest
@@ -0,0 +1,140 @@
+"""Description: On-disk cache of rendered figures."""
+
+import hashlib
+import json
+import shutil
+from collections.abc import Callable
+from pathlib import Path
+
+import polars as pl
+
+from backend import figures
+from backend.cache import CACHE_DIR, atomic_write, evict_lru, frame_hash, touch
+
+
+RENDER_CACHE_DIR = str(Path(CACHE_DIR, "renders"))
+
+# Upper bound for the total size of cached figures in bytes.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def render_key(dataset_hash: str, name: str, params: dict) -> str:
+    """
+    Purpose:
+        Build the cache key of a rendered figure.
+    Args:
+        dataset_hash: Content hash of the plotted dataset.
+        name: Name of the plot function.
+        params: Arguments and settings the figure depends on.
+    Returns:
+        Hex SHA-256 digest of the dataset hash, plot name, and parameters.
+    """
+    payload = json.dumps(
+        {"dataset": dataset_hash, "plot": name, "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_render(
+    key: str,
+    output_dir: str,
+    cache_dir: str = RENDER_CACHE_DIR,
+) -> list[str] | None:
+    """
+    Purpose:
+        Copy cached figures to output_dir.
+    Args:
+        key: Cache key from render_key.
+        output_dir: Directory the figures are copied to.
+        cache_dir: Render cache directory.
+    Returns:
+        Paths of the copied figures, or None if the entry is missing or partly evicted.
+    """
+    index_path = Path(cache_dir, f"{key}.json")
+    try:
+        names = json.loads(index_path.read_text(encoding="utf-8"))
+
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        paths = []
+        for name in names:
+            blob = str(Path(cache_dir, f"{key}.{name}"))
+            touch(blob)
+            paths.append(shutil.copyfile(blob, Path(output_dir, name)))
+        touch(str(index_path))
+    except FileNotFoundError:
+        # Not cached, or evicted by another process while copying.
+        return None
+
+    return [str(path) for path in paths]
+
+
+def store_render(
+    key: str,
+    paths: list[str],
+    cache_dir: str = RENDER_CACHE_DIR,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> None:
+    """
+    Purpose:
+        Save rendered figures as cache blobs, then trim the cache to max_bytes.
+    Args:
+        key: Cache key from render_key.
+        paths: Paths of the rendered figures.
+        cache_dir: Render cache directory.
+        max_bytes: Upper bound for the total size of the render cache in bytes.
+    """
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+
+    names = [Path(path).name for path in paths]
+    for name, path in zip(names, paths, strict=True):
+        with Path(path).open("rb") as source:
+            atomic_write(
+                str(Path(cache_dir, f"{key}.{name}")),
+                lambda file, source=source: shutil.copyfileobj(source, file),
+            )
+
+    # The index is written last, so an entry is only visible once every blob exists.
+    atomic_write(
+        str(Path(cache_dir, f"{key}.json")),
+        lambda file: file.write(json.dumps(names).encode("utf-8")),
+    )
+
+    evict_lru(cache_dir, max_bytes)
+
+
+def cached_render(  # noqa: PLR0913
+    name: str,
+    params: dict,
+    render: Callable[[], list[str]],
+    data: pl.DataFrame,
+    *,
+    dataset_hash: str | None = None,
+    cache_dir: str | None = RENDER_CACHE_DIR,
+) -> list[str]:
+    """
+    Purpose:
+        Copy a figure from the render cache to figures.OUTPUT_DIR, rendering and
+        storing it on a miss. Figures are only cached in headless mode; otherwise they
+        are shown, so they are always rendered.
+    Args:
+        name: Name of the plot or analysis drawing the figure.
+        params: Arguments and settings the figure depends on besides data.
+        render: Draws and saves the figure, returning the saved paths.
+        data: Dataset the figure is drawn from.
+        dataset_hash: Content hash of data, e.g. its backup's file_hash. Hashed from
+            data if not given.
+        cache_dir: Render cache directory, None to always render.
+    Returns:
+        Paths of the saved figures.
+    """
+    if not figures.HEADLESS or cache_dir is None:
+        return render()
+
+    key = render_key(dataset_hash or frame_hash(data), name, params)
+    paths = load_render(key, figures.OUTPUT_DIR, cache_dir)
+    if paths is None:
+        paths = render()
+        store_render(key, paths, cache_dir)
+    return paths
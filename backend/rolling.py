@@ -0,0 +1,128 @@
+"""Description: Rolling statistics of the daily score over calendar windows."""
+
+import polars as pl
+
+from backend.data_cleaning import FrameT
+
+
+# Trailing windows in days.
+WINDOWS = (7, 30)
+
+# Windows in days centered on each Pixel, used for smoothing.
+CENTERED_WINDOWS = (7,)
+
+# Half-lives in days of exponentially weighted means.
+EWM_HALF_LIVES = (7, 30)
+
+# Statistics computed over every window.
+STATISTICS = ("mean", "std", "median")
+
+
+def rolling_column(statistic: str, window: int, *, centered: bool = False) -> str:
+    """
+    Purpose:
+        Name of the column holding a rolling statistic.
+    Args:
+        statistic: "mean", "std" or "median".
+        window: Window size in days.
+        centered: Whether the window is centered on each Pixel instead of trailing.
+    Returns:
+        Column name, e.g. "mean_30d" or "centered_mean_7d".
+    """
+    name = f"{statistic}_{window}d"
+    return f"centered_{name}" if centered else name
+
+
+def ewm_column(half_life: int) -> str:
+    """
+    Purpose:
+        Name of the column holding an exponentially weighted mean.
+    Args:
+        half_life: Half-life in days.
+    Returns:
+        Column name, e.g. "ewm_7d".
+    """
+    return f"ewm_{half_life}d"
+
+
+def window_expressions(score: pl.Expr, window: int, by: str | None = None) -> list[pl.Expr]:
+    """
+    Purpose:
+        Every statistic of STATISTICS over one window.
+    Args:
+        score: Expression of the score.
+        window: Window size in days.
+        by: Date column for trailing windows, None inside a rolling context where the
+            window is already given.
+    Returns:
+        One expression per statistic, named by rolling_column.
+    """
+    if by is None:
+        expressions = [getattr(score, statistic)() for statistic in STATISTICS]
+    else:
+        expressions = [
+            getattr(score, f"rolling_{statistic}_by")(by, f"{window}d") for statistic in STATISTICS
+        ]
+    return [
+        expression.alias(rolling_column(statistic, window, centered=by is None))
+        for statistic, expression in zip(STATISTICS, expressions, strict=True)
+    ]
+
+
+def rolling_statistics(
+    data: FrameT,
+    windows: tuple[int, ...] = WINDOWS,
+    centered_windows: tuple[int, ...] = CENTERED_WINDOWS,
+    half_lives: tuple[int, ...] = EWM_HALF_LIVES,
+) -> FrameT:
+    """
+    Purpose:
+        Compute rolling mean, standard deviation and median of the daily score for
+        several windows, and its exponentially weighted means, in one pass.
+        Windows span calendar days, so days without a Pixel shrink a window instead of
+        pulling in older days the way a row count would.
+    Args:
+        data: Cleaned Pixels data, sorted by date.
+        windows: Trailing window sizes in days.
+        centered_windows: Centered window sizes in days.
+        half_lives: Half-lives in days of exponentially weighted means.
+    Returns:
+        Date and one column per statistic and window, in the order of data.
+    """
+    score = pl.col("average_score")
+    trailing = data.select(
+        "date",
+        *[
+            expression
+            for window in windows
+            for expression in window_expressions(score, window, by="date")
+        ],
+        *[
+            score.ewm_mean_by("date", half_life=f"{half_life}d").alias(ewm_column(half_life))
+            for half_life in half_lives
+        ],
+    )
+
+    # A rolling context yields one row per Pixel in order, with a window of
+    # window days around it: (date - window // 2 - 1, date + window // 2].
+    centered = [
+        data.rolling("date", period=f"{window}d", offset=f"-{window // 2 + 1}d")
+        .agg(window_expressions(score, window))
+        .drop("date")
+        for window in centered_windows
+    ]
+
+    return pl.concat([trailing, *centered], how="horizontal")
+
+
+def with_rolling_statistics(data: FrameT, statistics: FrameT) -> FrameT:
+    """
+    Purpose:
+        Add rolling statistics computed for data, e.g. read from the cache, as columns.
+    Args:
+        data: Cleaned Pixels data.
+        statistics: Output of rolling_statistics for data.
+    Returns:
+        data: Dataset with the rolling statistic columns.
+    """
+    return pl.concat([data, statistics.drop("date")], how="horizontal")
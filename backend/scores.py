@@ -0,0 +1,117 @@
+"""Description: Score statistics per tracker type and per score slot of the day."""
+
+import polars as pl
+
+from backend.data_cleaning import FrameT
+from backend.instrumentation import instrumented
+
+
+# Schema of the exploded scores. Slots number the scores of a Pixel from 1 in the order
+# they were saved; types repeat on every row, so they are dictionary encoded.
+SCORES_SCHEMA = {
+    "date": pl.Date,
+    "type": pl.Categorical,
+    "slot": pl.UInt32,
+    "score": pl.Float64,
+}
+
+# Tables computed by score_statistics.
+TABLES = ("slots", "types")
+
+
+def explode_scores(data: FrameT) -> FrameT:
+    """
+    Purpose:
+        Explode the "scores" column into one row per score. Pixels without scores have
+        no rows.
+    Args:
+        data: Cleaned Pixels data.
+    Returns:
+        Long table with date, type, slot and score columns, see SCORES_SCHEMA.
+    """
+    return (
+        data.select(
+            "date",
+            "type",
+            pl.int_ranges(1, pl.col("scores").list.len() + 1).alias("slot"),
+            pl.col("scores").alias("score"),
+        )
+        .explode("slot", "score")
+        .drop_nulls("score")
+        .cast(SCORES_SCHEMA)
+    )
+
+
+@instrumented()
+def slot_statistics(data: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Count, mean, min, max and population variance of the scores per tracker type
+        and slot, exploding the scores once and aggregating them in a single group-by.
+        The variance is the spread of one slot's scores across days, not the spread
+        within a day of data_cleaning's score_variance. It is taken with ddof=0 since
+        the scores are every score of the slot rather than a sample of them, a slot
+        with one score gets 0 instead of null, and type_statistics can combine
+        population variances of slots exactly from their counts and means.
+    Args:
+        data: Cleaned Pixels data.
+    Returns:
+        One row per type and slot, in order.
+    """
+    return (
+        explode_scores(data.lazy())
+        .group_by("type", "slot")
+        .agg(
+            pl.len().alias("count"),
+            pl.col("score").mean().alias("mean"),
+            pl.col("score").min().alias("min"),
+            pl.col("score").max().alias("max"),
+            pl.col("score").var(ddof=0).alias("variance"),
+        )
+        .with_columns(pl.col("type").cast(pl.String))
+        .sort("type", "slot")
+        .collect()
+    )
+
+
+@instrumented()
+def type_statistics(slots: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Roll the statistics per slot up to statistics per tracker type, combining the
+        slots' counts, means and variances instead of rescanning the scores.
+    Args:
+        slots: Output of slot_statistics.
+    Returns:
+        One row per type with count, mean, min, max and population variance, in order.
+    """
+    count = pl.col("count").sum()
+    mean = (pl.col("count") * pl.col("mean")).sum() / count
+    # Sum of squared deviations from the type's mean: each slot's sum of squares,
+    # count * variance, taken about the type's mean instead of its own.
+    squares = (pl.col("count") * (pl.col("variance") + pl.col("mean") ** 2)).sum() - count * mean**2
+
+    return (
+        slots.group_by("type")
+        .agg(
+            count.alias("count"),
+            mean.alias("mean"),
+            pl.col("min").min(),
+            pl.col("max").max(),
+            (squares / count).alias("variance"),
+        )
+        .sort("type")
+    )
+
+
+def score_statistics(data: pl.DataFrame) -> dict[str, pl.DataFrame]:
+    """
+    Purpose:
+        Score statistics per slot and per tracker type from one pass over the scores.
+    Args:
+        data: Cleaned Pixels data.
+    Returns:
+        Tables by name, see TABLES: statistics per type and "slots", and per "types".
+    """
+    slots = slot_statistics(data)
+    return {"slots": slots, "types": type_statistics(slots)}
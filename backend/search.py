@@ -0,0 +1,243 @@
+"""Description: Token-level inverted index over notes for fast term search."""
+
+import re
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+import polars as pl
+
+from backend.instrumentation import instrumented
+
+
+# Pattern for one token; queries are tokenized the same way as notes.
+TOKEN_PATTERN = r"\w+"  # noqa: S105
+
+# How many datasets keep an index in memory.
+MAX_CACHED_INDEXES = 8
+
+_indexes: OrderedDict[int, "NoteIndex"] = OrderedDict()
+
+
+@dataclass(frozen=True)
+class NoteIndex:
+    """
+    Purpose:
+        Inverted index mapping each lower-cased token to the sorted row ids containing it.
+    Attributes:
+        vocabulary: Sorted array of every token.
+        postings: Sorted row ids per token, aligned with vocabulary.
+        notes: Original notes, used to verify phrase queries.
+    """
+
+    vocabulary: np.ndarray
+    postings: list[np.ndarray]
+    notes: pl.Series
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Purpose:
+        Split text into lower-cased tokens, the same way notes are indexed.
+    Args:
+        text: Text to tokenize.
+    Returns:
+        List of tokens.
+    """
+    return re.findall(TOKEN_PATTERN, text.lower())
+
+
+@instrumented()
+def build_index(notes: pl.Series) -> NoteIndex:
+    """
+    Purpose:
+        Build an inverted index over notes in one vectorized pass.
+    Args:
+        notes: Notes, one per row. Null notes contain no tokens.
+    Returns:
+        NoteIndex over notes.
+    """
+    tokens = (
+        pl.DataFrame({"notes": notes})
+        .with_row_index("row")
+        .select(
+            "row",
+            pl.col("notes").str.to_lowercase().str.extract_all(TOKEN_PATTERN).alias("token"),
+        )
+        .explode("token")
+        .drop_nulls("token")
+        .unique(["token", "row"])
+        .group_by("token")
+        .agg(pl.col("row").sort())
+        .sort("token")
+    )
+
+    return NoteIndex(
+        vocabulary=tokens["token"].to_numpy().astype(str),
+        postings=[rows.to_numpy() for rows in tokens["row"]],
+        notes=notes,
+    )
+
+
+def notes_key(notes: pl.Series) -> int:
+    """
+    Purpose:
+        Content hash of notes, used to cache one index per dataset.
+    Args:
+        notes: Notes, one per row.
+    Returns:
+        Hash of every note and its position.
+    """
+    rows = pl.DataFrame({"notes": notes}).with_row_index("row").hash_rows()
+    return hash(rows.to_numpy().tobytes())
+
+
+def get_index(notes: pl.Series, key: int | None = None) -> NoteIndex:
+    """
+    Purpose:
+        Return the cached index for a dataset, building it on first use.
+    Args:
+        notes: Notes, one per row.
+        key: Dataset key, computed from notes if not given.
+    Returns:
+        NoteIndex over notes.
+    """
+    if key is None:
+        key = notes_key(notes)
+
+    if key in _indexes:
+        _indexes.move_to_end(key)
+        return _indexes[key]
+
+    index = build_index(notes)
+    _indexes[key] = index
+    if len(_indexes) > MAX_CACHED_INDEXES:
+        _indexes.popitem(last=False)
+
+    return index
+
+
+def _union(postings: Iterable[np.ndarray]) -> np.ndarray:
+    postings = list(postings)
+    if not postings:
+        return np.array([], dtype=np.uint32)
+    return np.unique(np.concatenate(postings))
+
+
+def search_token(index: NoteIndex, token: str) -> np.ndarray:
+    """
+    Purpose:
+        Find rows containing a single token.
+    Args:
+        index: NoteIndex to search.
+        token: Token to look up, case-insensitive.
+    Returns:
+        Sorted row ids.
+    """
+    token = token.lower()
+    position = np.searchsorted(index.vocabulary, token)
+    if position < len(index.vocabulary) and index.vocabulary[position] == token:
+        return index.postings[position]
+    return np.array([], dtype=np.uint32)
+
+
+def search_all(index: NoteIndex, tokens: Iterable[str]) -> np.ndarray:
+    """
+    Purpose:
+        Find rows containing every token (AND).
+    Args:
+        index: NoteIndex to search.
+        tokens: Tokens to look up.
+    Returns:
+        Sorted row ids.
+    """
+    rows = None
+    for token in tokens:
+        matches = search_token(index, token)
+        rows = matches if rows is None else np.intersect1d(rows, matches, assume_unique=True)
+    return np.array([], dtype=np.uint32) if rows is None else rows
+
+
+def search_any(index: NoteIndex, tokens: Iterable[str]) -> np.ndarray:
+    """
+    Purpose:
+        Find rows containing at least one token (OR).
+    Args:
+        index: NoteIndex to search.
+        tokens: Tokens to look up.
+    Returns:
+        Sorted row ids.
+    """
+    return _union(search_token(index, token) for token in tokens)
+
+
+def search_prefix(index: NoteIndex, prefix: str) -> np.ndarray:
+    """
+    Purpose:
+        Find rows containing a token that starts with prefix.
+    Args:
+        index: NoteIndex to search.
+        prefix: Token prefix, case-insensitive.
+    Returns:
+        Sorted row ids.
+    """
+    prefix = prefix.lower()
+    start = np.searchsorted(index.vocabulary, prefix, side="left")
+    end = np.searchsorted(index.vocabulary, prefix + "\U0010ffff", side="left")
+    return _union(index.postings[start:end])
+
+
+def search_phrase(index: NoteIndex, phrase: str) -> np.ndarray:
+    """
+    Purpose:
+        Find rows containing the tokens of phrase next to each other. Rows that have
+        every token are found in the index, and only those notes are checked for order.
+    Args:
+        index: NoteIndex to search.
+        phrase: Phrase to look up, case-insensitive.
+    Returns:
+        Sorted row ids.
+    """
+    tokens = tokenize(phrase)
+    candidates = search_all(index, tokens)
+    if len(tokens) <= 1 or len(candidates) == 0:
+        return candidates
+
+    pattern = r"(?i)\b" + r"\W+".join(re.escape(token) for token in tokens) + r"\b"
+    matches = index.notes.gather(candidates).str.contains(pattern).fill_null(value=False)
+    return candidates[matches.to_numpy()]
+
+
+def search_substring(index: NoteIndex, term: str) -> np.ndarray:
+    """
+    Purpose:
+        Find rows whose notes contain term as literal text, ignoring case, like
+        notes.str.to_lowercase().str.contains(term.lower(), literal=True). The empty
+        term matches every note.
+        A term that is a single token only occurs inside a token, so it is matched
+        against the vocabulary alone. Otherwise the notes with a token containing the
+        term's longest token are checked, or every note if the term has no token.
+    Args:
+        index: NoteIndex to search.
+        term: Search term.
+    Returns:
+        Sorted row ids.
+    """
+    term = term.lower()
+    tokens = tokenize(term)
+
+    if tokens == [term]:
+        matching_tokens = np.char.find(index.vocabulary, term) >= 0
+        return _union(index.postings[i] for i in np.flatnonzero(matching_tokens))
+
+    if tokens:
+        longest = max(tokens, key=len)
+        matching_tokens = np.char.find(index.vocabulary, longest) >= 0
+        candidates = _union(index.postings[i] for i in np.flatnonzero(matching_tokens))
+    else:
+        candidates = np.arange(len(index.notes), dtype=np.uint32)
+
+    notes = index.notes.gather(candidates).str.to_lowercase()
+    matches = notes.str.contains(term, literal=True).fill_null(value=False)
+    return candidates[matches.to_numpy()]
@@ -0,0 +1,168 @@
+"""Description: Cached, parallel sentiment scoring of notes."""
+
+import hashlib
+import multiprocessing
+import sqlite3
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from pathlib import Path
+
+import polars as pl
+
+from backend.instrumentation import instrumented
+
+
+SENTIMENT_DB = str(Path("backend", "store", "sentiment.sqlite"))
+
+# Seconds a connection waits for another process's write lock before failing.
+SQLITE_TIMEOUT = 30
+
+# Fewer uncached notes than this are scored in-process, a pool is not worth starting.
+PARALLEL_THRESHOLD = 256
+
+# Notes handed to a worker process at once.
+POOL_CHUNK_SIZE = 64
+
+# Hashes looked up per SQLite query, below SQLite's bound variable limit.
+LOOKUP_BATCH_SIZE = 900
+
+
+def get_sentiment(text: str) -> float:
+    """
+    Purpose:
+        Analyses text and returns a sentiment polarity.
+    Args:
+        text: Text to perform analysis on.
+    Returns:
+        Float for sentiment polarity.
+    """
+    # Some notes are null.
+    if not text:
+        return 0.0
+
+    # Imported on first use, TextBlob is slow to import.
+    from textblob import TextBlob  # noqa: PLC0415
+
+    # Returns a score between -1 and 1 as a "sentiment polarity".
+    return TextBlob(text).sentiment.polarity
+
+
+def text_hash(text: str) -> str:
+    """
+    Purpose:
+        Key a note's polarity by its text, so edited notes are scored again.
+    Args:
+        text: Note text.
+    Returns:
+        Hex SHA-1 digest of the text, a cache key rather than a security measure.
+    """
+    return hashlib.sha1(text.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def connect(db_path: str = SENTIMENT_DB) -> sqlite3.Connection:
+    """
+    Purpose:
+        Open the polarity store, creating it if needed. The store is in WAL mode, so
+        concurrent requests read while another one saves new polarities.
+    Args:
+        db_path: Path to SQLite database.
+    Returns:
+        Open SQLite connection.
+    """
+    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(db_path, timeout=SQLITE_TIMEOUT)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS polarity (hash TEXT PRIMARY KEY, polarity REAL NOT NULL)",
+    )
+    return connection
+
+
+def lookup(connection: sqlite3.Connection, hashes: list[str]) -> dict[str, float]:
+    """
+    Purpose:
+        Fetch stored polarities.
+    Args:
+        connection: Open polarity store.
+        hashes: Text hashes to look up.
+    Returns:
+        Polarity per hash, for the hashes that are stored.
+    """
+    found = {}
+    for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+        batch = hashes[start : start + LOOKUP_BATCH_SIZE]
+        # Only the "?" placeholders are formatted into the query, the hashes are bound.
+        placeholders = ",".join("?" * len(batch))
+        found.update(
+            connection.execute(
+                f"SELECT hash, polarity FROM polarity WHERE hash IN ({placeholders})",  # noqa: S608
+                batch,
+            ),
+        )
+    return found
+
+
+@instrumented()
+def score_notes(
+    notes: Iterable[str],
+    db_path: str = SENTIMENT_DB,
+    max_workers: int | None = None,
+) -> list[float]:
+    """
+    Purpose:
+        Score notes, reading cached polarities from disk and scoring the rest in a
+        process pool. New scores are saved, so later runs only score new or edited notes.
+    Args:
+        notes: Note texts.
+        db_path: Path to SQLite database of stored polarities.
+        max_workers: Worker processes for scoring, defaults to every core.
+    Returns:
+        Polarity per note, in order.
+    """
+    notes = list(notes)
+    hashes = [text_hash(note) for note in notes]
+
+    with closing(connect(db_path)) as connection:
+        polarity = lookup(connection, list(set(hashes)))
+
+        missing = {h: note for h, note in zip(hashes, notes, strict=True) if h not in polarity}
+        if missing:
+            if len(missing) < PARALLEL_THRESHOLD:
+                scores = map(get_sentiment, missing.values())
+            else:
+                # Forking after Polars has started its thread pool can deadlock.
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers, mp_context=context) as pool:
+                    scores = list(
+                        pool.map(get_sentiment, missing.values(), chunksize=POOL_CHUNK_SIZE),
+                    )
+
+            new = dict(zip(missing, scores, strict=True))
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO polarity VALUES (?, ?)",
+                    new.items(),
+                )
+            polarity.update(new)
+
+    return [polarity[h] for h in hashes]
+
+
+def add_sentiment_column(data: pl.DataFrame, db_path: str = SENTIMENT_DB) -> pl.DataFrame:
+    """
+    Purpose:
+        Add a "sentiment" polarity column for notes. Null notes result in Null.
+    Args:
+        data: Dataset with "notes" column to work on.
+        db_path: Path to SQLite database of stored polarities.
+    Returns:
+        data: Dataset with new sentiment column.
+    """
+    notes = data.get_column("notes").drop_nulls().unique()
+    polarity = pl.DataFrame(
+        {"notes": notes, "sentiment": score_notes(notes, db_path)},
+        schema={"notes": pl.String, "sentiment": pl.Float64},
+    )
+
+    return data.join(polarity, on="notes", how="left", maintain_order="left")
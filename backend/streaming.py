@@ -0,0 +1,239 @@
+"""Description: Streaming ingestion of large Pixels backup JSON files."""
+
+import itertools
+import json
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import polars as pl
+
+from backend.data_cleaning import (
+    PIXELS_SCHEMA,
+    add_year_and_month_columns,
+    clean_date,
+    create_word_and_char_columns,
+    daily_average_score,
+    report_missing_dates,
+)
+
+
+# Characters read from disk per chunk.
+CHUNK_SIZE = 1 << 20
+
+# Default memory ceiling for one batch in bytes.
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+
+# Parsed Python dicts take roughly this many times the size of their JSON text.
+PARSE_OVERHEAD = 10
+
+# Whitespace allowed around JSON values, and the separators skipped between elements.
+WHITESPACE = " \t\r\n"
+SEPARATORS = WHITESPACE + ","
+
+_decoder = json.JSONDecoder()
+
+
+def read_chunks(json_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Purpose:
+        Read a text file in fixed-size chunks.
+    Args:
+        json_path: Path to json file.
+        chunk_size: Characters per chunk.
+    Yields:
+        Text chunks.
+    """
+    with Path(json_path).open(encoding="utf-8") as file:
+        while chunk := file.read(chunk_size):
+            yield chunk
+
+
+def array_start(chunks: Iterator[str]) -> str:
+    """
+    Purpose:
+        Read up to the opening bracket of a JSON array.
+    Args:
+        chunks: Text chunks of a JSON array, in order.
+    Returns:
+        The rest of the chunk after the bracket.
+    Raises:
+        ValueError: If the text does not start with '['.
+    """
+    buffer = ""
+    while not (buffer := buffer.lstrip(WHITESPACE)):
+        buffer = next(chunks, "")
+        if not buffer:
+            break
+
+    if not buffer.startswith("["):
+        msg = "Expected '[' at the start of the JSON array."
+        raise ValueError(msg)
+    return buffer[1:]
+
+
+def read_more(buffer: str, pos: int, chunks: Iterator[str]) -> tuple[str, bool]:
+    """
+    Purpose:
+        Drop the parsed text of the buffer and append the next chunk.
+    Args:
+        buffer: Text read so far.
+        pos: Position of the first unparsed character.
+        chunks: Remaining text chunks.
+    Returns:
+        buffer: Unparsed text followed by the next chunk.
+        eof: Whether there were no chunks left.
+    """
+    chunk = next(chunks, "")
+    return buffer[pos:] + chunk, not chunk
+
+
+def check_end(rest: str, chunks: Iterator[str]) -> None:
+    """
+    Purpose:
+        Check that only whitespace follows a JSON array, reading the remaining chunks.
+    Args:
+        rest: Unparsed text after the closing bracket.
+        chunks: Remaining text chunks.
+    Raises:
+        ValueError: If anything but whitespace follows the array.
+    """
+    for text in itertools.chain([rest], chunks):
+        if text.strip(WHITESPACE):
+            msg = "Unexpected content after the JSON array."
+            raise ValueError(msg)
+
+
+def iter_json_records(chunks: Iterable[str]) -> Iterator[tuple[dict, int]]:
+    """
+    Purpose:
+        Incrementally parse a top-level JSON array, yielding one element at a time.
+        Only the unparsed tail of the text is kept in memory. Text after the array is
+        read to its end and must be whitespace.
+    Args:
+        chunks: Text chunks of a JSON array, in order.
+    Yields:
+        (record, size of the record's JSON text).
+    Raises:
+        ValueError: If the text is not a JSON array, or has content after it.
+        json.JSONDecodeError: If an element is not valid JSON.
+    """
+    chunks = iter(chunks)
+    buffer = array_start(chunks)
+    pos = 0
+    eof = False
+
+    while True:
+        # Skip whitespace and separators between elements.
+        while pos < len(buffer) and buffer[pos] in SEPARATORS:
+            pos += 1
+
+        if pos >= len(buffer):
+            if eof:
+                msg = "JSON array is not terminated."
+                raise ValueError(msg)
+            buffer, eof = read_more(buffer, pos, chunks)
+            pos = 0
+            continue
+
+        if buffer[pos] == "]":
+            check_end(buffer[pos + 1 :], chunks)
+            return
+
+        try:
+            record, end = _decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # The element is split across chunks; drop parsed text and read more.
+            buffer, eof = read_more(buffer, pos, chunks)
+            pos = 0
+            continue
+
+        yield record, end - pos
+        pos = end
+
+
+def iter_json_batches(
+    chunks: Iterable[str],
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+) -> Iterator[pl.DataFrame]:
+    """
+    Purpose:
+        Group streamed records into Polars DataFrames of a bounded size. Every batch
+        has PIXELS_SCHEMA, whatever values its records happen to hold.
+    Args:
+        chunks: Text chunks of a Pixels backup JSON array.
+        memory_limit: Approximate ceiling in bytes for one batch while it is built.
+    Yields:
+        Raw Pixels data batches.
+    """
+    batch_size = max(memory_limit // PARSE_OVERHEAD, 1)
+    records = []
+    size = 0
+
+    for record, record_size in iter_json_records(chunks):
+        records.append(record)
+        size += record_size
+
+        if size >= batch_size:
+            yield pl.DataFrame(records, schema=PIXELS_SCHEMA)
+            records = []
+            size = 0
+
+    if records:
+        yield pl.DataFrame(records, schema=PIXELS_SCHEMA)
+
+
+def clean_batch(batch: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Run the row-level cleaning steps on one batch.
+    Args:
+        batch: Raw Pixels data batch.
+    Returns:
+        batch: Batch with average score, cleaned date, and word/char counts.
+    """
+    return (
+        batch.lazy()
+        .pipe(daily_average_score)
+        .pipe(clean_date)
+        .pipe(create_word_and_char_columns)
+        .collect()
+    )
+
+
+def streaming_cleaning_driver(
+    json_path: str,
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    *,
+    report: bool = False,
+) -> pl.DataFrame:
+    """
+    Purpose:
+        Clean a backup batch by batch, so the raw text and the fully parsed file are
+        never in memory at once. Yearly and monthly means need the whole history,
+        so they are computed once after the batches are combined.
+    Args:
+        json_path: Path to json file.
+        memory_limit: Approximate ceiling in bytes for one batch while it is parsed.
+        report: Print the days without a Pixel.
+    Returns:
+        data: Cleaned Polars DataFrame, identical to data_cleaning_driver's output.
+    """
+    batches = [
+        clean_batch(batch) for batch in iter_json_batches(read_chunks(json_path), memory_limit)
+    ]
+    # An empty backup has no batches, but its cleaned frame still has every column.
+    if not batches:
+        batches = [clean_batch(pl.DataFrame(schema=PIXELS_SCHEMA))]
+
+    data = pl.concat(batches).set_sorted("date")
+    data = add_year_and_month_columns(data)
+
+    # Match the column order of data_cleaning_driver.
+    data = data.select(pl.exclude("word_count", "char_count"), "word_count", "char_count")
+
+    if report:
+        report_missing_dates(data)
+
+    return data
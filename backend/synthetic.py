@@ -0,0 +1,278 @@
+"""Description: Deterministic synthetic Pixels backups for benchmarks and tests."""
+
+import argparse
+import datetime as dt
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+
+DEFAULT_START = dt.date(2000, 1, 1)
+
+# Neutral words for notes, drawn with Zipf-like frequencies like real text.
+WORDS = (  # noqa: SIM905
+    "work walk home dinner friends movie coffee gym read book call "
+    "family park cook lunch meeting project train rain sun city beach music game "
+    "sleep clean shop garden dog cat run code write study class trip car bus office "
+    "weekend morning evening night watch show video paint bake tea market church "
+    "concert doctor"
+).split()
+
+# Sentiment-carrying words per score, so polarity tracks the day's score.
+MOOD_WORDS = {
+    1: ("terrible", "awful", "sad", "sick"),
+    2: ("bad", "tired", "boring", "stressful"),
+    3: ("okay", "normal", "fine", "quiet"),
+    4: ("good", "nice", "fun", "relaxing"),
+    5: ("great", "amazing", "wonderful", "happy"),
+}
+
+# Tag categories and their entries, in the shape of Pixels' tags.
+TAGS = {
+    "Emotions": ("happy", "excited", "grateful", "anxious", "sad", "angry", "calm", "tired"),
+    "Activities": ("exercise", "reading", "gaming", "cooking", "travel", "work", "friends"),
+    "Weather": ("sunny", "cloudy", "rainy", "snowy"),
+}
+
+# Pixels generated and serialized at once.
+CHUNK_DAYS = 10_000
+
+# Distinct tag sets Pixels with tags pick from.
+TAG_SETS = 256
+
+
+def pixel_dates(
+    rng: np.random.Generator,
+    days: int,
+    start: dt.date,
+    gap_rate: float,
+    mean_gap_days: float,
+) -> np.ndarray:
+    """
+    Purpose:
+        Dates of the Pixels, one per day with occasional runs of missing days.
+    Args:
+        rng: Random generator.
+        days: Number of days with a Pixel.
+        start: Date of the first Pixel.
+        gap_rate: Probability that a gap follows a day.
+        mean_gap_days: Mean length of a gap in days.
+    Returns:
+        Sorted datetime64[D] array of length days.
+    Raises:
+        ValueError: If the dates would run past the year 9999.
+    """
+    steps = np.ones(days, dtype=np.int64)
+    steps[0] = 0
+    gaps = rng.random(days - 1) < gap_rate
+    steps[1:][gaps] += rng.geometric(1 / mean_gap_days, gaps.sum())
+
+    dates = np.datetime64(start, "D") + np.cumsum(steps)
+    if dates[-1] > np.datetime64("9999-12-31"):
+        msg = f"{days} days starting {start} run past 9999-12-31, use an earlier start."
+        raise ValueError(msg)
+    return dates
+
+
+def pixel_scores(
+    rng: np.random.Generator,
+    dates: np.ndarray,
+    max_scores: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Purpose:
+        Scores of the Pixels, drifting with the seasons around a neutral mood.
+    Args:
+        rng: Random generator.
+        dates: Date of each Pixel.
+        max_scores: Most scores a Pixel can have.
+    Returns:
+        scores: Scores from 1 to 5, max_scores per Pixel.
+        counts: Number of scores used per Pixel, most Pixels have one.
+    """
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype(np.int64)
+    season = 3 + 0.7 * np.sin(2 * np.pi * day_of_year / 365.25)
+    scores = np.rint(season[:, None] + rng.normal(0, 1, (len(dates), max_scores)))
+    scores = np.clip(scores, 1, 5).astype(np.int64)
+
+    # Each extra score is ten times rarer than the previous one.
+    weights = 0.1 ** np.arange(max_scores)
+    counts = rng.choice(np.arange(1, max_scores + 1), len(dates), p=weights / weights.sum())
+
+    return scores, counts
+
+
+def pixel_notes(
+    rng: np.random.Generator,
+    lengths: np.ndarray,
+    scores: np.ndarray,
+    zipf: np.ndarray,
+) -> list[str]:
+    """
+    Purpose:
+        Notes of neutral words with one word matching each day's mood, drawing the
+        words of every note at once.
+    Args:
+        rng: Random generator.
+        lengths: Words per note, 0 for Pixels without a note.
+        scores: Score each mood word is picked for.
+        zipf: Probability of each of WORDS.
+    Returns:
+        Note text per Pixel, empty for Pixels without a note.
+    """
+    words = np.array(WORDS, dtype=object)[rng.choice(len(WORDS), lengths.sum(), p=zipf)]
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+
+    has_note = lengths > 0
+    moods = np.array(list(MOOD_WORDS.values()), dtype=object)
+    mood_positions = starts + (rng.random(len(lengths)) * lengths).astype(np.int64)
+    mood_words = moods[scores - 1, rng.integers(moods.shape[1], size=len(lengths))]
+    words[mood_positions[has_note]] = mood_words[has_note]
+
+    words = words.tolist()
+    return [
+        " ".join(words[start:end])
+        for start, end in zip(starts.tolist(), ends.tolist(), strict=True)
+    ]
+
+
+def pixel_tags(rng: np.random.Generator) -> list[dict]:
+    """
+    Purpose:
+        Tags of one Pixel: one or two categories with one to three entries each.
+    Args:
+        rng: Random generator.
+    Returns:
+        List of {"type", "entries"} tags.
+    """
+    categories = rng.choice(list(TAGS), rng.integers(1, 3), replace=False)
+    return [
+        {
+            "type": str(category),
+            "entries": [
+                str(entry)
+                for entry in rng.choice(TAGS[category], rng.integers(1, 4), replace=False)
+            ],
+        }
+        for category in categories
+    ]
+
+
+def iter_pixels(  # noqa: PLR0913
+    days: int,
+    seed: int = 0,
+    *,
+    start: dt.date = DEFAULT_START,
+    types: tuple[str, ...] = ("Mood",),
+    max_scores: int = 3,
+    note_rate: float = 0.65,
+    mean_note_words: float = 35.0,
+    tag_rate: float = 0.3,
+    gap_rate: float = 0.01,
+    mean_gap_days: float = 3.0,
+) -> Iterator[dict]:
+    """
+    Purpose:
+        Generate Pixels in date order, the same ones for the same arguments.
+        The defaults follow backend/uploads/testfile.json: mostly one score per day,
+        two thirds of days with a note of a few dozen words, and a few missing days.
+    Args:
+        days: Number of days with Pixels. Dates end at 9999-12-31, so starting in the
+            year 1 allows about 3.6 million days; larger backups need several types.
+        seed: Seed of the random generator.
+        start: Date of the first Pixel.
+        types: Pixel types recorded every day, e.g. ("Mood", "Sleep").
+        max_scores: Most scores a Pixel can have.
+        note_rate: Share of Pixels with a note.
+        mean_note_words: Mean words per note, lengths are geometrically distributed.
+        tag_rate: Share of Pixels with tags.
+        gap_rate: Probability that a run of missing days follows a day.
+        mean_gap_days: Mean length of a run of missing days.
+    Yields:
+        Pixels, as in a Pixels backup.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pixel_dates(rng, days, start, gap_rate, mean_gap_days)
+
+    zipf = 1 / np.arange(1, len(WORDS) + 1)
+    zipf /= zipf.sum()
+    tag_sets = [pixel_tags(rng) for _ in range(TAG_SETS)]
+
+    for chunk_start in range(0, days, CHUNK_DAYS):
+        chunk = dates[chunk_start : chunk_start + CHUNK_DAYS]
+        size = len(chunk) * len(types)
+
+        scores, counts = pixel_scores(rng, np.repeat(chunk, len(types)), max_scores)
+        lengths = rng.geometric(1 / mean_note_words, size)
+        lengths[rng.random(size) >= note_rate] = 0
+        notes = pixel_notes(rng, lengths, scores[:, 0], zipf)
+        tags = np.where(rng.random(size) < tag_rate, rng.integers(TAG_SETS, size=size), -1)
+
+        for i, date in enumerate(chunk.tolist()):
+            for j, pixel_type in enumerate(types):
+                k = i * len(types) + j
+                yield {
+                    # Pixels writes dates without zero padding.
+                    "date": f"{date.year}-{date.month}-{date.day}",
+                    "type": pixel_type,
+                    "scores": scores[k, : counts[k]].tolist(),
+                    "notes": notes[k],
+                    "tags": tag_sets[tags[k]] if tags[k] >= 0 else [],
+                }
+
+
+def write_backup(path: str, days: int, seed: int = 0, **options: object) -> int:
+    """
+    Purpose:
+        Write a synthetic Pixels backup without holding it in memory.
+    Args:
+        path: Path of the json file to write.
+        days: Number of days with Pixels.
+        seed: Seed of the random generator.
+        **options: Further arguments of iter_pixels.
+    Returns:
+        Number of Pixels written.
+    """
+    count = 0
+    with Path(path).open("w", encoding="utf-8") as file:
+        file.write("[")
+        for count, pixel in enumerate(iter_pixels(days, seed, **options), start=1):
+            if count > 1:
+                file.write(",")
+            file.write(json.dumps(pixel, separators=(",", ":")))
+        file.write("]")
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic Pixels backup.")
+    parser.add_argument("path", help="Path of the json file to write.")
+    parser.add_argument("--days", type=int, default=10_000, help="Days with Pixels.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random generator.")
+    parser.add_argument("--start", type=dt.date.fromisoformat, default=DEFAULT_START)
+    parser.add_argument("--types", nargs="+", default=["Mood"], help="Pixel types per day.")
+    parser.add_argument("--max-scores", type=int, default=3)
+    parser.add_argument("--note-rate", type=float, default=0.65)
+    parser.add_argument("--mean-note-words", type=float, default=35.0)
+    parser.add_argument("--tag-rate", type=float, default=0.3)
+    parser.add_argument("--gap-rate", type=float, default=0.01)
+    parser.add_argument("--mean-gap-days", type=float, default=3.0)
+    args = parser.parse_args()
+
+    written = write_backup(
+        args.path,
+        args.days,
+        args.seed,
+        start=args.start,
+        types=tuple(args.types),
+        max_scores=args.max_scores,
+        note_rate=args.note_rate,
+        mean_note_words=args.mean_note_words,
+        tag_rate=args.tag_rate,
+        gap_rate=args.gap_rate,
+        mean_gap_days=args.mean_gap_days,
+    )
+    print(f"Wrote {written} Pixels to {args.path}.")
@@ -0,0 +1,203 @@
+"""Description: Tag analytics over a long table of one row per tagged day."""
+
+import json
+from itertools import starmap
+
+import polars as pl
+
+from backend.data_cleaning import PIXELS_SCHEMA
+from backend.instrumentation import instrumented
+
+
+# Type of the "tags" column: a list of {"type", "entries"} per Pixel.
+TAGS_DTYPE = PIXELS_SCHEMA["tags"]
+
+# Schema of the exploded tags. Categories and tags repeat on most days, so both are
+# dictionary encoded.
+TAGS_SCHEMA = {
+    "date": pl.Date,
+    "average_score": pl.Float64,
+    "category": pl.Categorical,
+    "tag": pl.Categorical,
+}
+
+# Tables computed by tag_statistics.
+TABLES = ("tags", "means", "cooccurrence", "months")
+
+
+@instrumented()
+def explode_tags(data: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Explode the "tags" column, a list of {"type", "entries"} per Pixel, into one row
+        per day and tag. Days without tags have no rows.
+    Args:
+        data: Cleaned Pixels data.
+    Returns:
+        Long table with date, average_score, category and tag columns, see TAGS_SCHEMA.
+    """
+    return (
+        data.lazy()
+        .select("date", "average_score", "tags")
+        .explode("tags")
+        .unnest("tags")
+        .explode("entries")
+        .drop_nulls("entries")
+        .select(
+            "date",
+            "average_score",
+            pl.col("type").alias("category"),
+            pl.col("entries").alias("tag"),
+        )
+        .cast(TAGS_SCHEMA)
+        .collect()
+    )
+
+
+def tag_keys(tags: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Every category and tag, from most to least used, so tables and matrices list
+        the common ones first. Tags of the same name in different categories are kept
+        apart.
+    Args:
+        tags: Exploded tags, see explode_tags.
+    Returns:
+        One row per category and tag, ties in alphabetical order, with the "label"
+        naming its column in the wide tables, see tag_label.
+    """
+    keys = (
+        tags.group_by(pl.col("category").cast(pl.String), pl.col("tag").cast(pl.String))
+        .agg(pl.col("date").n_unique().alias("days"))
+        .sort(["days", "category", "tag"], descending=[True, False, False])
+    )
+    labels = list(starmap(tag_label, keys.select("category", "tag").rows()))
+    return keys.select("category", "tag", pl.Series("label", labels, dtype=pl.String))
+
+
+def tag_label(category: str, tag: str) -> str:
+    """
+    Purpose:
+        Name the column of a category and tag in the wide tables. The name is the
+        JSON array [category, tag], which tells every pair apart and never equals a
+        plain column name such as "tag" or "month", whatever the tags are called.
+    Args:
+        category: Tag category.
+        tag: Tag name.
+    Returns:
+        Column name, e.g. '["Emotions", "happy"]'.
+    """
+    return json.dumps([category, tag])
+
+
+@instrumented()
+def tag_score_means(tags: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Mean daily score of the days each tag was used on.
+    Args:
+        tags: Exploded tags, see explode_tags.
+    Returns:
+        One row per category and tag with days and mean_score, most used first.
+    """
+    return (
+        tags.group_by(
+            pl.col("category").cast(pl.String),
+            pl.col("tag").cast(pl.String),
+        )
+        .agg(
+            pl.col("date").n_unique().alias("days"),
+            pl.col("average_score").mean().alias("mean_score"),
+        )
+        .sort(["days", "category", "tag"], descending=[True, False, False])
+    )
+
+
+@instrumented()
+def tag_cooccurrence(tags: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Count the days every pair of tags was used together.
+    Args:
+        tags: Exploded tags, see explode_tags.
+    Returns:
+        Square matrix with one row per category and tag, in the order of tag_keys, and
+        one column per category and tag, named by tag_label. The diagonal holds the
+        days each tag was used on.
+    """
+    keys = tag_keys(tags)
+    daily = (
+        tags.select(
+            "date",
+            pl.col("category").cast(pl.String),
+            pl.col("tag").cast(pl.String),
+        )
+        .unique()
+        .join(keys, on=["category", "tag"])
+        .select("date", "label")
+    )
+
+    pairs = (
+        daily.join(daily, on="date", suffix="_other")
+        .group_by("label", "label_other")
+        .agg(pl.len().alias("days"))
+    )
+    matrix = pairs.pivot(on="label_other", index="label", values="days")
+
+    return (
+        keys.join(matrix, on="label", how="left", maintain_order="left")
+        .select("category", "tag", *keys["label"])
+        .fill_null(0)
+    )
+
+
+@instrumented()
+def tag_month_pivot(tags: pl.DataFrame) -> pl.DataFrame:
+    """
+    Purpose:
+        Count the days each tag was used on per month.
+    Args:
+        tags: Exploded tags, see explode_tags.
+    Returns:
+        One row per month with tags, as the first day of the month, and one column per
+        category and tag in the order of tag_keys, named by tag_label.
+    """
+    keys = tag_keys(tags)
+
+    counts = (
+        tags.select(
+            pl.col("date").dt.truncate("1mo").alias("month"),
+            "date",
+            pl.col("category").cast(pl.String),
+            pl.col("tag").cast(pl.String),
+        )
+        .join(keys, on=["category", "tag"])
+        .group_by("month", "label")
+        .agg(pl.col("date").n_unique().alias("days"))
+    )
+
+    return (
+        counts.pivot(on="label", index="month", values="days")
+        .select("month", *keys["label"])
+        .fill_null(0)
+        .sort("month")
+    )
+
+
+def tag_statistics(data: pl.DataFrame) -> dict[str, pl.DataFrame]:
+    """
+    Purpose:
+        Explode the tags once and compute every tag table from them.
+    Args:
+        data: Cleaned Pixels data.
+    Returns:
+        Tables by name, see TABLES: the exploded "tags", their "means",
+        "cooccurrence" matrix and "months" pivot.
+    """
+    tags = explode_tags(data)
+    return {
+        "tags": tags,
+        "means": tag_score_means(tags),
+        "cooccurrence": tag_cooccurrence(tags),
+        "months": tag_month_pivot(tags),
+    }
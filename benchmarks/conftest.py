@@ -0,0 +1,273 @@
+"""
+Fixtures and baseline checks for the benchmark suite.
+
+Run with `python -m pytest benchmarks`. Every benchmark records its throughput in
+Pixels per second and the peak growth of the process' resident memory. Baselines depend
+on the machine, so they are opt-in: record them with
+`--baselines benchmarks/baselines.json --update-baselines`, which is gitignored, and
+later runs with `--baselines benchmarks/baselines.json` fail when either measure
+regresses past --baseline-tolerance.
+"""
+
+import json
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import polars as pl
+import psutil
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from backend import figures
+from backend.data_cleaning import data_cleaning_driver, json_to_dataframe
+from backend.synthetic import write_backup
+
+
+# Default days in the synthetic backup.
+DEFAULT_DAYS = 10_000
+
+# Allowed relative regression of throughput and peak memory.
+DEFAULT_TOLERANCE = 0.25
+
+# Peak memory growth below this many bytes is noise and never fails a benchmark.
+MEMORY_SLACK = 32 * 1024 * 1024
+
+# Seconds between memory samples.
+SAMPLE_SECONDS = 0.001
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """
+    Purpose:
+        Add the options of the benchmark suite.
+    Args:
+        parser: pytest's command line parser.
+    """
+    group = parser.getgroup("pixels", "Pixels benchmarks")
+    group.addoption("--days", type=int, default=DEFAULT_DAYS, help="Days in the synthetic backup.")
+    group.addoption(
+        "--types",
+        default="Mood",
+        help="Comma-separated Pixel types per day, more types give more Pixels per day.",
+    )
+    group.addoption(
+        "--baselines",
+        type=Path,
+        help="JSON file of this machine's baselines to check against, none by default.",
+    )
+    group.addoption(
+        "--baseline-tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative regression against the stored baselines.",
+    )
+    group.addoption(
+        "--update-baselines",
+        action="store_true",
+        help="Store this run's results in --baselines instead of checking them.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """
+    Purpose:
+        Reject --update-baselines without a file to store the baselines in.
+    Args:
+        config: pytest's configuration.
+    Raises:
+        UsageError: If --update-baselines is given without --baselines.
+    """
+    if config.getoption("--update-baselines") and config.getoption("--baselines") is None:
+        msg = "--update-baselines needs --baselines, e.g. benchmarks/baselines.json."
+        raise pytest.UsageError(msg)
+
+
+def peak_memory(function: Callable, *args: object) -> tuple[object, int]:
+    """
+    Purpose:
+        Run a function once while sampling the process' resident memory, which also
+        covers Polars' allocations that tracemalloc cannot see.
+    Args:
+        function: Function to run.
+        *args: Its arguments.
+    Returns:
+        result: Return value of the function.
+        peak: Highest resident memory during the run, in bytes above the start.
+    """
+    process = psutil.Process()
+    start = peak = process.memory_info().rss
+    done = threading.Event()
+
+    def sample() -> None:
+        nonlocal peak
+        while not done.wait(SAMPLE_SECONDS):
+            peak = max(peak, process.memory_info().rss)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        result = function(*args)
+    finally:
+        done.set()
+        sampler.join()
+
+    return result, max(peak, process.memory_info().rss) - start
+
+
+@pytest.fixture(scope="session")
+def backup(request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory) -> str:
+    """
+    Purpose:
+        Generate the synthetic backup once per session.
+    Args:
+        request: The fixture request, giving the --days and --types options.
+        tmp_path_factory: pytest's session temporary directories.
+    Returns:
+        Path to the backup.
+    """
+    days = request.config.getoption("--days")
+    types = tuple(request.config.getoption("--types").split(","))
+
+    path = tmp_path_factory.mktemp("backup") / f"pixels-{days}x{len(types)}.json"
+    write_backup(str(path), days, seed=0, types=types)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def raw(backup: str) -> pl.DataFrame:
+    """
+    Purpose:
+        Load the backup without cleaning it.
+    Args:
+        backup: Path to the backup.
+    Returns:
+        The backup as loaded by json_to_dataframe.
+    """
+    return json_to_dataframe(backup)
+
+
+@pytest.fixture(scope="session")
+def cleaned(backup: str) -> pl.DataFrame:
+    """
+    Purpose:
+        Clean the backup.
+    Args:
+        backup: Path to the backup.
+    Returns:
+        Cleaned Pixels data.
+    """
+    return data_cleaning_driver(backup, lazy=True)
+
+
+@pytest.fixture(scope="session")
+def rows(raw: pl.DataFrame) -> int:
+    """
+    Purpose:
+        Count the Pixels in the backup, the unit of throughput.
+    Args:
+        raw: The loaded backup.
+    Returns:
+        Number of Pixels.
+    """
+    return raw.height
+
+
+@pytest.fixture(scope="session")
+def headless(tmp_path_factory: pytest.TempPathFactory) -> None:
+    """
+    Purpose:
+        Save figures to a temporary directory without showing them.
+    Args:
+        tmp_path_factory: pytest's session temporary directories.
+    """
+    figures.configure(str(tmp_path_factory.mktemp("figures")), headless=True, plotly_format="html")
+
+
+@pytest.fixture(scope="session")
+def baselines(request: pytest.FixtureRequest) -> Iterator[dict | None]:
+    """
+    Purpose:
+        Load the baselines of --baselines, and write them back at the end of the
+        session with --update-baselines.
+    Args:
+        request: The fixture request, giving the baseline options.
+    Yields:
+        Baselines by benchmark and row count, None without --baselines.
+    """
+    path = request.config.getoption("--baselines")
+    if path is None:
+        yield None
+        return
+
+    stored = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    yield stored
+
+    if request.config.getoption("--update-baselines"):
+        path.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+@pytest.fixture
+def measure(
+    benchmark: BenchmarkFixture,
+    request: pytest.FixtureRequest,
+    rows: int,
+    baselines: dict | None,
+) -> Callable[..., object]:
+    """
+    Purpose:
+        Benchmark a function, record throughput and peak memory, and check them
+        against the baselines if any. Call it as measure(function, *args), with
+        rounds=n to run exactly n rounds, e.g. for slow functions, instead of letting
+        pytest-benchmark calibrate.
+    Args:
+        benchmark: pytest-benchmark's fixture.
+        request: The fixture request, giving the baseline options.
+        rows: Number of Pixels in the backup.
+        baselines: Stored baselines, None to record without checking.
+    Returns:
+        Function running a benchmark and returning the benchmarked function's result.
+    """
+    config = request.config
+
+    def run(function: Callable, *args: object, rounds: int | None = None) -> object:
+        _, peak = peak_memory(function, *args)
+        if rounds is None:
+            result = benchmark(function, *args)
+        else:
+            result = benchmark.pedantic(function, args, rounds=rounds, iterations=1)
+
+        # Timings are not collected with --benchmark-disable.
+        if benchmark.stats is None:
+            return result
+
+        measured = {"rows_per_second": rows / benchmark.stats.stats.mean, "peak_bytes": peak}
+        benchmark.extra_info.update(rows=rows, **measured)
+
+        # Without --baselines, results are only recorded.
+        if baselines is None:
+            return result
+
+        key = f"{request.node.name}@{rows}"
+        if config.getoption("--update-baselines"):
+            baselines[key] = measured
+        elif key in baselines:
+            tolerance = config.getoption("--baseline-tolerance")
+            baseline = baselines[key]
+            slowest = baseline["rows_per_second"] * (1 - tolerance)
+            largest = max(baseline["peak_bytes"] * (1 + tolerance), MEMORY_SLACK)
+
+            if measured["rows_per_second"] < slowest:
+                pytest.fail(
+                    f"Throughput regressed: {measured['rows_per_second']:.0f} Pixels/s, "
+                    f"baseline {baseline['rows_per_second']:.0f} Pixels/s.",
+                )
+            if peak > largest:
+                pytest.fail(
+                    f"Peak memory regressed: {peak / 2**20:.1f} MiB, "
+                    f"baseline {baseline['peak_bytes'] / 2**20:.1f} MiB.",
+                )
+
+        return result
+
+    return run
@@ -0,0 +1,83 @@
+"""Benchmarks of term search, n-grams, score, tag and calendar analytics, and sentiment."""
+
+import functools
+import itertools
+from collections.abc import Callable
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from backend.analysis import compare_average_score_with_term
+from backend.calendar_view import build_calendar
+from backend.ngrams import LANGUAGE, TOP_N, ngram_counts
+from backend.scores import score_statistics
+from backend.search import build_index
+from backend.sentiment import score_notes
+from backend.tags import tag_statistics
+
+
+# A frequent and a rare word of the synthetic notes.
+TERMS = ["walk", "doctor"]
+
+
+@pytest.mark.usefixtures("headless")
+@pytest.mark.parametrize("term", TERMS)
+def test_compare_average_score_with_term(
+    measure: Callable[..., object],
+    cleaned: pl.DataFrame,
+    term: str,
+) -> None:
+    """Single-term comparison, rendering its figure every round."""
+    measure(functools.partial(compare_average_score_with_term, cache_dir=None), cleaned, term)
+
+
+def test_build_index(measure: Callable[..., object], cleaned: pl.DataFrame) -> None:
+    """Inverted index of the notes."""
+    measure(build_index, cleaned["notes"])
+
+
+def test_ngram_counts(measure: Callable[..., object], cleaned: pl.DataFrame) -> None:
+    """Most common words and bigrams of the notes."""
+    measure(ngram_counts, cleaned["notes"], LANGUAGE, TOP_N)
+
+
+def test_score_statistics(measure: Callable[..., object], cleaned: pl.DataFrame) -> None:
+    """Score statistics per Pixel, type and slot."""
+    measure(score_statistics, cleaned)
+
+
+def test_tag_statistics(measure: Callable[..., object], cleaned: pl.DataFrame) -> None:
+    """Tag counts, co-occurrences and mean scores."""
+    measure(tag_statistics, cleaned)
+
+
+def test_build_calendar(measure: Callable[..., object], cleaned: pl.DataFrame) -> None:
+    """Year-in-pixels calendar, weekday means and streaks."""
+    measure(build_calendar, cleaned)
+
+
+def test_sentiment_cold(
+    measure: Callable[..., object],
+    cleaned: pl.DataFrame,
+    tmp_path: Path,
+) -> None:
+    """Sentiment of every note, with an empty polarity store."""
+    notes = cleaned["notes"].drop_nulls()
+
+    # Every round starts with an empty store, so every note is scored.
+    databases = (str(tmp_path / f"sentiment-{i}.sqlite") for i in itertools.count())
+    measure(lambda: score_notes(notes, next(databases)), rounds=2)
+
+
+def test_sentiment_cached(
+    measure: Callable[..., object],
+    cleaned: pl.DataFrame,
+    tmp_path: Path,
+) -> None:
+    """Sentiment of every note, read from a filled polarity store."""
+    notes = cleaned["notes"].drop_nulls()
+    database = str(tmp_path / "sentiment.sqlite")
+    score_notes(notes, database)
+
+    measure(score_notes, notes, database)
@@ -0,0 +1,45 @@
+"""Benchmarks of loading and cleaning a backup."""
+
+import functools
+from collections.abc import Callable
+
+import polars as pl
+import pytest
+
+from backend.data_cleaning import (
+    add_year_and_month_columns,
+    clean_date,
+    create_word_and_char_columns,
+    daily_average_score,
+    data_cleaning_driver,
+    json_to_dataframe,
+)
+
+
+# Cleaning steps in pipeline order; each is benchmarked on the output of the ones before.
+STEPS = [daily_average_score, clean_date, add_year_and_month_columns, create_word_and_char_columns]
+
+
+def test_json_to_dataframe(measure: Callable[..., object], backup: str) -> None:
+    """Loading the backup."""
+    measure(json_to_dataframe, backup)
+
+
+@pytest.mark.parametrize("step", STEPS, ids=[step.__name__ for step in STEPS])
+def test_cleaning_step(
+    measure: Callable[..., object],
+    raw: pl.DataFrame,
+    step: Callable[[pl.DataFrame], pl.DataFrame],
+) -> None:
+    """One cleaning step, on the output of the steps before it."""
+    data = raw
+    for previous in STEPS[: STEPS.index(step)]:
+        data = previous(data)
+
+    measure(step, data)
+
+
+@pytest.mark.parametrize("lazy", [False, True], ids=["eager", "lazy"])
+def test_data_cleaning_driver(measure: Callable[..., object], backup: str, *, lazy: bool) -> None:
+    """The whole cleaning pipeline, eager and as one lazy plan."""
+    measure(functools.partial(data_cleaning_driver, lazy=lazy), backup)
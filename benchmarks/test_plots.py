@@ -0,0 +1,35 @@
+"""Benchmarks of every plot renderer, saving figures headless."""
+
+import functools
+from collections.abc import Callable
+
+import polars as pl
+import pytest
+
+from backend.plots import PLOTS
+from backend.rolling import rolling_statistics, with_rolling_statistics
+from backend.sentiment import add_sentiment_column
+
+
+@pytest.fixture(scope="session")
+def plot_data(cleaned: pl.DataFrame, tmp_path_factory: pytest.TempPathFactory) -> pl.DataFrame:
+    """
+    Purpose:
+        Add the cached columns jobs render from, rolling statistics and sentiment, so
+        plots are timed without scoring notes.
+    Args:
+        cleaned: Cleaned backup.
+        tmp_path_factory: pytest's session temporary directories.
+    Returns:
+        Cleaned backup with the cached columns.
+    """
+    data = with_rolling_statistics(cleaned, rolling_statistics(cleaned))
+    return add_sentiment_column(data, str(tmp_path_factory.mktemp("store") / "sentiment.sqlite"))
+
+
+@pytest.mark.usefixtures("headless")
+@pytest.mark.parametrize("name", PLOTS)
+def test_plot(measure: Callable[..., object], plot_data: pl.DataFrame, name: str) -> None:
+    """One plot of PLOTS."""
+    # Bypass the render cache, which would time copying the first round's figures.
+    measure(functools.partial(PLOTS[name], cache_dir=None), plot_data)
@@ -1,11 +1,37 @@
 """Frontend package: Flask application and extensions."""
 
+from pathlib import Path
+
 from flask import Flask
-from werkzeug.utils import secure_filename
-import os
+
+from backend.jobs import fail_interrupted_jobs
+from frontend.uploads import MAX_UPLOAD_BYTES
 
 
+UPLOAD_FOLDER = str(Path("backend", "uploads"))
+
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+app.config["MAX_UPLOAD_BYTES"] = MAX_UPLOAD_BYTES
+# Werkzeug rejects larger requests before they are parsed, leaving room for the form.
+app.config["MAX_CONTENT_LENGTH"] = MAX_UPLOAD_BYTES + 64 * 1024
+
+_jobs_checked = False
+
+
+@app.before_request
+def fail_jobs_of_exited_servers() -> None:
+    """
+    Purpose:
+        Before the first request of the server, mark jobs queued by a server process
+        that has since exited as failed, since they would never finish. Importing the
+        package leaves the job store alone.
+    """
+    global _jobs_checked  # noqa: PLW0603
+
+    if not _jobs_checked:
+        fail_interrupted_jobs()
+        _jobs_checked = True
+
 
-from frontend import routes
+from frontend import api, routes
@@ -0,0 +1,362 @@
+"""Read-only JSON API of pre-aggregated series per uploaded dataset."""
+
+import datetime as dt
+import gzip
+import hashlib
+import json
+import re
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import polars as pl
+from flask import Response, abort, request
+
+from backend import aggregates, calendar_view, datasets, scores
+from backend.cache import cache_key, cached_arrays, cached_cleaning_driver, cached_tag_tables
+from backend.data_cleaning import PIPELINE_VERSION
+from backend.downsample import METHODS, PLOT_WIDTH
+from backend.ngrams import LANGUAGE, TOP_N
+from frontend import app
+
+
+# Bump whenever a change to the aggregations or payloads changes a response; the cleaned
+# frames they are built from are covered by PIPELINE_VERSION.
+API_VERSION = "1"
+
+# Datasets are named by the SHA-256 of their upload, see frontend.uploads.
+DATASET_ID = re.compile(r"[0-9a-f]{64}")
+
+# Responses smaller than this are not worth compressing.
+MIN_COMPRESS_BYTES = 512
+
+# Numeric columns of the cleaned frame that can be fetched as a series.
+SERIES_COLUMNS = (
+    "average_score",
+    "score_count",
+    "score_min",
+    "score_max",
+    "score_variance",
+    "monthly_mean_score",
+    "yearly_mean_score",
+    "word_count",
+    "char_count",
+)
+
+# Bounds for the width a series is downsampled to; LTTB keeps the first and last point
+# and needs one bucket in between.
+MIN_WIDTH = 3
+MAX_WIDTH = 10_000
+
+
+def load_dataset(
+    dataset_id: str,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+) -> pl.DataFrame:
+    """
+    Purpose:
+        Load the cleaned frame of an uploaded dataset, aborting with 404 if there is
+        none. Datasets already in the store only read the years overlapping start to
+        end; others are cleaned from their upload.
+    Args:
+        dataset_id: Content hash of the upload.
+        start: First date needed, all years if not given.
+        end: Last date needed, all years if not given.
+    Returns:
+        Cleaned Pixels data, possibly with rows outside start to end.
+    """
+    if not DATASET_ID.fullmatch(dataset_id):
+        abort(404)
+    try:
+        return datasets.load_user(dataset_id, start=start, end=end)
+    except LookupError:
+        pass
+
+    path = Path(app.config["UPLOAD_FOLDER"], f"{dataset_id}.json")
+    if not path.exists():
+        abort(404)
+    return cached_cleaning_driver(str(path))
+
+
+def series_response(  # noqa: PLR0913
+    dataset_id: str,
+    series: str,
+    params: dict,
+    build: Callable[[Any], object],
+    *,
+    start: dt.date | None = None,
+    end: dt.date | None = None,
+    load: Callable[[], Any] | None = None,
+) -> Response:
+    """
+    Purpose:
+        Build a compact, optionally gzipped JSON response with a strong ETag. The
+        dataset id is its content hash, so the ETag only depends on it, the pipeline and
+        API versions, the series and its parameters; a matching If-None-Match gets a
+        304 without loading the dataset.
+    Args:
+        dataset_id: Content hash of the upload.
+        series: Name of the series, part of the ETag.
+        params: Request parameters the series depends on, part of the ETag.
+        build: Turns the loaded data into the JSON payload.
+        start: First date needed, passed to load_dataset.
+        end: Last date needed, passed to load_dataset.
+        load: Loads what build gets instead of the cleaned dataset.
+    Returns:
+        The JSON response, or an empty 304 response.
+    """
+    gzipped = "gzip" in request.accept_encodings
+    key = json.dumps(
+        [dataset_id, PIPELINE_VERSION, API_VERSION, series, params, gzipped],
+        sort_keys=True,
+    )
+    etag = hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        data = load_dataset(dataset_id, start, end) if load is None else load()
+        body = json.dumps(build(data), separators=(",", ":")).encode("utf-8")
+        response = Response(body, mimetype="application/json")
+        if gzipped and len(body) >= MIN_COMPRESS_BYTES:
+            response.set_data(gzip.compress(body))
+            response.headers["Content-Encoding"] = "gzip"
+
+    response.set_etag(etag)
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.route("/api/datasets/<dataset_id>/monthly")
+def monthly_series(dataset_id: str) -> Response:
+    """
+    Purpose:
+        Serve the mean score and number of days per year and month.
+    Args:
+        dataset_id: Content hash of the upload.
+    Returns:
+        JSON response, see series_response.
+    """
+    return series_response(
+        dataset_id,
+        "monthly",
+        {},
+        lambda data: aggregates.to_columns(aggregates.monthly_means(data)),
+    )
+
+
+@app.route("/api/datasets/<dataset_id>/yearly")
+def yearly_series(dataset_id: str) -> Response:
+    """
+    Purpose:
+        Serve the mean score and number of days per year.
+    Args:
+        dataset_id: Content hash of the upload.
+    Returns:
+        JSON response, see series_response.
+    """
+    return series_response(
+        dataset_id,
+        "yearly",
+        {},
+        lambda data: aggregates.to_columns(aggregates.yearly_means(data)),
+    )
+
+
+@app.route("/api/datasets/<dataset_id>/rolling")
+def rolling_series(dataset_id: str) -> Response:
+    """
+    Purpose:
+        Serve the rolling mean and standard deviation over ?window= days.
+    Args:
+        dataset_id: Content hash of the upload.
+    Returns:
+        JSON response, see series_response.
+    """
+    window = request.args.get("window", 30, type=int)
+    if window < 1:
+        abort(400, description="window must be a positive number of days.")
+    return series_response(
+        dataset_id,
+        "rolling",
+        {"window": window},
+        lambda data: aggregates.to_columns(aggregates.rolling_statistics(data, window)),
+    )
+
+
+@app.route("/api/datasets/<dataset_id>/ngrams")
+def ngram_series(dataset_id: str) -> Response:
+    """
+    Purpose:
+        Serve the ?top_n= most common words and bigrams in notes.
+    Args:
+        dataset_id: Content hash of the upload.
+    Returns:
+        JSON response, see series_response.
+    """
+    top_n = request.args.get("top_n", TOP_N, type=int)
+    if top_n < 1:
+        abort(400, description="top_n must be a positive number.")
+    return series_response(
+        dataset_id,
+        "ngrams",
+        {"top_n": top_n, "language": LANGUAGE},
+        lambda data: {
+            name: aggregates.to_columns(frame)
+            for name, frame in aggregates.top_ngrams(data, LANGUAGE, top_n).items()
+        },
+    )
+
+
+@app.route("/api/datasets/<dataset_id>/scores")
+def score_series(dataset_id: str) -> Response:
+    """
+    Purpose:
+        Serve score statistics per Pixel type and per score slot.
+    Args:
+        dataset_id: Content hash of the upload.
+    Returns:
+        JSON response, see series_response.
+    """
+    return series_response(
+        dataset_id,
+        "scores",
+        {},
+        lambda data: {
+            name: aggregates.to_columns(frame)
+            for name, frame in scores.score_statistics(data).items()
+        },
+    )
+
+
+@app.route("/api/datasets/<dataset_id>/tags")
+def tag_series(dataset_id: str) -> Response:
+    """
+    Purpose:
+        Serve tag mean scores, co-occurrences and month counts.
+    Args:
+        dataset_id: Content hash of the upload.
+    Returns:
+        JSON response, see series_response.
+    """
+    # The id names the cache entries, so it is checked before the lookup.
+    if not DATASET_ID.fullmatch(dataset_id):
+        abort(404)
+    return series_response(
+        dataset_id,
+        "tags",
+        {},
+        lambda tables: {name: aggregates.to_columns(frame) for name, frame in tables.items()},
+        # Tables precomputed by the job, built from the dataset only on a miss.
+        load=lambda: cached_tag_tables(
+            dataset_id,
+            lambda: load_dataset(dataset_id),
+            names=("means", "cooccurrence", "months"),
+        ),
+    )
+
+
+@app.route("/api/datasets/<dataset_id>/missing")
+def missing_series(dataset_id: str) -> Response:
+    """
+    Purpose:
+        Serve the runs of days without a Pixel and the gap and streak statistics.
+    Args:
+        dataset_id: Content hash of the upload.
+    Returns:
+        JSON response, see series_response.
+    """
+
+    def build(data: pl.DataFrame) -> dict:
+        missing = aggregates.missing_days(data)
+        return {
+            "ranges": aggregates.to_columns(missing["ranges"]),
+            "statistics": missing["statistics"],
+        }
+
+    return series_response(dataset_id, "missing", {}, build)
+
+
+@app.route("/api/datasets/<dataset_id>/calendar")
+def calendar_series(dataset_id: str) -> Response:
+    """
+    Purpose:
+        Serve the year-in-pixels calendar, weekday means and streaks.
+    Args:
+        dataset_id: Content hash of the upload.
+    Returns:
+        JSON response, see series_response.
+    """
+    # The id names the cache entry, so it is checked before the lookup.
+    if not DATASET_ID.fullmatch(dataset_id):
+        abort(404)
+    today = dt.datetime.now().astimezone().date()
+    return series_response(
+        dataset_id,
+        "calendar",
+        # The current streak depends on the day.
+        {"today": today.isoformat()},
+        lambda calendar: calendar_view.to_json(calendar, today),
+        # Artifacts precomputed by the job, built from the dataset only on a miss.
+        load=lambda: cached_arrays(
+            f"{cache_key(dataset_id)}-calendar",
+            lambda: calendar_view.build_calendar(load_dataset(dataset_id)),
+        ),
+    )
+
+
+@app.route("/api/datasets/<dataset_id>/series")
+def downsampled_series(dataset_id: str) -> Response:
+    """
+    Purpose:
+        Serve a ?column= over ?start= to ?end=, downsampled to ?width= points by ?method=.
+    Args:
+        dataset_id: Content hash of the upload.
+    Returns:
+        JSON response, see series_response.
+    """
+    column = request.args.get("column", "average_score")
+    method = request.args.get("method", "lttb")
+    width = request.args.get("width", PLOT_WIDTH, type=int)
+    try:
+        # args.get(type=...) would silently fall back to None on a malformed date.
+        start, end = (
+            dt.date.fromisoformat(request.args[bound]) if bound in request.args else None
+            for bound in ("start", "end")
+        )
+    except ValueError:
+        abort(400, description="start and end must be dates like 2024-01-31.")
+
+    if column not in SERIES_COLUMNS:
+        abort(400, description=f"column must be one of {', '.join(SERIES_COLUMNS)}.")
+    if method not in METHODS:
+        abort(400, description=f"method must be one of {', '.join(METHODS)}.")
+    if not MIN_WIDTH <= width <= MAX_WIDTH:
+        abort(400, description=f"width must be between {MIN_WIDTH} and {MAX_WIDTH}.")
+
+    params = {
+        "column": column,
+        "start": start and start.isoformat(),
+        "end": end and end.isoformat(),
+        "width": width,
+        "method": method,
+    }
+    return series_response(
+        dataset_id,
+        "series",
+        params,
+        lambda data: aggregates.to_columns(
+            aggregates.downsampled_series(
+                data,
+                column,
+                start=start,
+                end=end,
+                width=width,
+                method=method,
+            ),
+        ),
+        start=start,
+        end=end,
+    )
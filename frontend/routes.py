@@ -1,49 +1,106 @@
 """Website routing."""
 
+from flask import abort, flash, jsonify, redirect, render_template, request, url_for
+from werkzeug.wrappers import Response
+
+from backend.jobs import find_job, get_job, submit_job
 from frontend import app
-from flask import render_template, request, jsonify, session, flash, request, redirect, url_for
-import os
-import time
+from frontend.uploads import UploadError, open_file_part, save_upload
+
+
+ALLOWED_EXTENSIONS = {"json"}
 
+UPLOAD_FORM = """
+    <!doctype html>
+    <title>Upload new File</title>
+    <h1>Upload new File</h1>
+    <form method=post enctype=multipart/form-data>
+      <input type=file name=file>
+      <input type=submit value=Upload>
+    </form>
+    """
 
-UPLOAD_DIR = os.path.join("backend", "uploads")
-ALLOWED_EXTENSIONS = {'json'}
 
 @app.route("/")
 @app.route("/index")
 @app.route("/index.html")
-def index():
+def index() -> str:
+    """
+    Purpose:
+        Render the landing page.
+    Returns:
+        HTML of the page.
+    """
     return render_template("index.html")
 
 
-def allowed_file(filename):
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+def allowed_file(filename: str) -> bool:
+    """
+    Purpose:
+        Check that an uploaded file has an allowed extension.
+    Args:
+        filename: Name of the uploaded file.
+    Returns:
+        Whether the extension is in ALLOWED_EXTENSIONS.
+    """
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-@app.route('/', methods=['GET', 'POST'])
-def upload_file():
-    if request.method == 'POST':
-        # check if the post request has the file part
-        if 'file' not in request.files:
-            flash('No file part')
+@app.route("/", methods=["GET", "POST"])
+def upload_file() -> str | Response:
+    """
+    Purpose:
+        Show the upload form, or save an uploaded backup and queue its report.
+    Returns:
+        The form, or a redirect to the job's status.
+    """
+    if request.method == "POST":
+        # The body is parsed here, not through request.files, so the file is read
+        # straight from the request while it is validated; Werkzeug's form parser
+        # would first spool the whole body to a temporary file.
+        boundary = request.mimetype_params.get("boundary")
+        if request.mimetype != "multipart/form-data" or not boundary:
+            flash("No file part")
+            return redirect(request.url)
+        try:
+            filename, chunks = open_file_part(request.stream, boundary.encode(), "file")
+        except UploadError:
+            flash("No file part")
             return redirect(request.url)
-        file = request.files['file']
         # If the user does not select a file, the browser submits an
         # empty file without a filename.
-        if file.filename == '':
-            flash('No selected file')
+        if not filename:
+            flash("No selected file")
             return redirect(request.url)
-        if file and allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
-            return redirect(url_for('download_file', name=filename))
-    return '''
-    <!doctype html>
-    <title>Upload new File</title>
-    <h1>Upload new File</h1>
-    <form method=post enctype=multipart/form-data>
-      <input type=file name=file>
-      <input type=submit value=Upload>
-    </form>
-    '''
+        if allowed_file(filename):
+            # Hash and validate while reading, rejecting bad uploads at the first error.
+            try:
+                path, duplicate = save_upload(
+                    chunks,
+                    app.config["UPLOAD_FOLDER"],
+                    app.config["MAX_UPLOAD_BYTES"],
+                )
+            except UploadError as exc:
+                abort(400, description=str(exc))
+            # Content already processed reuses its job instead of queueing another.
+            job = find_job(path) if duplicate else None
+            # Cleaning and rendering run on the worker pool, poll the job for progress.
+            job_id = job["id"] if job else submit_job(path)
+            return redirect(url_for("job_status", job_id=job_id))
+    return UPLOAD_FORM
+
+
+@app.route("/jobs/<job_id>")
+def job_status(job_id: str) -> Response:
+    """
+    Purpose:
+        Progress of a background clean-and-render job.
+    Args:
+        job_id: Identifier of the job.
+    Returns:
+        The job's columns as JSON, or 404 if there is no such job.
+    """
+    job = get_job(job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job)
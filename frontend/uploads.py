@@ -0,0 +1,233 @@
+"""Streaming upload handling: hash, validate, and deduplicate Pixels backups."""
+
+import codecs
+import datetime as dt
+import hashlib
+import tempfile
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.sansio.multipart import Data, Epilogue, Event, File, MultipartDecoder, NeedData
+
+from backend.streaming import iter_json_records
+
+
+# Default upper bound for an upload in bytes.
+MAX_UPLOAD_BYTES = 64 * 1024 * 1024
+
+# Bytes read from the upload per chunk.
+CHUNK_SIZE = 64 * 1024
+
+# Expected type of every field of a Pixel.
+PIXEL_SCHEMA = {"date": str, "type": str, "scores": list, "notes": str, "tags": list}
+
+# Format of Pixel dates, with or without zero padding.
+DATE_FORMAT = "%Y-%m-%d"
+
+
+class UploadError(ValueError):
+    """Raised when an upload is not a valid Pixels backup."""
+
+
+def validate_pixel(record: object, position: int) -> None:
+    """
+    Purpose:
+        Check one Pixel against the backup schema.
+    Args:
+        record: Parsed element of the backup array.
+        position: Index of the element, for the error message.
+    Raises:
+        UploadError: If the Pixel is missing a field, a field has the wrong type, or the
+            date is not a %Y-%m-%d date.
+    """
+    if not isinstance(record, dict):
+        msg = f"Pixel {position} is not an object."
+        raise UploadError(msg)
+
+    for field, field_type in PIXEL_SCHEMA.items():
+        if not isinstance(record.get(field), field_type):
+            msg = f"Pixel {position} needs a {field_type.__name__} {field!r}."
+            raise UploadError(msg)
+
+    if not all(isinstance(score, int | float) for score in record["scores"]):
+        msg = f"Pixel {position} has a score that is not a number."
+        raise UploadError(msg)
+
+    # Cleaning parses dates with this format, e.g. "2021-1-31".
+    try:
+        dt.datetime.strptime(record["date"], DATE_FORMAT)  # noqa: DTZ007
+    except ValueError:
+        msg = f"Pixel {position} has a date that is not {DATE_FORMAT}: {record['date']!r}."
+        raise UploadError(msg) from None
+
+
+def validate_backup(text: Iterable[str]) -> None:
+    """
+    Purpose:
+        Validate every Pixel of a backup while it is parsed.
+    Args:
+        text: Text chunks of the backup.
+    Raises:
+        UploadError: If the backup is not valid JSON, has no Pixels, has a bad Pixel,
+            or has content after the Pixels array.
+    """
+    count = 0
+    try:
+        for count, (record, _) in enumerate(iter_json_records(text), start=1):
+            validate_pixel(record, count - 1)
+    except UploadError:
+        raise
+    except ValueError as exc:
+        # Malformed JSON, content after the array, or text that is not UTF-8.
+        msg = f"The backup is not valid JSON: {exc}"
+        raise UploadError(msg) from exc
+
+    if count == 0:
+        msg = "The backup has no Pixels."
+        raise UploadError(msg)
+
+
+def open_file_part(stream: BinaryIO, boundary: bytes, field: str) -> tuple[str, Iterator[bytes]]:
+    """
+    Purpose:
+        Parse a multipart/form-data request body up to the file part named field, so
+        the file can be read straight from the request instead of from a temporary
+        file holding the whole body. Parts before it are skipped.
+    Args:
+        stream: Binary stream of the request body.
+        boundary: Multipart boundary from the Content-Type header.
+        field: Name of the file input.
+    Returns:
+        filename: Name of the file as sent by the browser, empty if none was selected.
+        chunks: Bytes of the file, read from stream as they are consumed.
+    Raises:
+        UploadError: If the body has no file part named field, or is not valid
+            form data.
+    """
+    events = iter_multipart(stream, boundary)
+    try:
+        for event in events:
+            if isinstance(event, File) and event.name == field:
+                return event.filename, file_chunks(events)
+    except ValueError as exc:
+        msg = f"The upload is not valid form data: {exc}"
+        raise UploadError(msg) from exc
+
+    msg = f"The upload has no {field!r} file."
+    raise UploadError(msg)
+
+
+def iter_multipart(stream: BinaryIO, boundary: bytes) -> Iterator[Event]:
+    """
+    Purpose:
+        Decode a multipart/form-data body while reading it chunk by chunk. The
+        decoder raises ValueError once the body turns out not to be valid form data,
+        e.g. cut off.
+    Args:
+        stream: Binary stream of the request body.
+        boundary: Multipart boundary from the Content-Type header.
+    Yields:
+        Events of werkzeug.sansio.multipart, up to and including the Epilogue.
+    """
+    decoder = MultipartDecoder(boundary)
+    while not isinstance(event := decoder.next_event(), Epilogue):
+        if isinstance(event, NeedData):
+            # An empty read ends the body; the decoder then expects the final boundary.
+            decoder.receive_data(stream.read(CHUNK_SIZE) or None)
+        else:
+            yield event
+    yield event
+
+
+def file_chunks(events: Iterator[Event]) -> Iterator[bytes]:
+    """
+    Purpose:
+        Read the data of the file part that the multipart events are at.
+    Args:
+        events: Multipart events following the part's File event, see iter_multipart.
+    Yields:
+        Bytes of the file.
+    Raises:
+        UploadError: If the body ends before the file does.
+    """
+    try:
+        for event in events:
+            if isinstance(event, Data):
+                yield event.data
+                if not event.more_data:
+                    return
+    except ValueError as exc:
+        msg = f"The upload is not valid form data: {exc}"
+        raise UploadError(msg) from exc
+
+
+def read_upload(
+    chunks: Iterable[bytes],
+    max_bytes: int,
+    *consumers: Callable[[bytes], object],
+) -> Iterator[str]:
+    """
+    Purpose:
+        Read an upload chunk by chunk, handing every chunk to consumers before it is
+        decoded, e.g. to hash and save it.
+    Args:
+        chunks: Bytes of the uploaded file.
+        max_bytes: Upper bound for the upload in bytes.
+        *consumers: Called with every chunk of bytes.
+    Yields:
+        Decoded text chunks.
+    Raises:
+        RequestEntityTooLarge: Once more than max_bytes are read.
+    """
+    size = 0
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    for block in chunks:
+        size += len(block)
+        if size > max_bytes:
+            msg = f"Uploads are limited to {max_bytes} bytes."
+            raise RequestEntityTooLarge(msg)
+        for consume in consumers:
+            consume(block)
+        yield decoder.decode(block)
+    yield decoder.decode(b"", final=True)
+
+
+def save_upload(
+    chunks: Iterable[bytes],
+    upload_dir: str,
+    max_bytes: int = MAX_UPLOAD_BYTES,
+) -> tuple[str, bool]:
+    """
+    Purpose:
+        Write an upload to disk chunk by chunk while hashing it and validating every
+        Pixel, stopping at the first bad Pixel or with RequestEntityTooLarge once the
+        size limit is passed. Files are named by their content hash, so a repeated
+        upload is not stored twice.
+    Args:
+        chunks: Bytes of the uploaded file, e.g. from open_file_part.
+        upload_dir: Directory uploads are saved to.
+        max_bytes: Upper bound for the upload in bytes.
+    Returns:
+        path: Path of the saved upload.
+        duplicate: Whether the same content was already uploaded.
+    """
+    Path(upload_dir).mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+
+    with tempfile.NamedTemporaryFile(dir=upload_dir, suffix=".part", delete=False) as tmp:
+        tmp_path = Path(tmp.name)
+        try:
+            validate_backup(read_upload(chunks, max_bytes, digest.update, tmp.write))
+        except BaseException:
+            tmp_path.unlink()
+            raise
+
+    path = Path(upload_dir, f"{digest.hexdigest()}.json")
+    if path.exists():
+        tmp_path.unlink()
+        return str(path), True
+
+    tmp_path.replace(path)
+    return str(path), False
@@ -0,0 +1,56 @@
+"""Backups shared by the tests."""
+
+from pathlib import Path
+
+import pytest
+
+from backend.synthetic import write_backup
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# The sample backup shipped with the repo: one Pixel per day, without tags.
+TESTFILE = ROOT / "backend" / "uploads" / "testfile.json"
+
+# Pixel types recorded every day of the multi-type backup.
+TYPES = ("Mood", "Sleep", "Energy")
+
+
+@pytest.fixture(scope="session")
+def testfile() -> str:
+    """
+    Purpose:
+        Path to the sample backup.
+    Returns:
+        Path to backend/uploads/testfile.json.
+    """
+    return str(TESTFILE)
+
+
+@pytest.fixture(scope="session")
+def multi_type_backup(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """
+    Purpose:
+        Synthetic backup with several Pixels per day, one per type in TYPES, with tags
+        and runs of missing days.
+    Args:
+        tmp_path_factory: pytest's session temporary directories.
+    Returns:
+        Path to the backup.
+    """
+    path = tmp_path_factory.mktemp("backups") / "multi-type.json"
+    write_backup(str(path), 1000, seed=1, types=TYPES, gap_rate=0.05)
+    return str(path)
+
+
+@pytest.fixture(scope="session", params=["testfile", "multi_type_backup"])
+def backup(request: pytest.FixtureRequest) -> str:
+    """
+    Purpose:
+        Run a test on the sample backup and on the multi-type backup.
+    Args:
+        request: The fixture request, naming the backup fixture to use.
+    Returns:
+        Path to the backup.
+    """
+    return request.getfixturevalue(request.param)
@@ -0,0 +1,48 @@
+"""Confidence intervals of the batch term comparison."""
+
+import numpy as np
+import polars as pl
+import pytest
+from scipy import stats
+
+from backend.analysis import CONFIDENCE_LEVEL, compare_average_score_with_terms
+
+
+@pytest.fixture
+def data() -> pl.DataFrame:
+    """
+    Purpose:
+        Notes mentioning "walk" on three days, "swim" on one, and "cake" on none.
+    Returns:
+        Pixels data with notes and scores.
+    """
+    return pl.DataFrame({
+        "notes": ["walk", "walk home", "long walk", "swim", "work", "work", None],
+        "average_score": [4.0, 5.0, 3.0, 2.0, 1.0, 3.0, 5.0],
+    })
+
+
+def test_interval_is_students_t(data: pl.DataFrame) -> None:
+    """Bounds match the t-interval of the scores of each group of days."""
+    result = compare_average_score_with_terms(data, ["walk"])
+
+    for contains, scores in ((True, [4.0, 5.0, 3.0]), (False, [2.0, 1.0, 3.0])):
+        row = result.filter(pl.col("contains_term") == contains).row(0, named=True)
+        low, high = stats.t.interval(
+            CONFIDENCE_LEVEL,
+            len(scores) - 1,
+            loc=np.mean(scores),
+            scale=stats.sem(scores),
+        )
+        assert row["count"] == len(scores)
+        assert row["ci_low"] == pytest.approx(low)
+        assert row["ci_high"] == pytest.approx(high)
+
+
+def test_no_interval_below_two_days(data: pl.DataFrame) -> None:
+    """Groups of one day or none get null bounds instead of a zero-width interval."""
+    result = compare_average_score_with_terms(data, ["swim", "cake"]).filter("contains_term")
+
+    assert result["count"].to_list() == [1, 0]
+    assert result["ci_low"].null_count() == len(result)
+    assert result["ci_high"].null_count() == len(result)
@@ -0,0 +1,120 @@
+"""Conditional requests and compression of the JSON API."""
+
+import gzip
+import hashlib
+import json
+import shutil
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+from flask.testing import FlaskClient
+
+from backend import tags
+from frontend import api, app
+
+
+@pytest.fixture
+def client(testfile: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> FlaskClient:
+    """
+    Purpose:
+        Test client serving the sample backup as an upload, with the upload folder,
+        store and cache under a temporary directory.
+    Args:
+        testfile: Path to the sample backup.
+        tmp_path: Temporary working directory.
+        monkeypatch: pytest's monkeypatch fixture.
+    Returns:
+        Flask test client.
+    """
+    monkeypatch.chdir(tmp_path)
+    uploads = Path(app.config["UPLOAD_FOLDER"])
+    uploads.mkdir(parents=True)
+    shutil.copyfile(testfile, uploads / f"{dataset_id(testfile)}.json")
+    return app.test_client()
+
+
+def dataset_id(path: str) -> str:
+    """
+    Purpose:
+        Name a backup like frontend.uploads does.
+    Args:
+        path: Path to the backup.
+    Returns:
+        Hex SHA-256 digest of the file.
+    """
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def test_matching_etag_gets_304(client: FlaskClient, testfile: str) -> None:
+    """A repeated request with the ETag gets an empty 304 carrying the same ETag."""
+    url = f"/api/datasets/{dataset_id(testfile)}/monthly"
+
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.get_etag()[0]
+
+    revalidated = client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+    assert revalidated.status_code == HTTPStatus.NOT_MODIFIED
+    assert not revalidated.data
+    assert revalidated.headers["ETag"] == response.headers["ETag"]
+
+
+def test_etag_depends_on_parameters_and_encoding(client: FlaskClient, testfile: str) -> None:
+    """Other parameters or a gzipped body get another ETag, so a stale one is a miss."""
+    url = f"/api/datasets/{dataset_id(testfile)}/rolling"
+
+    etag = client.get(url, query_string={"window": 7}).headers["ETag"]
+    other_window = client.get(url, query_string={"window": 30}, headers={"If-None-Match": etag})
+    gzipped = client.get(
+        url,
+        query_string={"window": 7},
+        headers={"If-None-Match": etag, "Accept-Encoding": "gzip"},
+    )
+
+    assert other_window.status_code == HTTPStatus.OK
+    assert gzipped.status_code == HTTPStatus.OK
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert (
+        json.loads(gzip.decompress(gzipped.data))
+        == client.get(url, query_string={"window": 7}).json
+    )
+
+
+def test_unknown_dataset_is_404(client: FlaskClient) -> None:
+    """Ids that are not an uploaded backup's hash are not found."""
+    assert client.get("/api/datasets/not-a-hash/monthly").status_code == HTTPStatus.NOT_FOUND
+    assert client.get(f"/api/datasets/{'0' * 64}/monthly").status_code == HTTPStatus.NOT_FOUND
+
+
+def test_tags_are_served_from_the_cache(
+    client: FlaskClient,
+    multi_type_backup: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The tag tables are computed once, later requests read them from the cache."""
+    uploads = Path(app.config["UPLOAD_FOLDER"])
+    shutil.copyfile(multi_type_backup, uploads / f"{dataset_id(multi_type_backup)}.json")
+    url = f"/api/datasets/{dataset_id(multi_type_backup)}/tags"
+
+    first = client.get(url)
+    monkeypatch.setattr(tags, "tag_statistics", pytest.fail)
+    second = client.get(url)
+
+    assert first.status_code == second.status_code == HTTPStatus.OK
+    assert set(first.json) == {"means", "cooccurrence", "months"}
+    assert second.json == first.json
+
+
+def test_etag_depends_on_api_version(
+    client: FlaskClient,
+    testfile: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Bumping API_VERSION turns the ETags of earlier responses into misses."""
+    url = f"/api/datasets/{dataset_id(testfile)}/monthly"
+    etag = client.get(url).headers["ETag"]
+
+    monkeypatch.setattr(api, "API_VERSION", f"{api.API_VERSION}-next")
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == HTTPStatus.OK
@@ -0,0 +1,68 @@
+"""On-disk cache entries, their atomic writes and their eviction."""
+
+import os
+from pathlib import Path
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from backend import cache, tags
+from backend.data_cleaning import data_cleaning_driver
+
+
+@pytest.mark.parametrize("fmt", list(cache.FORMATS))
+def test_cached_frame_round_trip(tmp_path: Path, fmt: str) -> None:
+    """A hit returns the stored frame, and no temporary file is left behind."""
+    data = pl.DataFrame({"a": [1, 2, 3]})
+    name = cache.cache_key("content")
+
+    cache.cached_frame(name, lambda: data, str(tmp_path), fmt)
+    hit = cache.cached_frame(name, pytest.fail, str(tmp_path), fmt)
+
+    assert_frame_equal(hit, data)
+    assert [path.name for path in tmp_path.iterdir()] == [f"{name}.{cache.FORMATS[fmt]}"]
+
+
+def test_eviction_skips_removed_and_unfinished_files(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Entries removed by another process are skipped and files being written are kept."""
+    for name in ("a", "b", f"c{cache.TMP_SUFFIX}"):
+        (tmp_path / name).write_bytes(b"x" * 100)
+
+    # Another process removes "a" between listing the directory and deleting it.
+    scandir = os.scandir
+
+    def racing_scandir(path: str) -> list[os.DirEntry]:
+        entries = list(scandir(path))
+        (tmp_path / "a").unlink()
+        return entries
+
+    monkeypatch.setattr(cache.os, "scandir", racing_scandir)
+    cache.evict_lru(str(tmp_path), 0)
+
+    assert [path.name for path in tmp_path.iterdir()] == [f"c{cache.TMP_SUFFIX}"]
+
+
+@pytest.mark.parametrize("max_bytes", [0, cache.DEFAULT_MAX_BYTES])
+def test_cached_tag_statistics(
+    multi_type_backup: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    max_bytes: int,
+) -> None:
+    """Every tag table is returned even if evicted right after writing, and a hit builds none."""
+    expected = tags.tag_statistics(data_cleaning_driver(multi_type_backup))
+
+    first = cache.cached_tag_statistics(multi_type_backup, str(tmp_path), max_bytes=max_bytes)
+    if max_bytes:
+        monkeypatch.setattr(tags, "tag_statistics", pytest.fail)
+    second = cache.cached_tag_statistics(multi_type_backup, str(tmp_path), max_bytes=max_bytes)
+
+    for tables in (first, second):
+        assert list(tables) == list(tags.TABLES)
+        for name, table in tables.items():
+            assert_frame_equal(table, expected[name], categorical_as_str=True)
+    assert not list(tmp_path.glob(f"*{cache.TMP_SUFFIX}"))
@@ -0,0 +1,43 @@
+"""Equivalence of the eager and lazy cleaning pipelines, and of the gap scan."""
+
+import polars as pl
+from polars.testing import assert_frame_equal, assert_series_equal
+
+from backend.data_cleaning import data_cleaning_driver, gap_statistics, missing_ranges
+
+
+def calendar_missing_dates(data: pl.DataFrame) -> pl.Series:
+    """
+    Purpose:
+        Find the days without a Pixel the way cleaning used to: a full calendar from
+        the first to the last Pixel, anti-joined with the dates.
+    Args:
+        data: Cleaned Pixels data.
+    Returns:
+        Dates of the days without a Pixel.
+    """
+    calendar = pl.DataFrame({
+        "date": pl.date_range(data["date"].min(), data["date"].max(), interval="1d", eager=True),
+    })
+    return calendar.join(data.select("date"), on="date", how="anti")["date"]
+
+
+def test_lazy_matches_eager(backup: str) -> None:
+    """The single LazyFrame plan gives exactly the frame of the eager steps."""
+    assert_frame_equal(
+        data_cleaning_driver(backup, lazy=True),
+        data_cleaning_driver(backup, lazy=False),
+    )
+
+
+def test_gap_scan_matches_calendar_join(backup: str) -> None:
+    """Expanded gaps are the days the calendar join finds, with repeated dates per day."""
+    data = data_cleaning_driver(backup)
+    gaps = missing_ranges(data)
+
+    expanded = gaps.select(pl.date_ranges("start", "end").explode().alias("date"))["date"]
+    assert_series_equal(expanded, calendar_missing_dates(data))
+    assert gaps["days"].sum() == len(expanded)
+
+    statistics = gap_statistics(gaps, data["date"].min(), data["date"].max())
+    assert statistics["days_with_pixels"] == data["date"].n_unique()
@@ -0,0 +1,46 @@
+"""Scans of the partitioned dataset store across users and years."""
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from backend import datasets
+from backend.data_cleaning import data_cleaning_driver
+from backend.tags import TAGS_DTYPE
+
+
+@pytest.fixture
+def store(testfile: str, multi_type_backup: str, tmp_path: Path) -> dict[str, str]:
+    """
+    Purpose:
+        Store the sample backup, whose tags are a list of nulls, and the multi-type
+        backup, with tags, as two users.
+    Args:
+        testfile: Path to the sample backup.
+        multi_type_backup: Path to the multi-type backup.
+        tmp_path: pytest's temporary directory.
+    Returns:
+        Root and db_path of the store.
+    """
+    paths = {"root": str(tmp_path / "datasets"), "db_path": str(tmp_path / "catalog.sqlite")}
+    datasets.store_dataset("sample", data_cleaning_driver(testfile), **paths)
+    datasets.store_dataset("multi", data_cleaning_driver(multi_type_backup), **paths)
+    return paths
+
+
+def test_users_with_and_without_tags_are_scanned_together(
+    store: dict[str, str],
+    testfile: str,
+    multi_type_backup: str,
+) -> None:
+    """Partitions with differing tag types combine into one frame, and days are distinct."""
+    scanned = datasets.scan_datasets(db_path=store["db_path"]).collect()
+    summary = datasets.user_summary(db_path=store["db_path"])
+
+    assert scanned.schema["tags"] == TAGS_DTYPE
+    for user, backup in (("sample", testfile), ("multi", multi_type_backup)):
+        data = data_cleaning_driver(backup)
+        assert scanned.filter(pl.col("user") == user).height == data.height
+        days = summary.filter(pl.col("user") == user)["days"].item()
+        assert days == data["date"].n_unique()
@@ -0,0 +1,70 @@
+"""Downsampling of time series to a pixel width."""
+
+import numpy as np
+import pytest
+
+from backend.downsample import METHODS, downsample_indices
+
+
+# Length of the generated series, well above the widths it is downsampled to.
+SERIES_LENGTH = 10_000
+
+
+@pytest.fixture(scope="module")
+def series() -> tuple[np.ndarray, np.ndarray]:
+    """
+    Purpose:
+        Daily random walk with a spike and a few missing values.
+    Returns:
+        Dates and values.
+    """
+    rng = np.random.default_rng(0)
+    dates = np.arange("2000-01-01", SERIES_LENGTH, dtype="datetime64[D]")
+    values = rng.normal(size=SERIES_LENGTH).cumsum()
+    values[SERIES_LENGTH // 3] = values.max() + 100
+    values[rng.choice(SERIES_LENGTH, 50, replace=False)] = np.nan
+    return dates, values
+
+
+@pytest.mark.parametrize("method", METHODS)
+@pytest.mark.parametrize("width", [3, 100, 1200])
+def test_points_fit_the_width(
+    series: tuple[np.ndarray, np.ndarray],
+    method: str,
+    width: int,
+) -> None:
+    """At most width sorted, distinct points with a value are kept, including the ends."""
+    dates, values = series
+    kept = downsample_indices(dates, values, width, method)
+    valid = np.flatnonzero(~np.isnan(values))
+
+    assert len(kept) <= width
+    assert np.all(np.diff(kept) > 0)
+    assert not np.isnan(values[kept]).any()
+    if method == "lttb":
+        assert kept[0] == valid[0]
+        assert kept[-1] == valid[-1]
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_extremes_are_kept(series: tuple[np.ndarray, np.ndarray], method: str) -> None:
+    """A spike survives downsampling, so the plot still shows it."""
+    dates, values = series
+    kept = downsample_indices(dates, values, 100, method)
+
+    assert np.nanargmax(values) in kept
+
+
+@pytest.mark.parametrize("method", METHODS)
+def test_short_series_is_kept_whole(method: str) -> None:
+    """Series with fewer points than the width only lose their missing values."""
+    values = np.array([1.0, np.nan, 3.0, 2.0])
+    kept = downsample_indices(np.arange(len(values)), values, 100, method)
+
+    assert kept.tolist() == [0, 2, 3]
+
+
+def test_unknown_method_is_rejected() -> None:
+    """Only the methods in METHODS are accepted."""
+    with pytest.raises(ValueError, match="Unknown downsampling method"):
+        downsample_indices(np.arange(10), np.arange(10), 5, "mean")
@@ -0,0 +1,73 @@
+"""Import-time budgets for backend entry points, measured with python -X importtime."""
+
+import subprocess  # noqa: S404
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Plotting and NLP packages, only imported by the functions using them.
+HEAVY_PACKAGES = {"matplotlib", "seaborn", "plotly", "sklearn", "textblob", "pandas"}
+
+# Entry points and the most seconds a cold import of each may take.
+# The budgets are a few times the measured times, to catch regressions and not noise.
+BUDGETS = {
+    # Cleaning only.
+    "backend.data_cleaning": 1.0,
+    "backend.cache": 1.0,
+    "backend.streaming": 1.0,
+    # The Flask app with the JSON API.
+    "frontend": 2.0,
+}
+
+# Entry points that must not import HEAVY_PACKAGES.
+LIGHT_MODULES = [*BUDGETS, "backend.plots", "backend.analysis", "backend.jobs", "backend.main"]
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Purpose:
+        Import a module in a fresh interpreter with -X importtime.
+    Args:
+        module: Dotted module name.
+    Returns:
+        Cumulative import time in microseconds per imported module.
+    """
+    # Runs this interpreter on one of the fixed module names above.
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.parametrize("module", LIGHT_MODULES)
+def test_no_heavy_imports(module: str) -> None:
+    """Cleaning, the API, plots and jobs start without the plotting and NLP packages."""
+    imported = {name.split(".")[0] for name in import_times(module)}
+    assert not imported & HEAVY_PACKAGES, f"{module} imports {sorted(imported & HEAVY_PACKAGES)}"
+
+
+@pytest.mark.parametrize(("module", "budget"), BUDGETS.items())
+def test_import_time_budget(module: str, budget: float) -> None:
+    """A cold import of an entry point, with its parent packages, stays within budget."""
+    times = import_times(module)
+
+    # A module's own line excludes its parent packages, which are imported first.
+    parts = module.split(".")
+    seconds = sum(times[".".join(parts[:i])] for i in range(1, len(parts) + 1)) / 1e6
+
+    assert seconds < budget, f"Importing {module} took {seconds:.2f}s, the budget is {budget}s."
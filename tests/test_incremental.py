@@ -0,0 +1,41 @@
+"""Incremental merges of successive backups into the dataset store."""
+
+import datetime as dt
+import json
+from pathlib import Path
+
+from polars.testing import assert_frame_equal
+
+from backend.data_cleaning import data_cleaning_driver, json_to_dataframe
+from backend.datasets import load_user
+from backend.incremental import KEY, changed_rows, incremental_cleaning_driver
+
+
+def test_identical_upload_changes_nothing(backup: str, tmp_path: Path) -> None:
+    """Uploading the same backup again marks no Pixel as changed."""
+    db_path = str(tmp_path / "catalog.db")
+    incremental_cleaning_driver(backup, "user", str(tmp_path / "datasets"), db_path)
+
+    changed = changed_rows(json_to_dataframe(backup), load_user("user", db_path=db_path))
+
+    assert changed.is_empty()
+
+
+def test_changed_pixel_is_merged(multi_type_backup: str, tmp_path: Path) -> None:
+    """Only the edited Pixel is recleaned, and the merge equals cleaning the new backup."""
+    root, db_path = str(tmp_path / "datasets"), str(tmp_path / "catalog.db")
+    incremental_cleaning_driver(multi_type_backup, "user", root, db_path)
+
+    pixels = json.loads(Path(multi_type_backup).read_text(encoding="utf-8"))
+    pixels[1]["scores"] = [1]
+    edited = tmp_path / "edited.json"
+    edited.write_text(json.dumps(pixels), encoding="utf-8")
+
+    changed = changed_rows(json_to_dataframe(str(edited)), load_user("user", db_path=db_path))
+    date = dt.datetime.strptime(pixels[1]["date"], "%Y-%m-%d").date()  # noqa: DTZ007
+    assert changed.select(KEY).rows() == [(date, pixels[1]["type"])]
+
+    assert_frame_equal(
+        incremental_cleaning_driver(str(edited), "user", root, db_path).sort(KEY),
+        data_cleaning_driver(str(edited)).sort(KEY),
+    )
@@ -0,0 +1,51 @@
+"""Bounded stage records and reading the stages after a mark."""
+
+from collections import deque
+
+import pytest
+
+from backend import instrumentation
+
+
+@pytest.fixture(autouse=True)
+def enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Purpose:
+        Record stages into an empty store of at most three records.
+    Args:
+        monkeypatch: pytest's monkeypatch fixture, restoring the records afterwards.
+    """
+    monkeypatch.setattr(instrumentation, "ENABLED", True)
+    monkeypatch.setattr(instrumentation, "_records", deque(maxlen=3))
+
+
+def run_stages(*names: str) -> None:
+    """
+    Purpose:
+        Record one empty stage per name.
+    Args:
+        *names: Stage names.
+    """
+    for name in names:
+        with instrumentation.stage(name):
+            pass
+
+
+def test_oldest_records_are_dropped() -> None:
+    """Only the newest records are kept, however many stages run."""
+    run_stages("a", "b", "c", "d", "e")
+
+    assert [record["name"] for record in instrumentation.records()] == ["c", "d", "e"]
+
+
+def test_records_since_mark() -> None:
+    """A mark selects the stages finished after it, as far as they are still kept."""
+    run_stages("a")
+    first = instrumentation.mark()
+    run_stages("b", "c")
+
+    assert [record["name"] for record in instrumentation.records(since=first)] == ["b", "c"]
+
+    run_stages("d", "e")
+    assert [record["name"] for record in instrumentation.records(since=first)] == ["c", "d", "e"]
+    assert instrumentation.records(since=instrumentation.mark()) == []
@@ -0,0 +1,53 @@
+"""Job records and jobs interrupted by a server restart."""
+
+import subprocess  # noqa: S404
+import sys
+from contextlib import closing
+from pathlib import Path
+
+import psutil
+import pytest
+
+from backend import jobs
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_interrupted_job_is_not_reused(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A queued job of an exited process is failed instead of returned by find_job."""
+    db_path = str(tmp_path / "jobs.sqlite")
+    job_id = jobs.create_job("upload.json", db_path)
+
+    assert jobs.find_job("upload.json", db_path)["id"] == job_id
+
+    def exited(pid: int) -> psutil.Process:
+        raise psutil.NoSuchProcess(pid)
+
+    monkeypatch.setattr(psutil, "Process", exited)
+
+    assert jobs.find_job("upload.json", db_path) is None
+    assert jobs.get_job(job_id, db_path)["status"] == "failed"
+
+
+def test_reused_pid_is_not_the_server(tmp_path: Path) -> None:
+    """A live process with the job's PID but another start time did not queue it."""
+    db_path = str(tmp_path / "jobs.sqlite")
+    job_id = jobs.create_job("upload.json", db_path)
+    with closing(jobs.connect(db_path)) as connection, connection:
+        connection.execute("UPDATE jobs SET started = started - 60 WHERE id = ?", (job_id,))
+
+    assert jobs.fail_interrupted_jobs(db_path) == 1
+    assert jobs.find_job("upload.json", db_path) is None
+
+
+def test_import_leaves_job_store_alone(tmp_path: Path) -> None:
+    """Importing the Flask app does not create or touch the job store."""
+    # Runs this interpreter on a fixed import, from an empty working directory.
+    subprocess.run(  # noqa: S603
+        [sys.executable, "-c", f"import sys; sys.path.insert(0, {str(ROOT)!r}); import frontend"],
+        cwd=tmp_path,
+        check=True,
+    )
+
+    assert not (tmp_path / jobs.JOBS_DB).exists()
@@ -0,0 +1,52 @@
+"""Batch analysis of backups from the command line."""
+
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from backend import main
+
+
+@pytest.mark.parametrize("fmt", list(main.FORMATS))
+def test_batch_writes_every_analysis(testfile: str, tmp_path: Path, fmt: str) -> None:
+    """Each backup gets its own directory of tables and a line in summary.json."""
+    backups = tmp_path / "backups"
+    backups.mkdir()
+    shutil.copyfile(testfile, backups / "pixels.json")
+    output_dir = tmp_path / "out"
+
+    status = main.main([
+        str(backups),
+        "-o",
+        str(output_dir),
+        "--plots",
+        "--terms",
+        "walk",
+        "--format",
+        fmt,
+        "--no-cache",
+        "-j",
+        "1",
+    ])
+
+    summary = json.loads((output_dir / "summary.json").read_text(encoding="utf-8"))
+    assert status == 0
+    assert [entry["error"] for entry in summary] == [None]
+    assert set(summary[0]["seconds"]) == {"cleaning", *main.ANALYSES, "terms", "total"}
+    assert all(Path(path).is_relative_to(output_dir / "pixels") for path in summary[0]["paths"])
+    assert all(Path(path).exists() for path in summary[0]["paths"])
+
+
+def test_output_dirs_number_repeated_names(tmp_path: Path) -> None:
+    """Backups with the same file name in different directories do not overwrite."""
+    dirs = main.output_dirs(["a/pixels.json", "b/pixels.json", "c/other.json"], str(tmp_path))
+
+    assert [Path(path).name for path in dirs] == ["pixels", "pixels-2", "other"]
+
+
+def test_missing_backup_is_rejected(tmp_path: Path) -> None:
+    """Paths that are neither a backup nor a directory fail before any work starts."""
+    with pytest.raises(FileNotFoundError, match="No backup or directory"):
+        main.find_backups([str(tmp_path / "missing.json")])
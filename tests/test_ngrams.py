@@ -0,0 +1,70 @@
+"""Sparse word and bigram counts against the dense counts they replaced."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import CountVectorizer
+
+from backend.data_cleaning import json_to_dataframe
+from backend.ngrams import LANGUAGE, TOP_N, ngram_counts, preprocess_text
+
+
+def dense_counts(notes: list[str | None], ngram_range: tuple[int, int]) -> pd.Series:
+    """
+    Purpose:
+        Count terms like plots did before ngram_counts: one vectorizer per n-gram
+        size, summed over the dense document-term matrix.
+    Args:
+        notes: Notes to count.
+        ngram_range: Smallest and largest n-gram size to count.
+    Returns:
+        Total count per term, most frequent first.
+    """
+    vectorizer = CountVectorizer(stop_words=LANGUAGE, ngram_range=ngram_range)
+    term_counts = vectorizer.fit_transform(map(preprocess_text, notes))
+    dense = pd.DataFrame(term_counts.toarray(), columns=vectorizer.get_feature_names_out())
+    return dense.sum().sort_values(ascending=False)
+
+
+@pytest.fixture(scope="module")
+def notes(testfile: str) -> list[str | None]:
+    """
+    Purpose:
+        Notes of the sample backup.
+    Args:
+        testfile: Path to the sample backup.
+    Returns:
+        The notes, one per Pixel.
+    """
+    return json_to_dataframe(testfile)["notes"].to_list()
+
+
+@pytest.mark.parametrize(("column", "ngram_range"), [("word", (1, 1)), ("bigram", (2, 2))])
+def test_counts_match_dense_counts(
+    notes: list[str | None],
+    column: str,
+    ngram_range: tuple[int, int],
+) -> None:
+    """Every word and bigram of the sample backup has the count of the dense matrix."""
+    expected = dense_counts(notes, ngram_range)
+    words, bigrams = ngram_counts(notes, LANGUAGE, len(expected))
+    counts = words if column == "word" else bigrams
+
+    assert dict(zip(counts[column], counts["count"], strict=True)) == expected.to_dict()
+
+
+@pytest.mark.parametrize(("column", "ngram_range"), [("word", (1, 1)), ("bigram", (2, 2))])
+def test_top_counts_match_dense_counts(
+    notes: list[str | None],
+    column: str,
+    ngram_range: tuple[int, int],
+) -> None:
+    """The top TOP_N terms have the dense matrix's counts, most frequent first."""
+    expected = dense_counts(notes, ngram_range).head(TOP_N)
+    words, bigrams = ngram_counts(notes, LANGUAGE, TOP_N)
+    counts = words if column == "word" else bigrams
+
+    np.testing.assert_array_equal(counts["count"], expected.to_numpy())
+    # Terms tied at the cutoff may be picked in another order.
+    others = counts[~counts[column].isin(expected.index)]
+    assert (others["count"] == expected.iloc[-1]).all()
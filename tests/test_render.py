@@ -0,0 +1,46 @@
+"""Headless rendering in the calling process."""
+
+import os
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from backend import figures
+from backend.data_cleaning import data_cleaning_driver
+from backend.render import render_all_graphs
+
+
+@pytest.fixture(scope="module")
+def data(testfile: str) -> pl.DataFrame:
+    """
+    Purpose:
+        Cleaned sample backup.
+    Args:
+        testfile: Path to the sample backup.
+    Returns:
+        Cleaned Pixels data.
+    """
+    return data_cleaning_driver(testfile)
+
+
+def test_in_process_render_restores_settings(
+    data: pl.DataFrame,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Rendering with one worker leaves the process's figure settings as they were."""
+    monkeypatch.delenv("MPLBACKEND", raising=False)
+    settings = (figures.OUTPUT_DIR, figures.HEADLESS, figures.PLOTLY_FORMAT)
+
+    manifest = render_all_graphs(
+        data,
+        str(tmp_path),
+        ["heatmap_of_nulls", "interactive_line_plot"],
+        max_workers=1,
+        cache_dir=None,
+    )
+
+    assert all(plot["error"] is None and plot["paths"] for plot in manifest["plots"])
+    assert settings == (figures.OUTPUT_DIR, figures.HEADLESS, figures.PLOTLY_FORMAT)
+    assert "MPLBACKEND" not in os.environ
@@ -0,0 +1,98 @@
+"""Render cache keys and lookups of headless plots."""
+
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from backend import figures, plots, rolling
+from backend.data_cleaning import data_cleaning_driver
+
+
+@pytest.fixture
+def headless(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """
+    Purpose:
+        Save figures to a temporary directory without showing them.
+    Args:
+        tmp_path: pytest's temporary directory.
+        monkeypatch: pytest's monkeypatch fixture, restoring the settings afterwards.
+    Returns:
+        Directory figures are saved to.
+    """
+    output_dir = tmp_path / "figures"
+    monkeypatch.setattr(figures, "OUTPUT_DIR", str(output_dir))
+    monkeypatch.setattr(figures, "HEADLESS", True)
+    monkeypatch.setattr(figures, "PLOTLY_FORMAT", "html")
+    return output_dir
+
+
+@pytest.fixture(scope="module")
+def data(testfile: str) -> pl.DataFrame:
+    """
+    Purpose:
+        Cleaned sample backup.
+    Args:
+        testfile: Path to the sample backup.
+    Returns:
+        Cleaned Pixels data.
+    """
+    return data_cleaning_driver(testfile)
+
+
+def test_params_cover_arguments_and_settings(data: pl.DataFrame) -> None:
+    """Window sizes, module settings and the export format are part of the key."""
+    plot = plots.interactive_rolling_statistics_plot
+    params = plots.plot_params(plot, data)
+
+    assert "window_size" in params
+    assert params != plots.plot_params(plot, data, window_size=7)
+    assert params != plots.plot_params(plot, data, plotly_format="svg")
+    assert plots.plot_params(plots.top_bigrams, data)["top_n"] == plots.TOP_N
+
+
+def test_params_cover_downsampling(data: pl.DataFrame, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Interactive plots drawn at another width or with another method render again."""
+    plot = plots.interactive_line_plot
+    params = plots.plot_params(plot, data)
+
+    monkeypatch.setattr(plots, "PLOT_WIDTH", plots.PLOT_WIDTH // 2)
+    assert params != plots.plot_params(plot, data)
+    monkeypatch.undo()
+
+    monkeypatch.setattr(plots, "DOWNSAMPLE_METHOD", "minmax")
+    assert params != plots.plot_params(plot, data)
+
+
+def test_params_cover_rolling_settings(
+    data: pl.DataFrame,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Plots of rolling statistics render again when the cached windows change."""
+    plot = plots.interactive_rolling_statistics_plot
+    params = plots.plot_params(plot, data)
+
+    monkeypatch.setattr(rolling, "WINDOWS", (*rolling.WINDOWS, 90))
+    assert params != plots.plot_params(plot, data)
+
+
+@pytest.mark.usefixtures("headless")
+def test_plot_is_read_from_cache(
+    data: pl.DataFrame,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A repeated headless plot is copied from the cache; other arguments render again."""
+    cache_dir = str(tmp_path / "renders")
+    paths = plots.interactive_seasonal_plot(data, cache_dir=cache_dir)
+    Path(paths[0]).unlink()
+
+    def fail(*_: object) -> None:
+        pytest.fail("The cached figure was rendered again.")
+
+    monkeypatch.setattr(plots, "downsample_indices", fail)
+
+    assert plots.interactive_seasonal_plot(data, cache_dir=cache_dir) == paths
+    assert Path(paths[0]).exists()
+    with pytest.raises(pytest.fail.Exception):
+        plots.interactive_seasonal_plot(data, window_size=14, cache_dir=cache_dir)
@@ -0,0 +1,39 @@
+"""Score statistics per slot and their roll-up per tracker type."""
+
+import datetime as dt
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from backend.data_cleaning import data_cleaning_driver
+from backend.scores import explode_scores, score_statistics
+
+
+def test_types_match_a_rescan(backup: str) -> None:
+    """The per-type roll-up of the slots equals aggregating every score of the type."""
+    data = data_cleaning_driver(backup)
+    expected = (
+        explode_scores(data)
+        .group_by(pl.col("type").cast(pl.String))
+        .agg(
+            pl.len().alias("count"),
+            pl.col("score").mean().alias("mean"),
+            pl.col("score").min().alias("min"),
+            pl.col("score").max().alias("max"),
+            pl.col("score").var(ddof=0).alias("variance"),
+        )
+        .sort("type")
+    )
+
+    assert_frame_equal(score_statistics(data)["types"], expected, check_dtypes=False)
+
+
+def test_slot_variance_is_population_variance() -> None:
+    """A slot's variance is taken across days with ddof=0, so one score gives 0."""
+    data = pl.DataFrame({
+        "date": [dt.date(2024, 1, 1), dt.date(2024, 1, 2)],
+        "type": ["Mood", "Mood"],
+        "scores": [[2, 5], [4]],
+    })
+
+    assert score_statistics(data)["slots"]["variance"].to_list() == [1.0, 0.0]
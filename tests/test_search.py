@@ -0,0 +1,50 @@
+"""Inverted index searches against scanning every note."""
+
+import numpy as np
+import polars as pl
+import pytest
+
+from backend.data_cleaning import data_cleaning_driver
+from backend.search import build_index, notes_key, search_phrase, search_substring
+
+
+@pytest.fixture(scope="module")
+def notes(testfile: str) -> pl.Series:
+    """
+    Purpose:
+        Notes of the sample backup.
+    Args:
+        testfile: Path to the sample backup.
+    Returns:
+        Notes, one per row.
+    """
+    return data_cleaning_driver(testfile)["notes"]
+
+
+@pytest.mark.parametrize(
+    "term",
+    ["the", "The", "a", "to be", "I'm", "day ", ".", "!", " ", "", "no such term"],
+)
+def test_substring_matches_str_contains(notes: pl.Series, term: str) -> None:
+    """The index finds the rows of a case-insensitive, literal str.contains."""
+    expected = notes.str.to_lowercase().str.contains(term.lower(), literal=True)
+
+    rows = search_substring(build_index(notes), term)
+
+    np.testing.assert_array_equal(rows, np.flatnonzero(expected.fill_null(value=False)))
+
+
+def test_phrase_needs_adjacent_tokens() -> None:
+    """Phrases match their tokens in order and next to each other, ignoring punctuation."""
+    notes = pl.Series(["Went for a walk.", "A walk, then went for food", None, "went, for!"])
+
+    np.testing.assert_array_equal(search_phrase(build_index(notes), "went for"), [0, 1, 3])
+    np.testing.assert_array_equal(search_phrase(build_index(notes), "walk went"), [])
+
+
+def test_notes_key_depends_on_order() -> None:
+    """Reordered notes get another index, as row ids differ."""
+    notes = pl.Series(["a", "b", None])
+
+    assert notes_key(notes) == notes_key(notes.clone())
+    assert notes_key(notes) != notes_key(notes.reverse())
@@ -0,0 +1,63 @@
+"""Equivalence of streaming and in-memory cleaning, and the incremental JSON parser."""
+
+import json
+from pathlib import Path
+
+import pytest
+from polars.testing import assert_frame_equal
+
+from backend.data_cleaning import data_cleaning_driver
+from backend.streaming import iter_json_records, streaming_cleaning_driver
+
+
+# Memory limit small enough to split the test backups into many batches.
+SMALL_MEMORY_LIMIT = 20_000
+
+
+@pytest.mark.parametrize("memory_limit", [SMALL_MEMORY_LIMIT, None])
+def test_streaming_matches_in_memory(backup: str, memory_limit: int | None) -> None:
+    """Batches cleaned one by one and combined give the frame of data_cleaning_driver."""
+    options = {} if memory_limit is None else {"memory_limit": memory_limit}
+    assert_frame_equal(
+        streaming_cleaning_driver(backup, **options),
+        data_cleaning_driver(backup),
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_records_split_across_chunks(chunk_size: int) -> None:
+    """Elements split at any position are parsed like the whole text."""
+    records = [{"date": "2024-1-1", "notes": "[a], {b}"}, {"scores": [1, 2]}, {}]
+    text = f"  {json.dumps(records)}\n"
+    chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+    assert [record for record, _ in iter_json_records(chunks)] == records
+
+
+@pytest.mark.parametrize("text", ["", "  ", "{}", ",[]", "[{}", '[{"a": 1', "[]x", "[{}] ,"])
+def test_rejects_text_that_is_not_an_array(text: str) -> None:
+    """Text that is not one JSON array, e.g. truncated or with a suffix, raises ValueError."""
+    with pytest.raises(ValueError):  # noqa: PT011
+        list(iter_json_records([text]))
+
+
+@pytest.mark.parametrize(
+    "records",
+    [
+        [],
+        [{"date": "2024-1-1", "type": "Mood", "scores": [3], "notes": None, "tags": []}],
+        [
+            {"date": "2024-1-1", "type": "Mood", "scores": [3], "notes": "", "tags": []},
+            {"date": "2024-1-2", "type": "Mood", "scores": [4], "notes": None, "tags": []},
+        ],
+    ],
+)
+def test_batches_keep_their_types(tmp_path: Path, records: list[dict]) -> None:
+    """Empty backups and batches of null notes are cleaned like in memory."""
+    path = tmp_path / "backup.json"
+    path.write_text(json.dumps(records), encoding="utf-8")
+
+    assert_frame_equal(
+        streaming_cleaning_driver(str(path), memory_limit=1),
+        data_cleaning_driver(str(path)),
+    )
@@ -0,0 +1,82 @@
+"""Tag tables keyed by category and tag."""
+
+import datetime as dt
+from itertools import starmap
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from backend import tags
+from backend.data_cleaning import data_cleaning_driver
+
+
+@pytest.fixture
+def exploded() -> pl.DataFrame:
+    """
+    Purpose:
+        Exploded tags named like the columns of the tables, with "tag" used in two
+        categories.
+    Returns:
+        Long table of tags, see tags.explode_tags.
+    """
+    return pl.DataFrame(
+        {
+            "date": [dt.date(2024, 1, 1)] * 2 + [dt.date(2024, 2, 3)] * 3,
+            "average_score": [3.0, 3.0, 4.0, 4.0, 4.0],
+            "category": ["Work", "Fun", "Work", "Fun", "Fun"],
+            "tag": ["tag", "tag", "month", "label", "tag"],
+        },
+        schema=tags.TAGS_SCHEMA,
+    )
+
+
+def test_same_tag_in_two_categories(exploded: pl.DataFrame) -> None:
+    """Tags named like a column, or like a tag of another category, get their own rows."""
+    keys = [("Fun", "tag"), ("Fun", "label"), ("Work", "month"), ("Work", "tag")]
+    labels = list(starmap(tags.tag_label, keys))
+
+    means = tags.tag_score_means(exploded)
+    cooccurrence = tags.tag_cooccurrence(exploded)
+    months = tags.tag_month_pivot(exploded)
+
+    assert means.select("category", "tag").rows() == keys
+    assert cooccurrence.columns == ["category", "tag", *labels]
+    assert cooccurrence.select("category", "tag").rows() == keys
+    assert months.columns == ["month", *labels]
+
+
+def test_cooccurrence_counts_days(exploded: pl.DataFrame) -> None:
+    """The matrix counts shared days, with each tag's own days on the diagonal."""
+    cooccurrence = tags.tag_cooccurrence(exploded)
+
+    assert cooccurrence.drop("category", "tag").rows() == [
+        (2, 1, 1, 1),
+        (1, 1, 1, 0),
+        (1, 1, 1, 0),
+        (1, 0, 0, 1),
+    ]
+
+
+def test_month_pivot_counts_days(exploded: pl.DataFrame) -> None:
+    """Each month counts the days a tag was used on."""
+    expected = pl.DataFrame(
+        {
+            "month": [dt.date(2024, 1, 1), dt.date(2024, 2, 1)],
+            tags.tag_label("Fun", "tag"): [1, 1],
+            tags.tag_label("Fun", "label"): [0, 1],
+            tags.tag_label("Work", "month"): [0, 1],
+            tags.tag_label("Work", "tag"): [1, 0],
+        },
+    )
+
+    assert_frame_equal(tags.tag_month_pivot(exploded), expected, check_dtypes=False)
+
+
+def test_backup_without_tags(testfile: str) -> None:
+    """A backup without any tag gives empty tables."""
+    tables = tags.tag_statistics(data_cleaning_driver(testfile))
+
+    assert tables["cooccurrence"].columns == ["category", "tag"]
+    assert tables["months"].columns == ["month"]
+    assert all(table.is_empty() for table in tables.values())
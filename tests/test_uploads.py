@@ -0,0 +1,165 @@
+"""Validation and deduplication of uploaded backups."""
+
+import io
+import json
+from http import HTTPStatus
+from pathlib import Path
+
+import pytest
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.test import encode_multipart
+
+from frontend import app, routes
+from frontend.uploads import CHUNK_SIZE, UploadError, open_file_part, save_upload
+
+
+PIXEL = {"date": "2021-1-31", "type": "Mood", "scores": [3], "notes": "", "tags": []}
+
+
+def upload(text: str, upload_dir: Path, max_bytes: int = 1 << 20) -> tuple[str, bool]:
+    """
+    Purpose:
+        Save text as an upload.
+    Args:
+        text: Content of the upload.
+        upload_dir: Directory uploads are saved to.
+        max_bytes: Upper bound for the upload in bytes.
+    Returns:
+        Output of save_upload.
+    """
+    return save_upload([text.encode("utf-8")], str(upload_dir), max_bytes)
+
+
+def test_saves_and_deduplicates(tmp_path: Path) -> None:
+    """A valid backup is stored by content hash, and storing it again is a duplicate."""
+    text = f"{json.dumps([PIXEL])}\n"
+
+    path, duplicate = upload(text, tmp_path)
+
+    assert not duplicate
+    assert Path(path).read_text(encoding="utf-8") == text
+    assert upload(text, tmp_path) == (path, True)
+    assert list(tmp_path.iterdir()) == [Path(path)]
+
+
+@pytest.mark.parametrize(
+    ("text", "error"),
+    [
+        (f"{json.dumps([PIXEL])}junk", "content after"),
+        (f"{json.dumps([PIXEL])} junk", "content after"),
+        (f"{json.dumps([PIXEL])}\n[]", "content after"),
+        ("[]", "no Pixels"),
+        ('[{"date": "2021-1-31"', "not valid JSON"),
+        (json.dumps([{**PIXEL, "date": "31/01/2021"}]), "date"),
+        (json.dumps([{**PIXEL, "date": "2021-2-30"}]), "date"),
+        (json.dumps([{**PIXEL, "date": "2021-1-31T00:00"}]), "date"),
+        (json.dumps([{**PIXEL, "scores": ["3"]}]), "not a number"),
+        (json.dumps([{**PIXEL, "notes": None}]), "'notes'"),
+        (json.dumps([PIXEL, 1]), "Pixel 1 is not an object"),
+    ],
+)
+def test_rejects_invalid_backups(tmp_path: Path, text: str, error: str) -> None:
+    """Invalid backups raise UploadError and leave nothing in the upload directory."""
+    with pytest.raises(UploadError, match=error):
+        upload(text, tmp_path)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_rejects_large_uploads(tmp_path: Path) -> None:
+    """Uploads over the size limit are rejected while they are read."""
+    with pytest.raises(RequestEntityTooLarge):
+        upload(json.dumps([PIXEL] * 100), tmp_path, max_bytes=1000)
+
+    assert not list(tmp_path.iterdir())
+
+
+def multipart(content: bytes, filename: str = "backup.json") -> tuple[str, bytes]:
+    """
+    Purpose:
+        Encode an upload form like a browser does, with a text field before the file.
+    Args:
+        content: Content of the file.
+        filename: Name of the file.
+    Returns:
+        boundary: Multipart boundary.
+        body: Request body.
+    """
+    return encode_multipart({
+        "note": "backup",
+        "file": FileStorage(io.BytesIO(content), filename, content_type="application/json"),
+    })
+
+
+def test_file_part_is_read_from_the_body(tmp_path: Path) -> None:
+    """The file part of a form body is saved as sent."""
+    content = f"{json.dumps([PIXEL] * 1000)}\n".encode()
+    boundary, body = multipart(content)
+
+    filename, chunks = open_file_part(io.BytesIO(body), boundary.encode(), "file")
+    path, _ = save_upload(chunks, str(tmp_path))
+
+    assert filename == "backup.json"
+    assert Path(path).read_bytes() == content
+
+
+def test_bad_upload_stops_reading_the_body(tmp_path: Path) -> None:
+    """A bad Pixel near the start is rejected without reading the rest of the body."""
+    content = json.dumps([{**PIXEL, "date": "31/01/2021"}] + [PIXEL] * 10_000).encode()
+    boundary, body = multipart(content)
+    stream = io.BytesIO(body)
+
+    _, chunks = open_file_part(stream, boundary.encode(), "file")
+    with pytest.raises(UploadError, match="date"):
+        save_upload(chunks, str(tmp_path))
+
+    assert stream.tell() <= 2 * CHUNK_SIZE < len(body)
+    assert not list(tmp_path.iterdir())
+
+
+def test_rejects_form_without_file() -> None:
+    """Bodies without the file part raise UploadError."""
+    boundary, body = encode_multipart({"note": "backup"})
+
+    with pytest.raises(UploadError, match="no 'file' file"):
+        open_file_part(io.BytesIO(body), boundary.encode(), "file")
+
+
+def test_rejects_cut_off_form(tmp_path: Path) -> None:
+    """Bodies that end inside the file part raise UploadError and save nothing."""
+    boundary, body = multipart(json.dumps([PIXEL]).encode())
+    _, chunks = open_file_part(io.BytesIO(body[:-10]), boundary.encode(), "file")
+
+    with pytest.raises(UploadError, match="not valid form data"):
+        save_upload(chunks, str(tmp_path))
+
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize(
+    ("content", "status"),
+    [
+        (json.dumps([PIXEL]).encode(), HTTPStatus.FOUND),
+        (f"{json.dumps([PIXEL])}junk".encode(), HTTPStatus.BAD_REQUEST),
+    ],
+)
+def test_upload_route(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    content: bytes,
+    status: HTTPStatus,
+) -> None:
+    """The upload form queues valid backups and answers 400 to invalid ones."""
+    monkeypatch.setitem(app.config, "UPLOAD_FOLDER", str(tmp_path))
+    monkeypatch.setattr(routes, "submit_job", lambda _: "job")
+    boundary, body = multipart(content)
+
+    response = app.test_client().post(
+        "/",
+        data=body,
+        content_type=f"multipart/form-data; boundary={boundary}",
+    )
+
+    assert response.status_code == status
+    assert len(list(tmp_path.iterdir())) == (status == HTTPStatus.FOUND)